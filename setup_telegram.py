@@ -1,20 +1,36 @@
 # setup_telegram.py
 import asyncio
 import json
+import sys
 from pathlib import Path
 from telethon import TelegramClient
 
 SESSION_NAME = "tg_session"
 
-async def main():
+CONFIG_PATH = Path(__file__).parent / "data" / "config.json"
+
+def register_session(config: dict, session_name: str):
+    """Добавляет сессию в modules.telegram.sessions, чтобы приложение использовало ее в пуле."""
+    tg_config = config.setdefault("modules", {}).setdefault("telegram", {})
+    sessions = tg_config.get("sessions") or [SESSION_NAME]
+    if session_name in sessions:
+        return
+    tg_config["sessions"] = sessions + [session_name]
+    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    print(f"Сессия '{session_name}' добавлена в пул аккаунтов (modules.telegram.sessions).")
+
+async def main(session_name: str = SESSION_NAME):
     """
     Скрипт для одноразовой авторизации и создания файла сессии Telegram.
+    Для пула из нескольких аккаунтов запустите его для каждого аккаунта
+    с отдельным именем сессии: python setup_telegram.py tg_session_2
     """
-    print("--- Telegram Session Setup ---")
+    print(f"--- Telegram Session Setup ({session_name}) ---")
     
     # 1. Загружаем конфигурацию
     try:
-        config_path = Path(__file__).parent / "data" / "config.json"
+        config_path = CONFIG_PATH
         with open(config_path, "r", encoding="utf-8") as f:
             config = json.load(f)
         tg_config = config.get("modules", {}).get("telegram", {})
@@ -29,7 +45,7 @@ async def main():
 
     # 2. Создаем клиент и проходим авторизацию
     # Telethon автоматически запросит все необходимые данные в консоли
-    client = TelegramClient(SESSION_NAME, int(api_id), api_hash)
+    client = TelegramClient(session_name, int(api_id), api_hash)
     
     try:
         await client.start()
@@ -37,7 +53,8 @@ async def main():
         me = await client.get_me()
         print(f"\n[SUCCESS] Авторизация прошла успешно.")
         print(f"Вы вошли как: @{me.username} (ID: {me.id})")
-        print(f"Файл сессии '{SESSION_NAME}.session' создан/обновлен.")
+        print(f"Файл сессии '{session_name}.session' создан/обновлен.")
+        register_session(config, session_name)
         print("Теперь вы можете запускать основное приложение.")
         
     except Exception as e:
@@ -47,4 +64,4 @@ async def main():
             await client.disconnect()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else SESSION_NAME))
\ No newline at end of file
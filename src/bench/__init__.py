@@ -0,0 +1,8 @@
+# src/bench/__init__.py
+"""
+Бенчмарк сканера на локальных заглушках VK, GitHub и Telegram.
+
+Запуск из каталога src:
+    python -m bench --sizes 10 100 10000
+    python -m bench --modules vk github --latency 0.1 --error-ratio 0.05 --json
+"""
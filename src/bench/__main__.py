@@ -0,0 +1,183 @@
+# src/bench/__main__.py
+"""
+Прогоняет ScanSession на наборах из N ников против локальных заглушек и печатает
+время скана, время до первого результата, запросы в секунду по модулям и пик памяти.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from core.http_client import HttpClient
+from core.log_manager import LogManager
+from core.module_loader import load_modules, shutdown_modules
+from core.result_cache import ResultCache
+from core.scanner import ScanSession
+from core.telegram_client import TelegramClientManager
+from core.telegram_entities import TelegramEntityCache
+
+from .fakes import BackendProfile, FakeApiServer, FakeBackend, FakeTelegramClient
+
+DEFAULT_SIZES = [10, 100, 10_000]
+MODULES = ("vk", "github", "telegram")
+
+# Лимиты заглушек мягче настоящих, чтобы 10k ников укладывались в минуты;
+# ограничители модулей настраиваются на тот же темп
+DEFAULT_PROFILES = {
+    "vk": BackendProfile(latency=0.08, rate=20, burst=5),
+    "github": BackendProfile(latency=0.05, rate=200, burst=50),
+    "telegram": BackendProfile(latency=0.03, rate=100, burst=10), # На один аккаунт
+}
+MODULE_CONCURRENCY = {"vk": 3, "github": 20, "telegram": 1}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Бенчмарк сканера на заглушках VK, GitHub и Telegram.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Размеры прогонов, ников")
+    parser.add_argument("--modules", nargs="+", choices=MODULES, default=list(MODULES))
+    parser.add_argument("--latency", type=float, help="Задержка ответа всех заглушек, с")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, с")
+    parser.add_argument("--rate", action="append", default=[], metavar="MODULE=RPS", help="Темп заглушки и ограничителя модуля")
+    parser.add_argument("--hit-ratio", type=float, default=0.3, help="Доля занятых ников")
+    parser.add_argument("--error-ratio", type=float, default=0.0, help="Доля запросов с 403 / flood control / FloodWait")
+    parser.add_argument("--tg-accounts", type=int, default=2, help="Сколько аккаунтов в пуле Telegram")
+    parser.add_argument("--github-token", action="store_true", help="GitHub с токеном: пакетные GraphQL-запросы вместо REST")
+    parser.add_argument("--warm", action="store_true", help="Повторять каждый прогон с заполненным кэшем результатов")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Не измерять пик памяти (tracemalloc замедляет скан)")
+    parser.add_argument("--json", action="store_true", help="Вывести отчет в JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Не скрывать служебные сообщения модулей")
+    return parser.parse_args(argv)
+
+def build_profiles(args: argparse.Namespace) -> dict[str, BackendProfile]:
+    rates = {}
+    for item in args.rate:
+        module, _, rps = item.partition("=")
+        rates[module] = float(rps)
+    profiles = {}
+    for name, default in DEFAULT_PROFILES.items():
+        profiles[name] = BackendProfile(
+            latency=default.latency if args.latency is None else args.latency, jitter=args.jitter,
+            rate=rates.get(name, default.rate), burst=default.burst,
+            hit_ratio=args.hit_ratio, error_ratio=args.error_ratio,
+        )
+    return profiles
+
+def build_config(args: argparse.Namespace, profiles: dict[str, BackendProfile]) -> dict:
+    """Конфигурация модулей с фиктивными токенами и темпом, совпадающим с заглушками."""
+    def rate_limit(name):
+        profile = profiles[name]
+        return {"rate": profile.rate or 1000.0, "burst": profile.burst, "concurrency": MODULE_CONCURRENCY[name], "jitter": 0.0}
+    modules = {
+        "vk": {"token": "bench"},
+        "github": {"token": "bench" if args.github_token else ""},
+        "telegram": {"api_id": 1, "api_hash": "bench", "sessions": [f"bench{i}" for i in range(max(1, args.tg_accounts))]},
+    }
+    return {"modules": {
+        name: {**settings, "enabled": name in args.modules, "rate_limit": rate_limit(name)}
+        for name, settings in modules.items()
+    }}
+
+
+async def run_once(label: str, usernames: list[str], backends: dict[str, FakeBackend], measure_memory: bool) -> dict:
+    for backend in backends.values():
+        backend.reset_stats()
+    if measure_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    session = ScanSession(usernames)
+    start = time.perf_counter()
+    first_result = None
+    async for _ in session:
+        if first_result is None:
+            first_result = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+
+    return {
+        "run": label,
+        "usernames": len(usernames),
+        "seconds": round(elapsed, 3),
+        "first_result": None if first_result is None else round(first_result, 3),
+        "found": session.found,
+        "peak_mb": round((tracemalloc.get_traced_memory()[1] - baseline) / 2**20, 2) if measure_memory else None,
+        "modules": {
+            name: {
+                "requests": backend.requests,
+                "lookups": backend.lookups,
+                # Темп считается по времени работы модуля, а не всего скана: модули заканчивают в разное время
+                "rps": round(backend.requests / backend.active_seconds, 1) if backend.active_seconds else 0.0,
+                "limited": backend.limited,
+                "errors": backend.errors,
+            }
+            for name, backend in backends.items()
+        },
+    }
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    profiles = build_profiles(args)
+    backends = {name: FakeBackend(name, profiles[name], seed=i) for i, name in enumerate(MODULES) if name in args.modules}
+    server = FakeApiServer(backends.get("vk") or FakeBackend("vk", profiles["vk"]), backends.get("github") or FakeBackend("github", profiles["github"]))
+    measure_memory = not args.no_tracemalloc
+
+    with tempfile.TemporaryDirectory(prefix="osint_bench_") as workdir:
+        await server.start()
+        HttpClient.set_url_overrides(server.url_overrides())
+        TelegramClientManager.client_factory = FakeTelegramClient.factory(backends.get("telegram") or FakeBackend("telegram", profiles["telegram"]))
+        ResultCache.initialize({"path": str(Path(workdir) / "results.db")})
+        TelegramEntityCache.initialize(path=Path(workdir) / "entities.db")
+        await HttpClient.initialize()
+        await load_modules(build_config(args, profiles))
+        if measure_memory:
+            tracemalloc.start()
+
+        reports = []
+        try:
+            for size in args.sizes:
+                usernames = [f"user{size}n{i}" for i in range(size)]
+                reports.append(await run_once("cold", usernames, backends, measure_memory))
+                if args.warm:
+                    reports.append(await run_once("warm", usernames, backends, measure_memory))
+        finally:
+            if measure_memory:
+                tracemalloc.stop()
+            await shutdown_modules()
+            await HttpClient.close()
+            HttpClient.set_url_overrides(None)
+            ResultCache.close()
+            TelegramEntityCache.close()
+            await server.stop()
+    return reports
+
+def print_reports(reports: list[dict]):
+    print(f"{'ников':>7} {'прогон':>6} {'время, с':>9} {'1-й, с':>7} {'найдено':>8} {'память, МБ':>11}   запросы/с по модулям")
+    for report in reports:
+        modules = "  ".join(
+            f"{name}: {stats['rps']} ({stats['requests']} запр., лимит {stats['limited']}, ошибок {stats['errors']})"
+            for name, stats in report["modules"].items()
+        )
+        first = "—" if report["first_result"] is None else report["first_result"]
+        memory = "—" if report["peak_mb"] is None else report["peak_mb"]
+        print(f"{report['usernames']:>7} {report['run']:>6} {report['seconds']:>9} {first:>7} {report['found']:>8} {memory:>11}   {modules}")
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    # Без -v журнал не выводится, а записи ниже WARNING даже не создаются
+    LogManager.initialize({"level": "INFO" if args.verbose else "WARNING"}, stream=sys.stderr if args.verbose else None)
+    try:
+        reports = asyncio.run(run(args))
+    finally:
+        LogManager.close()
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        print_reports(reports)
+    return 0
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(main())
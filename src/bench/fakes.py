@@ -0,0 +1,270 @@
+# src/bench/fakes.py
+"""
+Локальные заглушки API для бенчмарка: HTTP-сервер, отвечающий как VK и GitHub,
+и клиент Telethon, отвечающий как Telegram. Задержка, лимиты, доля ошибок
+и доля занятых ников задаются профилем BackendProfile.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+import zlib
+from dataclasses import dataclass
+
+from aiohttp import web
+from telethon import types
+from telethon.errors.rpcerrorlist import FloodWaitError, UsernameNotOccupiedError
+
+FIRST_NAMES = ["Иван", "Пётр", "Анна", "Мария", "Алексей", "Ольга", "Дмитрий", "Елена"]
+LAST_NAMES = ["Петров", "Иванов", "Смирнова", "Кузнецова", "Попов", "Соколова"]
+CITIES = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск"]
+
+_USER_IDS = re.compile(r'"user_ids":\s*("(?:[^"\\]|\\.)*")')
+
+
+@dataclass
+class BackendProfile:
+    """Поведение заглушки одного сервиса."""
+    latency: float = 0.05      # Задержка ответа, с
+    jitter: float = 0.0        # Случайная добавка к задержке, с
+    rate: float | None = None  # Допустимый темп, запросов в секунду (None — без ограничения)
+    burst: int = 1
+    hit_ratio: float = 0.3     # Доля ников, для которых существует профиль
+    error_ratio: float = 0.0   # Доля запросов, получающих 403 / flood control / FloodWait
+    flood_wait: int = 1        # Сколько секунд просит подождать FloodWait Telegram
+
+
+class _Bucket:
+    """Токен-бакет сервиса: запрос сверх темпа отклоняется, а не ждет."""
+
+    def __init__(self, rate: float | None, burst: int):
+        self.rate, self.burst = rate, max(1, burst)
+        self.tokens, self.updated = float(self.burst), time.monotonic()
+
+    def take(self) -> bool:
+        if self.rate is None:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class FakeBackend:
+    """Состояние заглушки: профиль, лимит и счетчики запросов для отчета."""
+
+    def __init__(self, name: str, profile: BackendProfile, seed: int = 0):
+        self.name = name
+        self.profile = profile
+        self.bucket = _Bucket(profile.rate, profile.burst)
+        self._random = random.Random(seed)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = self.limited = self.errors = 0
+        self.lookups = 0 # Сколько ников запрошено (в пакетном запросе их много)
+        self.first_at = self.last_at = None
+
+    @property
+    def active_seconds(self) -> float:
+        """Время от первого запроса до последнего ответа."""
+        return self.last_at - self.first_at if self.first_at is not None else 0.0
+
+    def is_hit(self, username: str) -> bool:
+        """Детерминированно решает, занят ли ник: одинаково во всех прогонах и сервисах."""
+        return zlib.crc32(username.lower().encode()) % 10_000 < self.profile.hit_ratio * 10_000
+
+    async def admit(self, lookups: int = 1, bucket: _Bucket | None = None) -> str:
+        """Учитывает запрос, выдерживает задержку и возвращает 'ok', 'limited' или 'error'."""
+        self.requests += 1
+        self.lookups += lookups
+        if self.first_at is None:
+            self.first_at = time.perf_counter()
+        allowed = (bucket or self.bucket).take()
+        await asyncio.sleep(self.profile.latency + self._random.uniform(0, self.profile.jitter))
+        self.last_at = time.perf_counter()
+        if not allowed:
+            self.limited += 1
+            return "limited"
+        if self._random.random() < self.profile.error_ratio:
+            self.errors += 1
+            return "error"
+        return "ok"
+
+
+def _fake_person(username: str) -> dict:
+    seed = zlib.crc32(username.lower().encode())
+    return {
+        "id": seed % 900_000_000 + 1,
+        "first_name": FIRST_NAMES[seed % len(FIRST_NAMES)],
+        "last_name": LAST_NAMES[seed // 7 % len(LAST_NAMES)],
+        "city": CITIES[seed // 11 % len(CITIES)],
+        "year": 1970 + seed % 35,
+    }
+
+
+class FakeApiServer:
+    """HTTP-сервер на 127.0.0.1 с маршрутами /vk/method/* и /github/*."""
+
+    def __init__(self, vk: FakeBackend, github: FakeBackend):
+        self.vk, self.github = vk, github
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/vk/method/users.get", self._vk_users_get)
+        app.router.add_post("/vk/method/execute", self._vk_execute)
+        app.router.add_get("/github/users/{login}", self._github_user)
+        app.router.add_post("/github/graphql", self._github_graphql)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def url_overrides(self) -> dict[str, str]:
+        """Префиксы для HttpClient.set_url_overrides()."""
+        return {"https://api.vk.com": f"{self.base_url}/vk", "https://api.github.com": f"{self.base_url}/github"}
+
+    # --- VK ---
+
+    def _vk_users(self, usernames: list[str]) -> list[dict]:
+        users = []
+        for username in usernames:
+            if not self.vk.is_hit(username):
+                continue
+            person = _fake_person(username)
+            users.append({
+                "id": person["id"], "domain": username, "first_name": person["first_name"],
+                "last_name": person["last_name"], "city": {"id": 1, "title": person["city"]},
+                "bdate": f"1.1.{person['year']}", "sex": 2, "online": 0,
+            })
+        return users
+
+    def _vk_error(self, status: str) -> web.Response:
+        code, message = (6, "Too many requests per second") if status == "limited" else (9, "Flood control")
+        return web.json_response({"error": {"error_code": code, "error_msg": message}})
+
+    async def _vk_users_get(self, request: web.Request) -> web.Response:
+        usernames = [u for u in request.query.get("user_ids", "").split(",") if u]
+        if (status := await self.vk.admit(len(usernames))) != "ok":
+            return self._vk_error(status)
+        return web.json_response({"response": self._vk_users(usernames)})
+
+    async def _vk_execute(self, request: web.Request) -> web.Response:
+        code = (await request.post()).get("code", "")
+        calls = [[u for u in json.loads(match).split(",") if u] for match in _USER_IDS.findall(code)]
+        if (status := await self.vk.admit(sum(map(len, calls)))) != "ok":
+            return self._vk_error(status)
+        return web.json_response({"response": [self._vk_users(usernames) for usernames in calls]})
+
+    # --- GitHub ---
+
+    def _github_headers(self, remaining: int | None = None) -> dict:
+        # Часовая квота соответствует темпу заглушки, чтобы ограничитель модуля не занижал его сам
+        quota = int((self.github.profile.rate or 1000) * 3600)
+        remaining = quota if remaining is None else remaining
+        return {"X-RateLimit-Limit": str(quota), "X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+
+    def _github_rejected(self, status: str) -> web.Response:
+        # Превышение темпа — исчерпанная квота, случайная ошибка — вторичный лимит с Retry-After
+        if status == "limited":
+            headers = {**self._github_headers(0), "X-RateLimit-Reset": str(int(time.time()) + 1)}
+        else:
+            headers = {**self._github_headers(), "Retry-After": "1"}
+        return web.json_response({"message": "API rate limit exceeded"}, status=403, headers=headers)
+
+    def _github_profile(self, login: str) -> dict:
+        person = _fake_person(login)
+        return {
+            "login": login, "id": person["id"], "name": f"{person['first_name']} {person['last_name']}",
+            "location": person["city"], "email": None, "company": None, "bio": None, "blog": "",
+            "avatar_url": None, "html_url": f"https://github.com/{login}", "created_at": "2015-01-01T00:00:00Z",
+            "followers": person["id"] % 100, "public_repos": person["id"] % 30,
+        }
+
+    async def _github_user(self, request: web.Request) -> web.Response:
+        login = request.match_info["login"]
+        if (status := await self.github.admit()) != "ok":
+            return self._github_rejected(status)
+        if not self.github.is_hit(login):
+            return web.json_response({"message": "Not Found"}, status=404, headers=self._github_headers())
+        return web.json_response(self._github_profile(login), headers=self._github_headers())
+
+    async def _github_graphql(self, request: web.Request) -> web.Response:
+        variables = (await request.json()).get("variables") or {}
+        if (status := await self.github.admit(len(variables))) != "ok":
+            return self._github_rejected(status)
+        data, errors = {}, []
+        for key, login in variables.items():
+            alias = f"u{key[1:]}"
+            if self.github.is_hit(login):
+                profile = self._github_profile(login)
+                data[alias] = {
+                    "login": login, "name": profile["name"], "email": "", "location": profile["location"],
+                    "company": None, "avatarUrl": None, "url": profile["html_url"], "createdAt": profile["created_at"],
+                    "bio": None, "websiteUrl": None, "twitterUsername": None,
+                    "followers": {"totalCount": profile["followers"]}, "repositories": {"totalCount": profile["public_repos"]},
+                }
+            else:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias], "message": f"Could not resolve to a User with the login of '{login}'."})
+        return web.json_response({"data": data, **({"errors": errors} if errors else {})}, headers=self._github_headers())
+
+
+class FakeTelegramClient:
+    """
+    Заглушка TelegramClient для TelegramClientManager.client_factory.
+    Каждый аккаунт ограничен собственным темпом, как настоящие сессии.
+    """
+
+    def __init__(self, session_name: str, api_id: int, api_hash: str, backend: FakeBackend | None = None):
+        self.session_name = session_name
+        self.backend = backend or FakeBackend("telegram", BackendProfile())
+        self._bucket = _Bucket(self.backend.profile.rate, self.backend.profile.burst)
+        self._connected = False
+
+    @classmethod
+    def factory(cls, backend: FakeBackend):
+        return lambda session_name, api_id, api_hash: cls(session_name, api_id, api_hash, backend)
+
+    async def connect(self):
+        self._connected = True
+
+    async def disconnect(self):
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def is_user_authorized(self) -> bool:
+        return True
+
+    async def get_me(self):
+        return types.User(id=1, username=f"bench_{self.session_name}")
+
+    async def download_profile_photo(self, *args, **kwargs):
+        return None
+
+    async def __call__(self, request):
+        username = request.username
+        status = await self.backend.admit(bucket=self._bucket)
+        if status != "ok":
+            raise FloodWaitError(request, capture=self.backend.profile.flood_wait)
+        if not self.backend.is_hit(username):
+            raise UsernameNotOccupiedError(request)
+        person = _fake_person(username)
+        user = types.User(id=person["id"], access_hash=person["id"] * 31, username=username,
+                          first_name=person["first_name"], last_name=person["last_name"], bot=False)
+        return types.contacts.ResolvedPeer(peer=types.PeerUser(person["id"]), chats=[], users=[user])
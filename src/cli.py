@@ -0,0 +1,121 @@
+# src/cli.py
+"""
+Консольный запуск сканера без GUI.
+
+Каждый найденный результат сразу пишется в stdout одной строкой JSON (NDJSON),
+служебные сообщения модулей уходят в stderr. Ники читаются потоком
+и сканируются пачками, поэтому память не растет с размером входного списка.
+
+Примеры:
+    python src/cli.py zakita lovedonnik
+    python src/cli.py -f nicks.txt --generate > results.ndjson
+    cat nicks.txt | python src/cli.py - > results.ndjson
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Callable, Iterable, Iterator, TextIO
+
+from core.http_client import HttpClient
+from core.log_manager import LogManager, get_logger
+from core.metrics import Metrics
+from core.module_loader import load_modules, shutdown_modules, get_config
+from core.result_cache import ResultCache
+from core.scanner import ScanSession, any_module_accepts
+from core.username_generator import DEFAULT_WINDOW_BUDGET, WINDOW_SIZE, iter_variations
+
+DEFAULT_BATCH_SIZE = 500
+
+log = get_logger("cli")
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="OSINT-Scout: поиск ников без графического интерфейса, вывод в NDJSON.")
+    parser.add_argument("usernames", nargs="*", help="Ники для поиска; '-' — читать ники из stdin")
+    parser.add_argument("-f", "--file", action="append", default=[], help="Файл со списком ников (по одному в строке или через запятую)")
+    parser.add_argument("-o", "--output", help="Файл для результатов (по умолчанию stdout)")
+    parser.add_argument("-g", "--generate", action="store_true", help="Генерировать вариации для каждого ника")
+    parser.add_argument("--window-budget", type=int, help=f"Сколько вариаций сгенерировать на каждые {WINDOW_SIZE} исходных ников (по умолчанию {DEFAULT_WINDOW_BUDGET})")
+    parser.add_argument("-b", "--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Сколько ников читать из входного потока за раз")
+    parser.add_argument("--metrics", help="Файл для JSON-снимка метрик сканирования")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Не выводить служебные сообщения")
+    return parser.parse_args(argv)
+
+def _split_line(line: str) -> Iterator[str]:
+    for part in line.split(","):
+        if part := part.strip():
+            yield part
+
+def iter_usernames(args: argparse.Namespace, stdin: TextIO) -> Iterator[str]:
+    """Лениво перебирает ники из аргументов, файлов и stdin."""
+    read_stdin = "-" in args.usernames or (not args.usernames and not args.file and not stdin.isatty())
+    for username in args.usernames:
+        if username != "-":
+            yield from _split_line(username)
+    for path in args.file:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield from _split_line(line)
+    if read_stdin:
+        for line in stdin:
+            yield from _split_line(line)
+
+def iter_scan_targets(usernames: Iterable[str], generate: bool, window_budget: int | None = None,
+                      is_valid: Callable[[str], bool] | None = None) -> Iterator[str]:
+    """
+    Разворачивает ники в вариации, если включена генерация. Вход читается окнами:
+    каждый исходный ник сканируется, а самые вероятные вариации окна — пока не
+    исчерпан бюджет окна. Вариации, недопустимые ни на одной платформе, бюджет не расходуют.
+    """
+    if generate:
+        yield from iter_variations(usernames, is_valid=is_valid, window_budget=window_budget)
+    else:
+        yield from usernames
+
+async def run(args: argparse.Namespace, output: TextIO) -> int:
+    scanned = 0
+
+    await HttpClient.initialize(get_config().get("http"))
+    ResultCache.initialize(get_config().get("cache"))
+    await load_modules()
+    try:
+        window_budget = args.window_budget or get_config().get("generator", {}).get("window_budget", DEFAULT_WINDOW_BUDGET)
+        targets = iter_scan_targets(iter_usernames(args, sys.stdin), args.generate, window_budget, any_module_accepts())
+        session = ScanSession(targets, batch_size=args.batch_size)
+        async for item in session:
+            output.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+        scanned = session.consumed
+        log.info("Обработано ников: %d, найдено результатов: %d", scanned, session.found)
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as f:
+                json.dump(Metrics.snapshot(), f, ensure_ascii=False, indent=2)
+    finally:
+        await shutdown_modules()
+        await HttpClient.close()
+        ResultCache.close()
+
+    if not scanned:
+        log.error("Не передано ни одного ника.")
+        return 1
+    return 0
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    # Журнал идет в stderr, поэтому stdout отдан только под NDJSON
+    LogManager.initialize(get_config().get("logging"), stream=None if args.quiet else sys.stderr)
+    try:
+        return asyncio.run(run(args, output))
+    except KeyboardInterrupt:
+        log.warning("Прервано пользователем.")
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        LogManager.close()
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# src/core/avatar_cache.py
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable
+
+from .http_client import POOL_MEDIA, HttpClient
+from .log_manager import get_logger
+from .single_flight import SingleFlight
+
+AVATAR_DIR = Path(__file__).resolve().parents[1] / "data" / "avatars"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DOWNLOADS = 6
+INDEX_FLUSH_EVERY = 50 # Как часто сохранять индекс URL -> хэш содержимого
+EVICT_TO_RATIO = 0.9   # До какой доли max_bytes чистить кэш, чтобы не просматривать каталог на каждой миниатюре
+
+log = get_logger("avatars")
+
+class AvatarCache:
+    """
+    Общий конвейер аватаров для всех карточек.
+
+    Загрузки идут через общий семафор, готовые миниатюры лежат на диске под
+    хэшем содержимого (одна картинка по разным URL хранится один раз), а индекс
+    URL -> хэш позволяет не скачивать уже известные аватары повторно.
+    Декодирование и уменьшение выполняет thumbnailer в отдельном потоке.
+    """
+    _dir: Path = AVATAR_DIR
+    _max_bytes: int = DEFAULT_MAX_BYTES
+    _semaphore: asyncio.Semaphore | None = None
+    _thumbnailer: Callable[[bytes], bytes | None] | None = None
+    _index: dict[str, str] = {}
+    _unsaved: int = 0
+    _total_bytes: int | None = None # Текущий размер миниатюр на диске; None — еще не подсчитан
+    _inflight = SingleFlight()
+
+    @classmethod
+    def initialize(cls, config: dict | None = None, thumbnailer: Callable[[bytes], bytes | None] | None = None):
+        """
+        Параметры: path, max_bytes, max_downloads.
+        thumbnailer(bytes) -> bytes: превращает исходную картинку в миниатюру (None — не картинка).
+        """
+        config = config or {}
+        cls._dir = Path(config.get("path") or AVATAR_DIR)
+        cls._dir.mkdir(parents=True, exist_ok=True)
+        cls._max_bytes = int(config.get("max_bytes", DEFAULT_MAX_BYTES))
+        cls._semaphore = asyncio.Semaphore(int(config.get("max_downloads", DEFAULT_MAX_DOWNLOADS)))
+        cls._thumbnailer = thumbnailer
+        try:
+            cls._index = json.loads((cls._dir / "index.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            cls._index = {}
+        cls._total_bytes = None
+
+    @classmethod
+    def close(cls):
+        cls._save_index()
+
+    @classmethod
+    def _save_index(cls):
+        if cls._unsaved:
+            (cls._dir / "index.json").write_text(json.dumps(cls._index), encoding="utf-8")
+            cls._unsaved = 0
+
+    @classmethod
+    def _thumb_path(cls, content_hash: str) -> Path:
+        return cls._dir / f"{content_hash}.thumb"
+
+    @classmethod
+    async def get_thumbnail(cls, src: str) -> Path | None:
+        """
+        Возвращает путь к миниатюре для URL или локального файла,
+        скачивая и уменьшая картинку при необходимости.
+        """
+        if not src:
+            return None
+        source_key = hashlib.sha1(src.encode("utf-8")).hexdigest()
+        if (content_hash := cls._index.get(source_key)) and (path := cls._thumb_path(content_hash)).exists():
+            os.utime(path) # Отмечаем использование для вытеснения по давности
+            return path
+        return await cls._inflight.run(source_key, lambda: cls._build_thumbnail(src, source_key))
+
+    @classmethod
+    async def _build_thumbnail(cls, src: str, source_key: str) -> Path | None:
+        if src.startswith(("http://", "https://")):
+            content = await cls._download(src)
+        else:
+            content = await asyncio.to_thread(Path(os.path.abspath(src)).read_bytes)
+        if not content:
+            return None
+
+        content_hash = hashlib.sha1(content).hexdigest()
+        path = cls._thumb_path(content_hash)
+        if not path.exists():
+            thumbnail = await asyncio.to_thread(cls._thumbnailer, content) if cls._thumbnailer else content
+            if not thumbnail:
+                return None
+            await asyncio.to_thread(path.write_bytes, thumbnail)
+            if cls._total_bytes is None:
+                cls._total_bytes = await asyncio.to_thread(cls._disk_usage)
+            else:
+                cls._total_bytes += len(thumbnail)
+            # Каталог просматривается только тогда, когда кэш действительно переполнен
+            if cls._total_bytes > cls._max_bytes:
+                cls._total_bytes = await asyncio.to_thread(cls._evict)
+
+        cls._index[source_key] = content_hash
+        cls._unsaved += 1
+        if cls._unsaved >= INDEX_FLUSH_EVERY:
+            cls._save_index()
+        return path
+
+    @classmethod
+    async def _download(cls, url: str) -> bytes | None:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(DEFAULT_MAX_DOWNLOADS)
+        session = HttpClient.get_session(POOL_MEDIA)
+        async with cls._semaphore:
+            try:
+                async with session.get(url) as resp:
+                    resp.raise_for_status()
+                    return await resp.read()
+            except Exception as e:
+                log.warning("Не удалось загрузить изображение %s: %s", url, e)
+                return None
+
+    @classmethod
+    def _disk_usage(cls) -> int:
+        return sum(p.stat().st_size for p in cls._dir.glob("*.thumb"))
+
+    @classmethod
+    def _evict(cls) -> int:
+        """
+        Удаляет давно не использованные миниатюры, если кэш больше max_bytes,
+        до EVICT_TO_RATIO от него. Возвращает итоговый размер кэша.
+        """
+        files = [(p, p.stat()) for p in cls._dir.glob("*.thumb")]
+        total = sum(st.st_size for _, st in files)
+        if total <= cls._max_bytes:
+            return total
+        target = cls._max_bytes * EVICT_TO_RATIO
+        for path, st in sorted(files, key=lambda item: item[1].st_mtime):
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+            if total <= target:
+                break
+        return total
@@ -0,0 +1,208 @@
+# src/core/correlation.py
+"""
+Сопоставление профилей разных платформ: какие карточки, вероятно, принадлежат одному человеку.
+
+Попарно сравнивать все профили сессии слишком дорого, поэтому сначала профили
+раскладываются по блокам с общими ключами (имя, email, ник, дата рождения,
+город + фамилия), и нечеткое сравнение выполняется только внутри блоков.
+Пары с достаточной оценкой объединяются в кластеры.
+"""
+import re
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Iterable
+
+from .data_model import NormalizedData, normalize_many
+
+MATCH_THRESHOLD = 0.55 # Минимальная оценка пары, чтобы считать профили одним человеком
+MAX_BLOCK_SIZE = 50    # Слишком общие ключи (популярное имя, большой город) не дают пар
+SIMILARITY_THRESHOLD = 0.8 # Строки с таким сходством биграмм (коэффициент Дайса) считаются совпавшими
+
+# Вклад совпадений в оценку пары
+WEIGHTS = {
+    "name": 0.35,
+    "username": 0.25,
+    "email": 0.4,
+    "birth_date": 0.2,
+    "city": 0.1,
+}
+BIRTH_DATE_CONFLICT_PENALTY = 0.4
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_FUZZY_FIELDS = ("name", "username", "city")
+
+@dataclass(slots=True)
+class ProfileRecord:
+    """Профиль из результатов сессии: модуль, исходный ник и нормализованные данные."""
+    module: str
+    source_username: str
+    data: NormalizedData
+
+@dataclass
+class IdentityCluster:
+    """Группа профилей, вероятно принадлежащих одному человеку."""
+    members: list[ProfileRecord]
+    score: float
+    evidence: set[str] = field(default_factory=set)
+
+    @property
+    def modules(self) -> set[str]:
+        return {member.module for member in self.members}
+
+
+@dataclass(slots=True)
+class _Features:
+    name: str
+    username: str
+    email: str
+    city: str
+    last_name: str
+    birth_date: tuple[int | None, int | None, int | None]
+    # Биграммы для нечеткого сравнения считаются один раз на профиль
+    grams: dict[str, frozenset[str]] = field(default_factory=dict)
+
+
+def _bigrams(text: str) -> frozenset[str]:
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+def _to_int(value) -> int | None:
+    try:
+        return int(value) if value else None
+    except (ValueError, TypeError):
+        return None
+
+def _features(data: NormalizedData) -> _Features:
+    first, last, middle, username, email, city = normalize_many(
+        (data.first_name, data.last_name, data.middle_name, data.username, data.email, data.city)
+    )
+    # Порядок слов в имени на разных платформах разный: "Иван Петров" и "Petrov Ivan"
+    name = " ".join(sorted(token for token in f"{first} {last} {middle}".split() if token))
+    features = _Features(
+        name=name,
+        username=_NON_ALNUM.sub("", username),
+        email=email.strip(),
+        city=city.strip(),
+        last_name=last.strip(),
+        birth_date=(_to_int(data.birth_day), _to_int(data.birth_month), _to_int(data.birth_year)),
+    )
+    features.grams = {field_name: _bigrams(getattr(features, field_name)) for field_name in _FUZZY_FIELDS}
+    return features
+
+def _blocking_keys(f: _Features) -> Iterable[str]:
+    if len(f.name.split()) >= 2:
+        yield f"name:{f.name}"
+    if f.email:
+        yield f"email:{f.email}"
+    if len(f.username) >= 3:
+        yield f"username:{f.username}"
+    day, month, year = f.birth_date
+    if day and month and year:
+        yield f"birth:{day}.{month}.{year}"
+    if f.city and f.last_name:
+        yield f"city:{f.city}:{f.last_name}"
+
+def _similarity(a: _Features, b: _Features, name: str) -> float:
+    """Коэффициент Дайса по биграммам: 1.0 — строки совпали, 0.0 — ничего общего."""
+    x, y = getattr(a, name), getattr(b, name)
+    if not x or not y:
+        return 0.0
+    if x == y:
+        return 1.0
+    gx, gy = a.grams[name], b.grams[name]
+    return 2 * len(gx & gy) / (len(gx) + len(gy)) if gx and gy else 0.0
+
+def _score_pair(a: _Features, b: _Features) -> tuple[float, set[str]]:
+    """Оценка 0..1 того, что два профиля — один человек, и признаки, которые на это указали."""
+    score, evidence = 0.0, set()
+    for name in _FUZZY_FIELDS:
+        if (similarity := _similarity(a, b, name)) >= SIMILARITY_THRESHOLD:
+            score += WEIGHTS[name] * similarity
+            evidence.add(name)
+    if a.email and a.email == b.email:
+        score += WEIGHTS["email"]
+        evidence.add("email")
+
+    known = [(x, y) for x, y in zip(a.birth_date, b.birth_date) if x and y]
+    if known:
+        if all(x == y for x, y in known):
+            # Полная дата весит больше, чем совпавшие день и месяц
+            score += WEIGHTS["birth_date"] * len(known) / 3
+            evidence.add("birth_date")
+        else:
+            score -= BIRTH_DATE_CONFLICT_PENALTY
+    return max(0.0, min(1.0, score)), evidence
+
+
+class _UnionFind:
+    """Объединение профилей, которое не сливает группы с разными датами рождения."""
+
+    def __init__(self, birth_dates: list[tuple]):
+        self.parent = list(range(len(birth_dates)))
+        self.birth_dates = list(birth_dates)
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return True
+        da, db = self.birth_dates[ra], self.birth_dates[rb]
+        if any(x and y and x != y for x, y in zip(da, db)):
+            return False
+        self.parent[ra] = rb
+        self.birth_dates[rb] = tuple(x or y for x, y in zip(da, db))
+        return True
+
+
+def correlate(records: list[ProfileRecord], threshold: float = MATCH_THRESHOLD) -> list[IdentityCluster]:
+    """
+    Группирует профили в вероятные личности. Возвращает кластеры из двух и более
+    профилей, отсортированные по оценке (средняя оценка связавших их пар).
+    """
+    features = [_features(record.data) for record in records]
+    blocks: dict[str, list[int]] = {}
+    for i, f in enumerate(features):
+        for key in _blocking_keys(f):
+            blocks.setdefault(key, []).append(i)
+
+    seen: set[tuple[int, int]] = set()
+    candidates: list[tuple[int, int, float, set[str]]] = []
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for a, b in combinations(members, 2):
+            if (a, b) in seen:
+                continue
+            seen.add((a, b))
+            score, evidence = _score_pair(features[a], features[b])
+            if score >= threshold:
+                candidates.append((a, b, score, evidence))
+
+    # Сначала самые надежные связи: слабая пара не должна склеить двух разных людей
+    candidates.sort(key=lambda edge: edge[2], reverse=True)
+    links = _UnionFind([f.birth_date for f in features])
+    edges = [edge for edge in candidates if links.union(edge[0], edge[1])]
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(records)):
+        groups.setdefault(links.find(i), []).append(i)
+    group_edges: dict[int, list[tuple[float, set[str]]]] = {}
+    for a, _, score, evidence in edges:
+        group_edges.setdefault(links.find(a), []).append((score, evidence))
+
+    clusters = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        scores = group_edges[root]
+        clusters.append(IdentityCluster(
+            members=[records[i] for i in members],
+            score=sum(score for score, _ in scores) / len(scores),
+            evidence=set().union(*(evidence for _, evidence in scores)),
+        ))
+    clusters.sort(key=lambda cluster: (cluster.score, len(cluster.members)), reverse=True)
+    return clusters
@@ -1,15 +1,71 @@
 # src/core/data_model.py
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Iterable
 from transliterate import translit
 
+NORMALIZE_MEMO_SIZE = 65536
+_BATCH_SEPARATOR = "\x00"
+
+def _build_translit_table() -> dict[int, str]:
+    """
+    Таблица для str.translate, эквивалентная translit(..., 'ru', reversed=True).
+    Обратная транслитерация пакета ru заменяет символы независимо друг от друга,
+    поэтому таблицу можно собрать, прогнав через библиотеку каждый символ кириллицы.
+    """
+    table = {}
+    for code in range(0x0400, 0x0530): # Диапазоны символов языкового пакета ru
+        char = chr(code)
+        if (latin := translit(char, 'ru', reversed=True)) != char:
+            table[code] = latin
+    return table
+
+_TRANSLIT_TABLE = _build_translit_table()
+_memo: OrderedDict[str, str] = OrderedDict()
+# normalize_many вызывается и из потоков (correlate через asyncio.to_thread), и из GUI
+_memo_lock = threading.Lock()
+
+def _recall(text: str) -> str | None:
+    with _memo_lock:
+        if (normalized := _memo.get(text)) is not None:
+            _memo.move_to_end(text)
+        return normalized
+
+def _remember(pairs: Iterable[tuple[str, str]]):
+    with _memo_lock:
+        for text, normalized in pairs:
+            _memo[text] = normalized
+            if len(_memo) > NORMALIZE_MEMO_SIZE:
+                _memo.popitem(last=False)
+
 def normalize_for_search(text: str | None) -> str:
     """Приводит текст к нижнему регистру и транслитерирует для поиска."""
     if not text:
         return ""
-    try:
-        return translit(str(text).lower(), 'ru', reversed=True)
-    except Exception:
-        return str(text).lower()
+    text = str(text)
+    if (normalized := _recall(text)) is not None:
+        return normalized
+    normalized = text.lower().translate(_TRANSLIT_TABLE)
+    _remember([(text, normalized)])
+    return normalized
+
+def normalize_many(texts: Iterable[str | None]) -> list[str]:
+    """
+    Пакетный вариант normalize_for_search: строки, которых нет в кэше,
+    обрабатываются одним вызовом lower/translate над их объединением.
+    """
+    texts = ["" if not text else str(text) for text in texts]
+    with _memo_lock:
+        misses = list(dict.fromkeys(text for text in texts if text and text not in _memo))
+    if misses:
+        if any(_BATCH_SEPARATOR in text for text in misses):
+            for text in misses:
+                normalize_for_search(text)
+        else:
+            joined = _BATCH_SEPARATOR.join(misses).lower().translate(_TRANSLIT_TABLE)
+            _remember(zip(misses, joined.split(_BATCH_SEPARATOR)))
+    return [normalize_for_search(text) for text in texts]
 
 def _normalize_month(month_str: str) -> str:
     """Централизованный нормализатор месяцев."""
@@ -26,9 +82,23 @@ def _normalize_month(month_str: str) -> str:
     }
     return month_map.get(month_str, month_str)
 
-@dataclass
+# Служебные поля для поиска -> поля профиля, из которых они собираются
+SEARCH_SOURCES = {
+    "search_name": ("username", "first_name", "last_name", "middle_name"),
+    "search_location": ("city", "country", "company"),
+    "search_email": ("email",), # Email и так обычно в латинице
+}
+
+def _search_text(values: tuple) -> str | None:
+    return values[0] if len(values) == 1 else " ".join(map(str, values))
+
+@dataclass(slots=True)
 class NormalizedData:
-    """Единая модель данных для результатов поиска."""
+    """
+    Единая модель данных для результатов поиска.
+    Поисковые поля (search_*) вычисляются при первом обращении и кэшируются,
+    поэтому поля профиля не должны меняться после того, как по нему искали.
+    """
     # Основные идентификаторы
     username: str = ""
     first_name: str = ""
@@ -48,16 +118,39 @@ class NormalizedData:
     # Другое
     company: str = ""
     
-    # Служебные поля для поиска
-    search_name: str = field(init=False, repr=False)
-    search_location: str = field(init=False, repr=False)
-    search_email: str = field(init=False, repr=False)
+    # Кэш служебных полей для поиска
+    _search: tuple[str, ...] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def _search_fields(self) -> tuple[str, ...]:
+        if self._search is None:
+            self._search = tuple(normalize_many(
+                _search_text(tuple(getattr(self, name) for name in sources)) for sources in SEARCH_SOURCES.values()
+            ))
+        return self._search
+
+    @property
+    def search_name(self) -> str:
+        return self._search_fields()[0]
+
+    @property
+    def search_location(self) -> str:
+        return self._search_fields()[1]
 
-    def __post_init__(self):
-        """Вызывается после создания объекта для генерации поисковых полей."""
-        self.search_name = normalize_for_search(f"{self.username} {self.first_name} {self.last_name} {self.middle_name}")
-        self.search_location = normalize_for_search(f"{self.city} {self.country} {self.company}")
-        self.search_email = normalize_for_search(self.email) # Email и так обычно в латинице
+    @property
+    def search_email(self) -> str:
+        return self._search_fields()[2]
+
+    @staticmethod
+    def prepare_search_fields(profiles: Iterable["NormalizedData"]):
+        """Вычисляет поисковые поля сразу для многих профилей одним пакетом."""
+        pending = [profile for profile in profiles if profile._search is None]
+        texts = normalize_many(
+            _search_text(tuple(getattr(profile, name) for name in sources))
+            for profile in pending for sources in SEARCH_SOURCES.values()
+        )
+        width = len(SEARCH_SOURCES)
+        for i, profile in enumerate(pending):
+            profile._search = tuple(texts[i * width:(i + 1) * width])
 
     @classmethod
     def from_vk_api(cls, data: dict):
@@ -105,4 +198,51 @@ class NormalizedData:
             username=data.get("username", ""),
             first_name=data.get("first_name", ""),
             last_name=data.get("last_name", "")
-        )
\ No newline at end of file
+        )
+
+class NormalizedColumns:
+    """
+    Столбцовое хранилище профилей для больших наборов результатов:
+    по списку на каждое поле вместо объекта на каждый профиль.
+    Нормализованные для поиска столбцы вычисляются пакетом при первом
+    обращении и дополняются только новыми строками.
+    """
+    FIELDS = tuple(f.name for f in fields(NormalizedData) if not f.name.startswith("_"))
+
+    def __init__(self, profiles: Iterable[NormalizedData] = ()):
+        self._columns: dict[str, list] = {name: [] for name in self.FIELDS}
+        self._search_columns: dict[str, list[str]] = {}
+        self.extend(profiles)
+
+    def __len__(self) -> int:
+        return len(self._columns["username"])
+
+    def __getitem__(self, index: int) -> NormalizedData:
+        return NormalizedData(**{name: column[index] for name, column in self._columns.items()})
+
+    def append(self, profile: NormalizedData):
+        for name, column in self._columns.items():
+            column.append(getattr(profile, name))
+
+    def extend(self, profiles: Iterable[NormalizedData]):
+        for profile in profiles:
+            self.append(profile)
+
+    def column(self, name: str) -> list:
+        return self._columns[name]
+
+    def search_column(self, name: str) -> list[str]:
+        """
+        Нормализованный столбец: поле профиля (например, last_name) или одно из search_*.
+        Возвращается один и тот же список, который растет вместе с хранилищем.
+        """
+        column = self._search_columns.setdefault(name, [])
+        if (start := len(column)) == len(self):
+            return column
+        sources = SEARCH_SOURCES.get(name, (name,))
+        if start == len(self) - 1:
+            column.append(normalize_for_search(_search_text(tuple(self._columns[source][start] for source in sources))))
+        else:
+            texts = (_search_text(values) for values in zip(*(self._columns[source][start:] for source in sources)))
+            column.extend(normalize_many(texts))
+        return column
@@ -0,0 +1,165 @@
+# src/core/filter_engine.py
+from dataclasses import dataclass, fields
+
+from .data_model import NormalizedData, NormalizedColumns, normalize_for_search
+
+NGRAM_SIZE = 3
+
+# Поле запроса -> атрибут нормализованных данных, по которому ищется подстрока
+TEXT_FIELDS = {
+    "lastname": "last_name",
+    "firstname": "first_name",
+    "middlename": "middle_name",
+    "location": "search_location",
+    "email": "search_email",
+}
+# Поле запроса -> атрибут с числом даты рождения, сравнивается точно
+DATE_FIELDS = {
+    "day": "birth_day",
+    "month": "birth_month",
+    "year": "birth_year",
+}
+
+@dataclass(frozen=True)
+class FilterQuery:
+    """Значения фильтров, уже приведенные к виду для поиска."""
+    lastname: str = ""
+    firstname: str = ""
+    middlename: str = ""
+    location: str = ""
+    email: str = ""
+    day: str = ""
+    month: str = ""
+    year: str = ""
+
+    @classmethod
+    def from_text(cls, **values: str) -> "FilterQuery":
+        """Нормализует текст из полей ввода: транслитерация для текстовых полей, strip для дат."""
+        return cls(**{
+            name: normalize_for_search(value) if name in TEXT_FIELDS else (value or "").strip()
+            for name, value in values.items()
+        })
+
+    def is_empty(self) -> bool:
+        return not any(getattr(self, f.name) for f in fields(self))
+
+    def narrows(self, previous: "FilterQuery") -> bool:
+        """True, если каждый результат этого запроса заведомо был и в результатах previous."""
+        return (all(getattr(previous, name) in getattr(self, name) for name in TEXT_FIELDS)
+                and all(not getattr(previous, name) or getattr(previous, name) == getattr(self, name) for name in DATE_FIELDS))
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+def _to_int(value) -> int | None:
+    try:
+        return int(value) if value else None
+    except (ValueError, TypeError):
+        return None
+
+
+class FilterEngine:
+    """
+    Индекс результатов для панели фильтров.
+
+    Профили хранятся в столбцовом виде (NormalizedColumns), их поля нормализуются
+    один раз при добавлении. Для поиска подстроки
+    используются индексы n-грамм, для даты рождения — точные индексы. Если новый запрос
+    только сужает предыдущий (пользователь дописывает символы), проверяются лишь
+    прошлые совпадения и только изменившиеся поля.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._sources: list[str] = []
+        self._profiles = NormalizedColumns()
+        # Нормализованные столбцы хранилища; списки растут по мере добавления профилей
+        self._texts: dict[str, list[str]] = {name: self._profiles.search_column(attr) for name, attr in TEXT_FIELDS.items()}
+        self._dates: dict[str, list[int | None]] = {name: [] for name in DATE_FIELDS}
+        self._ngram_index: dict[str, dict[str, list[int]]] = {name: {} for name in TEXT_FIELDS}
+        self._date_index: dict[str, dict[int, list[int]]] = {name: {} for name in DATE_FIELDS}
+        self._last_query = FilterQuery()
+        self._last_docs: set[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def add(self, source_username: str, data: NormalizedData) -> bool:
+        """Индексирует профиль. Возвращает True, если он подходит под текущий запрос."""
+        doc = len(self._sources)
+        self._sources.append(source_username)
+        self._profiles.append(data)
+        for name, attr in TEXT_FIELDS.items():
+            index = self._ngram_index[name]
+            for gram in _ngrams(self._profiles.search_column(attr)[doc]):
+                index.setdefault(gram, []).append(doc)
+        for name, attr in DATE_FIELDS.items():
+            value = _to_int(getattr(data, attr))
+            self._dates[name].append(value)
+            if value is not None:
+                self._date_index[name].setdefault(value, []).append(doc)
+
+        if self._last_docs is None:
+            return True
+        if self._matches(doc, self._last_query, self._active_fields(self._last_query)):
+            self._last_docs.add(doc)
+            return True
+        return False
+
+    @staticmethod
+    def _active_fields(query: FilterQuery) -> list[str]:
+        return [f.name for f in fields(query) if getattr(query, f.name)]
+
+    def _matches(self, doc: int, query: FilterQuery, names: list[str]) -> bool:
+        for name in names:
+            value = getattr(query, name)
+            if name in TEXT_FIELDS:
+                if value not in self._texts[name][doc]:
+                    return False
+            elif self._dates[name][doc] is None or self._dates[name][doc] != _to_int(value):
+                return False
+        return True
+
+    def _candidates(self, query: FilterQuery) -> set[int] | None:
+        """Пересечение индексов по всем полям запроса (None — индексы ничего не сузили)."""
+        postings: list[list[int]] = []
+        for name in DATE_FIELDS:
+            if value := getattr(query, name):
+                if (number := _to_int(value)) is None:
+                    return set() # Нечисловая дата не совпадает ни с чем
+                postings.append(self._date_index[name].get(number, []))
+        for name in TEXT_FIELDS:
+            index = self._ngram_index[name]
+            for gram in _ngrams(getattr(query, name)):
+                postings.append(index.get(gram, []))
+        if not postings:
+            return None
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def search(self, query: FilterQuery) -> set[str] | None:
+        """Исходные ники подходящих профилей. None — фильтры пусты, подходит всё."""
+        if query.is_empty():
+            self._last_query, self._last_docs = query, None
+            return None
+
+        if self._last_docs is not None and query.narrows(self._last_query):
+            # Запрос сузился: достаточно перепроверить прошлые совпадения по изменившимся полям
+            changed = [name for name in self._active_fields(query) if getattr(query, name) != getattr(self._last_query, name)]
+            docs = {doc for doc in self._last_docs if self._matches(doc, query, changed)}
+        else:
+            candidates = self._candidates(query)
+            names = self._active_fields(query)
+            docs = {doc for doc in (range(len(self._sources)) if candidates is None else candidates)
+                    if self._matches(doc, query, names)}
+
+        self._last_query, self._last_docs = query, docs
+        return {self._sources[doc] for doc in docs}
@@ -1,43 +1,122 @@
 # src/core/http_client.py
 import asyncio
+import time
 import aiohttp
 import ssl
 import certifi
 
+from .log_manager import get_logger
+from .metrics import Metrics, current_module
+
+log = get_logger("http")
+
+async def _on_request_start(session, context, params):
+    context.started = time.perf_counter()
+
+async def _on_request_end(session, context, params):
+    label = current_module.get() or params.url.host
+    Metrics.inc("http_requests_total", label)
+    Metrics.observe("http_request_seconds", label, time.perf_counter() - context.started)
+    if params.response.status >= 400 and params.response.status != 404: # 404 — обычный ответ "ник свободен"
+        Metrics.inc("http_errors_total", label)
+
+async def _on_request_exception(session, context, params):
+    label = current_module.get() or params.url.host
+    Metrics.inc("http_requests_total", label)
+    Metrics.inc("http_errors_total", label)
+
+async def _on_connection_create_end(session, context, params):
+    # Новое соединение — это DNS, TCP и TLS-handshake; при переиспользовании keep-alive их нет
+    Metrics.inc("http_connections_total", current_module.get() or "other")
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """Счетчики и гистограмма задержек для каждого HTTP-запроса сессии."""
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_request_end.append(_on_request_end)
+    trace.on_request_exception.append(_on_request_exception)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    return trace
+
+# Пулы соединений: API-запросы модулей не должны ждать, пока медленные CDN отдают аватары.
+# limit — соединений в пуле всего, limit_per_host — к одному хосту, keepalive — сколько секунд
+# держать простаивающее соединение, dns_ttl — срок жизни кэша DNS; connect/read/total — таймауты, с
+POOL_API = "api"
+POOL_MEDIA = "media"
+POOL_DEFAULTS = {
+    POOL_API: {"limit": 100, "limit_per_host": 32, "keepalive": 60.0, "dns_ttl": 300, "connect": 5.0, "read": 10.0, "total": 30.0},
+    POOL_MEDIA: {"limit": 16, "limit_per_host": 6, "keepalive": 15.0, "dns_ttl": 300, "connect": 5.0, "read": 20.0, "total": 60.0},
+}
+
+def _create_session(settings: dict, ssl_context: ssl.SSLContext) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_context,
+        limit=settings["limit"],
+        limit_per_host=settings["limit_per_host"],
+        keepalive_timeout=settings["keepalive"],
+        use_dns_cache=True,
+        ttl_dns_cache=settings["dns_ttl"],
+    )
+    # Отдельный таймаут на установку соединения: зависший TLS-handshake не съедает весь бюджет запроса
+    timeout = aiohttp.ClientTimeout(total=settings["total"], sock_connect=settings["connect"], sock_read=settings["read"])
+    return aiohttp.ClientSession(timeout=timeout, connector=connector, trace_configs=[_trace_config()])
+
 class HttpClient:
-    _session: aiohttp.ClientSession | None = None
+    _sessions: dict[str, aiohttp.ClientSession] = {}
     _vk_semaphore = asyncio.Semaphore(3)
+    _url_overrides: dict[str, str] = {}
 
     @classmethod
-    async def initialize(cls):
+    async def initialize(cls, config: dict | None = None):
         """
-        ИНИЦИАЛИЗИРУЕТ глобальную сессию aiohttp.
+        ИНИЦИАЛИЗИРУЕТ сессии aiohttp: "api" для модулей и "media" для аватаров.
+        config — раздел "http": {"api": {...}, "media": {...}} с полями POOL_DEFAULTS.
         Этот метод должен быть вызван один раз после запуска event loop.
         """
-        if cls._session is None:
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=10)
-            cls._session = aiohttp.ClientSession(timeout=timeout, connector=connector)
-            print("[*] Сетевая сессия HttpClient инициализирована.")
+        if cls._sessions:
+            return
+        config = config or {}
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        for pool, defaults in POOL_DEFAULTS.items():
+            cls._sessions[pool] = _create_session({**defaults, **config.get(pool, {})}, ssl_context)
+        log.info("Сетевые сессии HttpClient инициализированы: %s.", ", ".join(cls._sessions))
 
     @classmethod
     async def close(cls):
-        """ЗАКРЫВАЕТ глобальную сессию."""
-        if cls._session and not cls._session.closed:
-            await cls._session.close()
-            cls._session = None
-            print("[*] Сетевая сессия HttpClient закрыта.")
+        """ЗАКРЫВАЕТ все сессии."""
+        if not cls._sessions:
+            return
+        for session in cls._sessions.values():
+            if not session.closed:
+                await session.close()
+        cls._sessions = {}
+        log.info("Сетевые сессии HttpClient закрыты.")
 
     @classmethod
-    def get_session(cls) -> aiohttp.ClientSession:
+    def get_session(cls, pool: str = POOL_API) -> aiohttp.ClientSession:
         """
-        Возвращает уже инициализированный экземпляр сессии.
-        Вызовет ошибку, если сессия не была инициализирована.
+        Возвращает уже инициализированную сессию пула (по умолчанию — для API).
+        Вызовет ошибку, если сессии не были инициализированы.
         """
-        if cls._session is None:
+        if pool not in cls._sessions:
             raise RuntimeError("HttpClient сессия не была инициализирована. Вызовите HttpClient.initialize() сначала.")
-        return cls._session
+        return cls._sessions[pool]
+
+    @classmethod
+    def set_url_overrides(cls, overrides: dict[str, str] | None):
+        """
+        Перенаправляет запросы по префиксу адреса, например {"https://api.vk.com": "http://127.0.0.1:8080/vk"}.
+        Нужно бенчмарку, чтобы модули обращались к локальным заглушкам вместо настоящих API.
+        """
+        cls._url_overrides = dict(overrides or {})
+
+    @classmethod
+    def resolve_url(cls, url: str) -> str:
+        """Возвращает адрес, по которому на самом деле нужно отправить запрос."""
+        for prefix, target in cls._url_overrides.items():
+            if url.startswith(prefix):
+                return target + url[len(prefix):]
+        return url
 
     @classmethod
     def get_vk_semaphore(cls) -> asyncio.Semaphore:
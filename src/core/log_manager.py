@@ -0,0 +1,142 @@
+# src/core/log_manager.py
+"""
+Журнал приложения на стандартном logging.
+
+Код (в том числе горячий путь сканера) только кладет запись в очередь через QueueHandler,
+а форматирование и вывод в stderr, файл и консоль GUI выполняет поток QueueListener.
+У каждой подсистемы и модуля свой логгер osint.<имя> со своим уровнем.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+ROOT_LOGGER = "osint"
+DEFAULT_LEVEL = "INFO"
+# Структурные поля записи: передаются через extra={...} и выводятся после сообщения.
+# platform — имя модуля сканера (атрибут module у LogRecord уже занят)
+FIELDS = ("platform", "username", "status", "latency")
+TEXT_FORMAT = "[%(asctime)s] %(levelname)-7s %(name)s: %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+logging.getLogger(ROOT_LOGGER).setLevel(DEFAULT_LEVEL)
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер подсистемы или модуля: osint.<name>."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+def record_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key in FIELDS if (value := getattr(record, key, None)) is not None}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Строка журнала с полями записи в конце: platform=vk username=ivan latency=120ms."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(
+            f"{key}={value * 1000:.0f}ms" if key == "latency" else f"{key}={value}"
+            for key, value in record_fields(record).items()
+        )
+        return f"{line} {fields}" if fields else line
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON, для сбора журналов внешними системами."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **record_fields(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Стандартный QueueHandler форматирует сообщение в потоке вызова; здесь это
+    # откладывается до потока QueueListener, а в очередь уходит сама запись
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LogManager:
+    """Настраивает очередь журнала и приемники записей (stderr, файл, консоль GUI)."""
+    _listener: logging.handlers.QueueListener | None = None
+    _queue_handler: logging.Handler | None = None
+    _outputs: list[logging.Handler] = []  # Приемники из конфигурации, закрываются в close()
+    _sinks: list[logging.Handler] = []    # Приемники, добавленные через add_handler()
+
+    @classmethod
+    def initialize(cls, config: dict | None = None, stream=sys.stderr):
+        """
+        config — раздел "logging": level, levels (уровни отдельных логгеров),
+        format ("text" или "json") и file. stream=None отключает вывод в консоль.
+        """
+        if cls._listener is not None:
+            return
+        config = config or {}
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(str(config.get("level", DEFAULT_LEVEL)).upper())
+        root.propagate = False
+        for name, level in config.get("levels", {}).items():
+            get_logger(name).setLevel(str(level).upper())
+
+        formatter = JsonFormatter() if config.get("format") == "json" else StructuredFormatter(TEXT_FORMAT, DATE_FORMAT)
+        cls._outputs = []
+        if stream is not None:
+            cls._outputs.append(logging.StreamHandler(stream))
+        if path := config.get("file"):
+            cls._outputs.append(logging.FileHandler(path, encoding="utf-8"))
+        for handler in cls._outputs:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        for sink in cls._sinks:
+            root.removeHandler(sink)
+        cls._queue_handler = _DeferredQueueHandler(log_queue)
+        root.addHandler(cls._queue_handler)
+        cls._listener = logging.handlers.QueueListener(log_queue, *cls._outputs, *cls._sinks, respect_handler_level=True)
+        cls._listener.start()
+
+    @classmethod
+    def add_handler(cls, handler: logging.Handler):
+        """Подключает приемник: до initialize() он вызывается напрямую, после — из потока журнала."""
+        if handler.formatter is None:
+            handler.setFormatter(StructuredFormatter(TEXT_FORMAT, DATE_FORMAT))
+        cls._sinks.append(handler)
+        if cls._listener is not None:
+            cls._listener.handlers = (*cls._listener.handlers, handler)
+        else:
+            logging.getLogger(ROOT_LOGGER).addHandler(handler)
+
+    @classmethod
+    def remove_handler(cls, handler: logging.Handler):
+        if handler not in cls._sinks:
+            return
+        cls._sinks.remove(handler)
+        if cls._listener is not None:
+            cls._listener.handlers = tuple(h for h in cls._listener.handlers if h is not handler)
+        else:
+            logging.getLogger(ROOT_LOGGER).removeHandler(handler)
+
+    @classmethod
+    def close(cls):
+        """Дописывает очередь и закрывает файлы; приемники add_handler() снова вызываются напрямую."""
+        if cls._listener is None:
+            return
+        cls._listener.stop()
+        cls._listener = None
+        root = logging.getLogger(ROOT_LOGGER)
+        root.removeHandler(cls._queue_handler)
+        cls._queue_handler = None
+        for handler in cls._outputs:
+            handler.close()
+        cls._outputs = []
+        for sink in cls._sinks:
+            root.addHandler(sink)
@@ -0,0 +1,196 @@
+# src/core/metrics.py
+"""
+Счетчики, гистограммы задержек и датчики сканера в памяти процесса.
+
+Сканер, HttpClient, ограничители темпа и модули только увеличивают значения,
+а чтение (JSON-снимок, текст для Prometheus, панель статистики GUI) собирает их по запросу.
+"""
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+PREFIX = "osint_"
+# Верхние границы корзин гистограмм задержек, секунды
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Модуль, от имени которого выполняется код: сканер выставляет его перед вызовом модуля,
+# а HttpClient подписывает им метрики HTTP-запросов
+current_module: ContextVar[str | None] = ContextVar("current_module", default=None)
+
+# Описания метрик для Prometheus (# HELP)
+DESCRIPTIONS = {
+    "requests_total": "Запросы модулей к платформам",
+    "errors_total": "Запросы, завершившиеся ошибкой",
+    "timeouts_total": "Запросы, прерванные по таймауту",
+    "rate_limited_total": "Сигналы о превышении лимита (403/429, код 6 VK, FloodWait)",
+    "rate_limit_wait_seconds_total": "Суммарная пауза, назначенная ограничителями",
+    "flood_wait_seconds_total": "Суммарное ожидание FloodWait, запрошенное Telegram",
+    "retries_total": "Повторы запросов после временных сбоев",
+    "circuit_trips_total": "Срабатывания автомата-предохранителя модуля",
+    "cache_hits_total": "Ники, ответ для которых взят из кэша результатов",
+    "cache_misses_total": "Ники, которые пришлось запрашивать в сети",
+    "skipped_invalid_total": "Ники, недопустимые на платформе модуля",
+    "results_total": "Найденные профили",
+    "http_requests_total": "HTTP-запросы",
+    "http_connections_total": "Новые соединения (DNS, TCP и TLS) вместо переиспользованных keep-alive",
+    "http_errors_total": "HTTP-запросы со статусом 4xx/5xx (кроме 404) или сетевой ошибкой",
+    "request_seconds": "Длительность запроса модуля к платформе",
+    "http_request_seconds": "Длительность HTTP-запроса",
+    "queue_depth": "Очереди модулей активных сессий (ники, у пакетных модулей — порции)",
+    "result_queue_depth": "Результаты, ожидающие потребителя",
+    "circuit_open": "Автомат модуля разомкнут (1) или замкнут (0)",
+    "circuit_parked": "Запросы, ожидающие замыкания автомата",
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как в Prometheus."""
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Оценка квантиля по верхней границе корзины (None — наблюдений нет)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Реестр метрик процесса. У каждого значения одна метка — как правило, имя модуля."""
+    _counters: dict[str, dict[str, float]] = {}
+    _histograms: dict[str, dict[str, Histogram]] = {}
+    _collectors: list[Callable[[], Iterable[tuple[str, str, float]]]] = []
+    _started_at = time.time()
+
+    @classmethod
+    def inc(cls, name: str, label: str, value: float = 1):
+        counters = cls._counters.setdefault(name, {})
+        counters[label] = counters.get(label, 0) + value
+
+    @classmethod
+    def observe(cls, name: str, label: str, seconds: float):
+        histograms = cls._histograms.setdefault(name, {})
+        if (histogram := histograms.get(label)) is None:
+            histogram = histograms[label] = Histogram()
+        histogram.observe(seconds)
+
+    @classmethod
+    def add_collector(cls, collector: Callable[[], Iterable[tuple[str, str, float]]]):
+        """Регистрирует источник датчиков (имя, метка, значение), опрашиваемый при каждом снимке."""
+        cls._collectors.append(collector)
+
+    @classmethod
+    def remove_collector(cls, collector: Callable):
+        if collector in cls._collectors:
+            cls._collectors.remove(collector)
+
+    @classmethod
+    def reset(cls):
+        cls._counters.clear()
+        cls._histograms.clear()
+        cls._started_at = time.time()
+
+    @classmethod
+    def _gauges(cls) -> dict[str, dict[str, float]]:
+        # Датчики нескольких одновременных сессий складываются
+        gauges: dict[str, dict[str, float]] = {}
+        for collector in list(cls._collectors):
+            for name, label, value in collector():
+                values = gauges.setdefault(name, {})
+                values[label] = values.get(label, 0) + value
+        return gauges
+
+    @classmethod
+    def counter(cls, name: str, label: str) -> float:
+        return cls._counters.get(name, {}).get(label, 0)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """Все метрики в виде словаря для JSON."""
+        return {
+            "uptime": round(time.time() - cls._started_at, 1),
+            "counters": {name: dict(values) for name, values in cls._counters.items()},
+            "histograms": {
+                name: {
+                    label: {
+                        "count": h.count, "sum": round(h.sum, 3),
+                        "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                        "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], h.counts)),
+                    }
+                    for label, h in values.items()
+                }
+                for name, values in cls._histograms.items()
+            },
+            "gauges": cls._gauges(),
+        }
+
+    @classmethod
+    def modules_summary(cls) -> dict[str, dict]:
+        """Сводка по модулям для панели статистики."""
+        all_gauges = cls._gauges()
+        gauges, parked = all_gauges.get("queue_depth", {}), all_gauges.get("circuit_parked", {})
+        labels = set(gauges)
+        for name in ("requests_total", "http_requests_total", "cache_hits_total", "cache_misses_total"):
+            labels |= set(cls._counters.get(name, {}))
+        summary = {}
+        for label in sorted(labels):
+            hits, misses = cls.counter("cache_hits_total", label), cls.counter("cache_misses_total", label)
+            # Пакетные модули меряются по HTTP-запросам: один запрос несет сотни ников
+            histogram = cls._histograms.get("request_seconds", {}).get(label) or cls._histograms.get("http_request_seconds", {}).get(label)
+            summary[label] = {
+                "requests": cls.counter("requests_total", label) or cls.counter("http_requests_total", label),
+                "errors": cls.counter("errors_total", label),
+                "timeouts": cls.counter("timeouts_total", label),
+                "retries": cls.counter("retries_total", label),
+                "rate_limited": cls.counter("rate_limited_total", label),
+                "flood_wait": cls.counter("flood_wait_seconds_total", label),
+                "p50": histogram.quantile(0.5) if histogram else None,
+                "p95": histogram.quantile(0.95) if histogram else None,
+                "cache_hit_ratio": hits / (hits + misses) if hits + misses else None,
+                "queue": gauges.get(label, 0),
+                "parked": parked.get(label, 0),
+            }
+        return summary
+
+    @classmethod
+    def render_prometheus(cls) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines = []
+        def header(name, kind):
+            lines.append(f"# HELP {PREFIX}{name} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        def label(value):
+            escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            return f'module="{escaped}"'
+
+        for name, values in sorted(cls._counters.items()):
+            header(name, "counter")
+            lines += [f'{PREFIX}{name}{{{label(key)}}} {value:g}' for key, value in sorted(values.items())]
+        for name, values in sorted(cls._gauges().items()):
+            header(name, "gauge")
+            lines += [f'{PREFIX}{name}{{{label(key)}}} {value:g}' for key, value in sorted(values.items())]
+        for name, values in sorted(cls._histograms.items()):
+            header(name, "histogram")
+            for key, h in sorted(values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], h.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{PREFIX}{name}_bucket{{{label(key)},le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}{name}_sum{{{label(key)}}} {h.sum:g}')
+                lines.append(f'{PREFIX}{name}_count{{{label(key)}}} {h.count}')
+        return "\n".join(lines) + "\n"
@@ -1,6 +1,12 @@
 # src/core/module_loader.py
 import importlib
 from .config_loader import load_config
+from .rate_limiter import configure_rate_limiter
+from .resilience import configure_circuit_breaker
+from .log_manager import get_logger
+from .result_cache import ResultCache, DEFAULT_TTL
+
+log = get_logger("loader")
 
 _loaded_modules = {}
 _config = None
@@ -12,28 +18,32 @@ def get_config():
         _config = load_config()
     return _config
 
-async def load_modules():
+async def load_modules(config: dict | None = None):
     """
     Находит, импортирует и инициализирует все включенные в конфиге модули.
+    config — конфигурация вместо config.json (например, для бенчмарка).
     """
     if _loaded_modules:
         return # Предотвращаем повторную загрузку
 
-    config = get_config()
+    config = config or get_config()
     modules_config = config.get("modules", {})
 
     for name, module_cfg in modules_config.items():
         if module_cfg.get("enabled", False):
             try:
                 module = importlib.import_module(f"modules.{name}")
+                configure_rate_limiter(name, getattr(module, "RATE_LIMIT", None), module_cfg.get("rate_limit"))
+                configure_circuit_breaker(name, getattr(module, "RESILIENCE", None), module_cfg.get("resilience"))
+                ResultCache.set_ttl(name, module_cfg.get("cache_ttl", getattr(module, "CACHE_TTL", DEFAULT_TTL)))
                 if hasattr(module, "initialize"):
                     await module.initialize(module_cfg)
                 _loaded_modules[name] = module
-                print(f"[*] Модуль '{name}' успешно загружен.")
+                log.info("Модуль '%s' успешно загружен.", name)
             except ImportError as e:
-                print(f"[!] Ошибка импорта модуля '{name}': {e}")
+                log.error("Ошибка импорта модуля '%s': %s", name, e)
             except Exception as e:
-                print(f"[!] Ошибка инициализации модуля '{name}': {e}")
+                log.exception("Ошибка инициализации модуля '%s': %s", name, e)
 
 
 def get_loaded_modules():
@@ -46,8 +56,8 @@ async def shutdown_modules():
         if hasattr(module, "shutdown"):
             try:
                 await module.shutdown()
-                print(f"[*] Модуль '{name}' корректно остановлен.")
+                log.info("Модуль '%s' корректно остановлен.", name)
             except Exception as e:
-                print(f"[!] Ошибка при остановке модуля '{name}': {e}")
+                log.error("Ошибка при остановке модуля '%s': %s", name, e)
     _loaded_modules.clear()
-    print("[*] Все модули выгружены.")
\ No newline at end of file
+    log.info("Все модули выгружены.")
\ No newline at end of file
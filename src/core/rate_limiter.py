@@ -0,0 +1,138 @@
+# src/core/rate_limiter.py
+import asyncio
+import random
+import time
+
+from .log_manager import get_logger
+from .metrics import Metrics
+
+log = get_logger("rate_limit")
+
+# Параметры по умолчанию для модулей, не объявивших RATE_LIMIT
+DEFAULT_LIMITS = {
+    "rate": 5.0,        # Запросов в секунду
+    "burst": 5,         # Сколько запросов можно сделать разом после простоя
+    "concurrency": 5,   # Сколько запросов модуля выполняется одновременно
+    "jitter": 0.0,      # Случайная добавка к паузе перед запросом, секунды
+    "max_rate": None,   # Потолок адаптивного разгона, запросов в секунду (None — удвоенный rate)
+}
+
+class RateLimiter:
+    """
+    Адаптивный token bucket для одного модуля.
+
+    Темп понемногу растет после успешных ответов (не выше max_rate) и падает вдвое
+    при сигналах о превышении лимита (HTTP 403/429, код 6 VK, FloodWait Telegram).
+    Квоты из заголовков ответа дополнительно ограничивают темп сверху.
+    Сканер берет токен перед каждым одиночным запросом, а пакетные модули —
+    перед каждым своим HTTP-запросом и повтором.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1, concurrency: int = 1, jitter: float = 0.0,
+                 max_rate: float | None = None):
+        self.name = name
+        self.module = name.partition(":")[0] # У аккаунтов Telegram имя вида 'telegram:<сессия>'
+        self.base_rate = float(rate)
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate / 20
+        self.max_rate = self.base_rate * 2 if max_rate is None else max(self.base_rate, float(max_rate))
+        self.burst = max(1, int(burst))
+        self.concurrency = max(1, int(concurrency))
+        self.jitter = float(jitter)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._quota_rate: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _effective_rate(self) -> float:
+        if self._quota_rate is not None:
+            return min(self.rate, self._quota_rate)
+        return self.rate
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self._effective_rate())
+
+    def delay(self) -> float:
+        """Через сколько секунд можно будет сделать следующий запрос (0 — можно сразу)."""
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        tokens = min(float(self.burst), self._tokens + (now - self._updated) * self._effective_rate())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self._effective_rate()
+
+    async def acquire(self):
+        """Ждет, пока модулю можно будет сделать следующий запрос."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self._effective_rate())
+        if self.jitter:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+
+    def on_success(self):
+        """Успешный ответ: аддитивно ускоряемся, но не выше max_rate."""
+        self.rate = min(self.max_rate, self.rate + self.base_rate * 0.1)
+
+    def on_rate_limited(self, retry_after: float | None = None):
+        """Сервер сообщил о превышении лимита: вдвое снижаем темп и ставим паузу."""
+        now = time.monotonic()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._refill(now)
+        self._tokens = 0.0
+        delay = retry_after if retry_after is not None else 1 / self.rate
+        self._blocked_until = max(self._blocked_until, now + delay)
+        Metrics.inc("rate_limited_total", self.module)
+        Metrics.inc("rate_limit_wait_seconds_total", self.module, delay)
+        log.info("'%s': пауза %.1fс, новый темп %.2f запр/с.", self.name, delay, self.rate, extra={"platform": self.module})
+
+    def update_quota(self, remaining: int | None, reset_at: float | None, limit: int | None = None):
+        """
+        Учитывает остаток квоты из заголовков ответа (reset_at — unix-время сброса).
+        Когда остается меньше 10% квоты, остаток равномерно растягивается до сброса,
+        а при нулевом остатке модуль ждет сброса.
+        """
+        if remaining is None or reset_at is None:
+            return
+        window = max(reset_at - time.time(), 1.0)
+        if remaining <= 0:
+            self._quota_rate = None
+            self._blocked_until = max(self._blocked_until, time.monotonic() + window)
+            Metrics.inc("rate_limited_total", self.module)
+            Metrics.inc("rate_limit_wait_seconds_total", self.module, window)
+            log.warning("'%s': квота исчерпана, ожидание сброса %.0fс.", self.name, window, extra={"platform": self.module})
+            return
+        if limit and remaining < limit * 0.1:
+            self._quota_rate = remaining / window
+        else:
+            self._quota_rate = None
+
+
+_limiters: dict[str, RateLimiter] = {}
+
+def configure_rate_limiter(name: str, metadata: dict | None = None, overrides: dict | None = None) -> RateLimiter:
+    """
+    Создает ограничитель для модуля. Значения берутся из DEFAULT_LIMITS,
+    затем из RATE_LIMIT модуля и, наконец, из секции rate_limit его конфига.
+    """
+    params = dict(DEFAULT_LIMITS)
+    for source in (metadata, overrides):
+        if source:
+            params.update({k: v for k, v in source.items() if k in DEFAULT_LIMITS})
+    _limiters[name] = RateLimiter(name, **params)
+    return _limiters[name]
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """Возвращает ограничитель модуля, создавая его с параметрами по умолчанию при необходимости."""
+    if name not in _limiters:
+        configure_rate_limiter(name)
+    return _limiters[name]
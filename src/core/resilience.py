@@ -0,0 +1,187 @@
+# src/core/resilience.py
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+
+from .log_manager import get_logger
+from .metrics import Metrics
+
+T = TypeVar("T")
+
+# Параметры по умолчанию для модулей, не объявивших RESILIENCE
+DEFAULT_RESILIENCE = {
+    "attempts": 4,               # Сколько раз пробовать запрос, включая первый
+    "backoff": 1.0,              # Пауза перед первым повтором, секунды; дальше удваивается
+    "max_backoff": 60.0,         # Потолок паузы между повторами
+    "failure_threshold": 5,      # Сколько сбоев подряд размыкают автомат
+    "reset_timeout": 30.0,       # Сколько автомат разомкнут в первый раз; при повторных срабатываниях — вдвое дольше
+    "max_reset_timeout": 600.0,  # Потолок паузы автомата (и Retry-After, который он соблюдает)
+}
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+log = get_logger("resilience")
+
+class RetryableError(Exception):
+    """Временный сбой, после которого запрос стоит повторить (лимит, 5xx, обрыв соединения)."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+# Исключения, которые считаются временными сами по себе
+RETRYABLE_ERRORS = (RetryableError, asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Значение заголовка Retry-After в секундах (дату HTTP сервисы модулей не присылают)."""
+    try:
+        return max(float(value), 0.0) if value else None
+    except ValueError:
+        return None
+
+class CircuitBreaker:
+    """
+    Повторы с экспоненциальной паузой и автомат-предохранитель одного модуля.
+
+    После failure_threshold временных сбоев подряд автомат размыкается: новые
+    и повторные запросы модуля не отправляются, а ждут (работа откладывается,
+    а не сжигается на ошибках). По истечении паузы проходит один пробный запрос:
+    успех замыкает автомат, сбой размыкает его снова на удвоенное время.
+    """
+
+    def __init__(self, name: str, attempts: int = 4, backoff: float = 1.0, max_backoff: float = 60.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, max_reset_timeout: float = 600.0):
+        self.name = name
+        self.attempts = max(1, int(attempts))
+        self.backoff = float(backoff)
+        self.max_backoff = float(max_backoff)
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.max_reset_timeout = float(max_reset_timeout)
+        self.state = BREAKER_CLOSED
+        self.parked = 0 # Сколько запросов сейчас ждут замыкания автомата
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def backoff_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Пауза перед повтором: Retry-After сервера, иначе экспонента со случайной долей."""
+        if retry_after is not None:
+            return min(retry_after, self.max_reset_timeout)
+        return min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    async def _admit(self) -> bool:
+        """Ждет, пока запрос можно отправить; True — это пробный запрос полуоткрытого автомата."""
+        if self.state == BREAKER_CLOSED:
+            return False
+        self.parked += 1
+        try:
+            while True:
+                if self.state == BREAKER_CLOSED:
+                    return False
+                if self.state == BREAKER_OPEN:
+                    if (wait := self._open_until - time.monotonic()) > 0:
+                        changed = self._changed
+                        try:
+                            await asyncio.wait_for(changed.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    self.state = BREAKER_HALF_OPEN
+                    return True
+                await self._changed.wait() # Пробный запрос уже отправлен, ждем его исхода
+        finally:
+            self.parked -= 1
+
+    def _on_success(self, probe: bool):
+        self._failures = 0
+        if probe or self.state != BREAKER_CLOSED:
+            self._trips = 0
+            self.state = BREAKER_CLOSED
+            log.info("Автомат замкнут, отложенные запросы продолжаются.", extra={"platform": self.name})
+            self._notify()
+
+    def _on_failure(self, retry_after: float | None, probe: bool):
+        self._failures += 1
+        if not probe and (self.state != BREAKER_CLOSED or self._failures < self.failure_threshold):
+            return
+        pause = min(self.max_reset_timeout, max(self.reset_timeout * 2 ** self._trips, retry_after or 0.0))
+        self._trips += 1
+        self._open_until = time.monotonic() + pause
+        self.state = BREAKER_OPEN
+        Metrics.inc("circuit_trips_total", self.name)
+        log.warning("Автомат разомкнут после %d сбоев подряд: запросы отложены на %.1fс.", self._failures, pause,
+                    extra={"platform": self.name, "status": BREAKER_OPEN})
+        self._notify()
+
+    def _release_probe(self):
+        # Пробный запрос прервался не временным сбоем: даем пробу следующему
+        if self.state == BREAKER_HALF_OPEN:
+            self.state = BREAKER_OPEN
+            self._notify()
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполняет attempt() с повторами при временных сбоях (RETRYABLE_ERRORS).
+        Когда попытки исчерпаны, пробрасывает последнее исключение.
+        """
+        for number in range(1, self.attempts + 1):
+            probe = await self._admit()
+            try:
+                result = await attempt()
+            except RETRYABLE_ERRORS as e:
+                retry_after = getattr(e, "retry_after", None)
+                self._on_failure(retry_after, probe)
+                if number == self.attempts:
+                    raise
+                Metrics.inc("retries_total", self.name)
+                await asyncio.sleep(self.backoff_delay(number, retry_after))
+            except BaseException:
+                if probe:
+                    self._release_probe()
+                raise
+            else:
+                self._on_success(probe)
+                return result
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+def configure_circuit_breaker(name: str, metadata: dict | None = None, overrides: dict | None = None) -> CircuitBreaker:
+    """
+    Создает автомат модуля. Значения берутся из DEFAULT_RESILIENCE,
+    затем из RESILIENCE модуля и, наконец, из секции resilience его конфига.
+    """
+    params = dict(DEFAULT_RESILIENCE)
+    for source in (metadata, overrides):
+        if source:
+            params.update({k: v for k, v in source.items() if k in DEFAULT_RESILIENCE})
+    _breakers[name] = CircuitBreaker(name, **params)
+    return _breakers[name]
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Возвращает автомат модуля, создавая его с параметрами по умолчанию при необходимости."""
+    if name not in _breakers:
+        configure_circuit_breaker(name)
+    return _breakers[name]
+
+async def with_retry(name: str, attempt: Callable[[], Awaitable[T]]) -> T:
+    """Выполняет attempt() через автомат модуля name."""
+    return await get_circuit_breaker(name).call(attempt)
+
+def _breaker_gauges():
+    for name, breaker in _breakers.items():
+        yield ("circuit_open", name, 0 if breaker.state == BREAKER_CLOSED else 1)
+        yield ("circuit_parked", name, breaker.parked)
+
+Metrics.add_collector(_breaker_gauges)
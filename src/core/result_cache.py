@@ -0,0 +1,141 @@
+# src/core/result_cache.py
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from .log_manager import get_logger
+
+CACHE_PATH = Path(__file__).resolve().parents[1] / "data" / "result_cache.sqlite3"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 100_000
+COMMIT_INTERVAL = 2.0  # Как часто фиксировать накопленные записи на диске, секунды
+EVICT_TO_RATIO = 0.9   # До какой доли max_entries вытеснять, чтобы не считать записи на каждой вставке
+
+log = get_logger("cache")
+
+def normalize_username(username: str) -> str:
+    """Ключ кэша: ники на всех платформах нечувствительны к регистру."""
+    return username.strip().lstrip("@").lower()
+
+class ResultCache:
+    """
+    Локальный кэш сырых ответов модулей с ключом (модуль, ник).
+    Хранит и найденные профили, и отрицательные ответы ("ник не занят"),
+    у каждого модуля свой срок жизни записей, при переполнении вытесняются
+    давно не использованные записи (LRU). Запись идет в потоке цикла событий,
+    поэтому транзакции фиксируются не чаще раза в COMMIT_INTERVAL секунд,
+    а число записей ведется счетчиком и пересчитывается только при переполнении.
+    Пока кэш не инициализирован, он просто ничего не находит и не сохраняет.
+    """
+    _conn: sqlite3.Connection | None = None
+    _ttls: dict[str, float] = {}
+    _max_entries: int = DEFAULT_MAX_ENTRIES
+    _entries: int = 0 # Оценка сверху: замененные записи тоже прибавляются
+    _last_commit: float = 0.0
+
+    @classmethod
+    def initialize(cls, config: dict | None = None):
+        """Открывает файл кэша. Параметры: enabled, path, max_entries."""
+        config = config or {}
+        if cls._conn is not None or not config.get("enabled", True):
+            return
+        path = Path(config.get("path") or CACHE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cls._max_entries = int(config.get("max_entries", DEFAULT_MAX_ENTRIES))
+        cls._conn = sqlite3.connect(path)
+        cls._conn.execute("PRAGMA journal_mode=WAL")
+        cls._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " module TEXT NOT NULL, username TEXT NOT NULL, payload TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (module, username))"
+        )
+        cls._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+        cls._conn.commit()
+        (cls._entries,) = cls._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        cls._last_commit = time.monotonic()
+        log.info("Кэш результатов открыт: %s", path)
+
+    @classmethod
+    def close(cls):
+        if cls._conn is not None:
+            cls._conn.commit()
+            cls._conn.close()
+            cls._conn = None
+            log.info("Кэш результатов закрыт.")
+
+    @classmethod
+    def set_ttl(cls, module: str, ttl: float):
+        cls._ttls[module] = float(ttl)
+
+    @classmethod
+    def get_many(cls, module: str, usernames: list[str]) -> dict[str, dict | None]:
+        """
+        Возвращает свежие записи для ников модуля: {ник: ответ}.
+        None в качестве значения — закэшированный отрицательный ответ.
+        Ники без свежей записи в результат не попадают.
+        """
+        if cls._conn is None or not usernames:
+            return {}
+        ttl = cls._ttls.get(module, DEFAULT_TTL)
+        if ttl <= 0:
+            return {}
+        now = time.time()
+        keys = {normalize_username(u): u for u in usernames}
+        found = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), 500): # Ограничение SQLite на число параметров
+            batch = key_list[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = cls._conn.execute(
+                f"SELECT username, payload FROM results WHERE module = ? AND stored_at >= ? AND username IN ({placeholders})",
+                (module, now - ttl, *batch),
+            ).fetchall()
+            for key, payload in rows:
+                found[keys[key]] = json.loads(payload)
+        if found:
+            cls._conn.executemany(
+                "UPDATE results SET accessed_at = ? WHERE module = ? AND username = ?",
+                [(now, module, normalize_username(u)) for u in found],
+            )
+            cls._commit_if_due()
+        return found
+
+    @classmethod
+    def put_many(cls, module: str, results: dict[str, dict | None]):
+        """Сохраняет ответы модуля ({ник: ответ или None}); ответы с ошибкой не кэшируются."""
+        if cls._conn is None or cls._ttls.get(module, DEFAULT_TTL) <= 0:
+            return
+        now = time.time()
+        rows = [
+            (module, normalize_username(username), json.dumps(data, ensure_ascii=False, default=str), now, now)
+            for username, data in results.items()
+            if not (data and data.get("error"))
+        ]
+        if not rows:
+            return
+        cls._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows)
+        cls._entries += len(rows)
+        if cls._entries > cls._max_entries:
+            cls._evict()
+        cls._commit_if_due()
+
+    @classmethod
+    def _commit_if_due(cls):
+        if time.monotonic() - cls._last_commit >= COMMIT_INTERVAL:
+            cls._conn.commit()
+            cls._last_commit = time.monotonic()
+
+    @classmethod
+    def _evict(cls):
+        """Пересчитывает записи и, если их больше max_entries, вытесняет старые до EVICT_TO_RATIO от предела."""
+        (count,) = cls._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        if count > cls._max_entries:
+            excess = count - int(cls._max_entries * EVICT_TO_RATIO)
+            cls._conn.execute(
+                "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            count -= excess
+        cls._entries = count
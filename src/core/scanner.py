@@ -1,144 +1,550 @@
 # src/core/scanner.py
 import asyncio
-import random
-from typing import List, Coroutine, Callable, Dict, Any
+import time
+from collections import Counter, deque
+from typing import List, Coroutine, Callable, Dict, Any, AsyncIterable, AsyncIterator, Iterable, Iterator
 
+from .log_manager import get_logger
+from .metrics import Metrics, current_module
 from .module_loader import get_loaded_modules
+from .rate_limiter import get_rate_limiter
+from .resilience import with_retry
+from .result_cache import ResultCache, normalize_username
+from .single_flight import SingleFlight
 
 # Определяем стратегии для модулей
 STRATEGY_BULK = "bulk"
 STRATEGY_PARALLEL = "parallel"
 STRATEGY_SEQUENTIAL = "sequential"
 
-# Карта стратегий для известных модулей
-MODULE_STRATEGIES = {
-    "vk": STRATEGY_BULK,
-    "telegram": STRATEGY_SEQUENTIAL,
-    "github": STRATEGY_PARALLEL,
+# Таймаут одиночного запроса по стратегии. Последовательным модулям (Telegram)
+# нужен запас на ожидание FloodWait внутри самого запроса.
+SCAN_TIMEOUTS = {
+    STRATEGY_PARALLEL: 20.0,
+    STRATEGY_SEQUENTIAL: 60.0,
 }
 
+SESSION_BATCH_SIZE = 500       # Сколько ников сессия читает из входного потока за раз
+MODULE_QUEUE_SIZE = 1000       # Сколько ников ждут в очереди модуля
+BULK_LINGER = 0.2              # Сколько пакетная порция ждет добора до BULK_BATCH_SIZE модуля, секунды
+RESULT_QUEUE_SIZE = 256        # Сколько результатов ждут потребителя, прежде чем сканирование притормозит
+MAX_WORKERS_PER_MODULE = 32
+_END = object() # Маркер конца очереди
+
+log = get_logger("scanner")
+
+# Общий для всех сессий процесса: одновременные запросы одного ника
+# к одному модулю (из разных сканов или разных базовых ников) выполняются один раз
+_inflight = SingleFlight()
+
 # --- Вспомогательные функции для каждой стратегии ---
 
-async def _process_bulk_modules(modules: dict, usernames: list[str], result_callback: Callable, progress_callback: Callable):
-    """Обрабатывает модули, поддерживающие пакетные запросы (VK)."""
-    tasks = []
-    for name, module in modules.items():
-        print(f"[*] Создание пакетной задачи для модуля '{name}'...")
-        task = asyncio.create_task(module.scan_bulk(usernames))
-        tasks.append((name, task))
+def _cache_chunk(name: str, chunk: list[str], chunk_result: dict):
+    """
+    Кэширует ответ пакетного запроса: ники пачки, не вошедшие в ответ, считаются не найденными.
+    Если в ответе есть профиль, не сопоставленный ни одному нику пачки (например, запрошенный
+    по старому адресу), отрицательные ответы не кэшируются: любой из пропавших ников мог быть им.
+    """
+    chunk_keys = {normalize_username(u) for u in chunk}
+    found_keys = {normalize_username(u) for u in chunk_result}
+    negatives = {}
+    if found_keys <= chunk_keys:
+        negatives = {u: None for u in chunk if normalize_username(u) not in found_keys}
+    ResultCache.put_many(name, {**chunk_result, **negatives})
+
 
-    for name, task in tasks:
+async def _scan_bulk_batch(name: str, module, usernames: list[str], emit: Callable, complete: Callable[[list[str]], None]):
+    """
+    Пакетный запрос одной порции ников к модулю (VK).
+    Если модуль отдает результаты потоком (scan_bulk_stream), каждая пачка
+    передается дальше сразу по готовности. complete() получает обработанные ники:
+    каждый ник порции ровно один раз, даже если модуль по нему ничего не вернул.
+    """
+    current_module.set(name) # Задача исполнителя своя, поэтому сбрасывать метку не нужно
+    # Ники, которые этот модуль уже ищет в другом вызове, не запрашиваем повторно
+    owned, shared = [], {}
+    for username in usernames:
+        future, is_owner = _inflight.claim((name, normalize_username(username)))
+        if is_owner:
+            owned.append(username)
+        else:
+            shared[username] = future
+
+    async def wait_shared(username, future):
         try:
-            bulk_result = await task
-            for username, data in bulk_result.items():
-                if data and not data.get('error'):
-                    await result_callback({'username': username, name: data})
+            await emit(name, username, await _inflight.wait(future))
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            print(f"[SCANNER CRITICAL] Ошибка в пакетной задаче '{name}': {e}")
+            log.warning("Исключение: %s", e, extra={"platform": name, "username": username})
         finally:
-            progress_callback() # Один вызов на весь модуль
+            complete([username])
 
+    def settle(chunk, chunk_result):
+        by_key = {normalize_username(u): data for u, data in chunk_result.items()}
+        for username in chunk:
+            _inflight.resolve((name, normalize_username(username)), by_key.get(normalize_username(username)))
 
-async def _process_parallel_modules(modules: dict, usernames: list[str], result_callback: Callable, progress_callback: Callable):
-    """Обрабатывает модули, допускающие параллельные запросы с ограничением (GitHub)."""
-    semaphore = asyncio.Semaphore(10) # Ограничение на 10 одновременных запросов
-    tasks = []
+    async def fetch_owned():
+        if not owned:
+            return
+        log.debug("Пакетная задача на %d ников.", len(owned), extra={"platform": name})
+        error = None
+        reported = set()
+        try:
+            if not hasattr(module, 'scan_bulk_stream'):
+                try:
+                    bulk_result = await module.scan_bulk(owned)
+                    _cache_chunk(name, owned, bulk_result)
+                    settle(owned, bulk_result)
+                    for username, data in bulk_result.items():
+                        await emit(name, username, data)
+                finally:
+                    reported.update(owned)
+                    complete(owned)
+                return
 
-    async def scan_with_semaphore(username, name, module):
-        async with semaphore:
-            try:
-                data = await asyncio.wait_for(module.scan(username), timeout=20.0)
-                if data and not data.get('error'):
-                    await result_callback({'username': username, name: data})
-            except asyncio.TimeoutError:
-                print(f"[{name.upper()}] Таймаут для '{username}'")
-            except Exception as e:
-                print(f"[{name.upper()}] Исключение для '{username}': {e}")
-            finally:
-                progress_callback()
+            async for chunk, chunk_result in module.scan_bulk_stream(owned):
+                try:
+                    if failed := sum(1 for data in chunk_result.values() if data and data.get('error')):
+                        Metrics.inc("errors_total", name, failed)
+                    _cache_chunk(name, chunk, chunk_result)
+                    settle(chunk, chunk_result)
+                    for username, data in chunk_result.items():
+                        await emit(name, username, data)
+                finally:
+                    reported.update(chunk)
+                    complete(chunk)
+        except asyncio.CancelledError as e:
+            error = e
+            raise
+        except Exception as e:
+            error = e
+            log.exception("Ошибка в пакетной задаче: %s", e, extra={"platform": name})
+        finally:
+            # Ники, по которым ответ так и не пришел, не должны подвесить ожидающих
+            for username in owned:
+                _inflight.reject((name, normalize_username(username)), error or RuntimeError("Пакетный запрос не вернул ответ"))
+            # Модуль мог вернуть не все пачки (например, VK без токена не делает запросов)
+            if rest := [u for u in owned if u not in reported]:
+                complete(rest)
 
-    for name, module in modules.items():
-        for username in usernames:
-            task = asyncio.create_task(scan_with_semaphore(username, name, module))
-            tasks.append(task)
-    
-    if tasks:
-        await asyncio.gather(*tasks)
+    await asyncio.gather(fetch_owned(), *(wait_shared(u, f) for u, f in shared.items()))
 
 
-async def _process_sequential_modules(modules: dict, usernames: list[str], result_callback: Callable, progress_callback: Callable):
-    """Обрабатывает модули, требующие последовательных запросов с задержкой (Telegram)."""
-    queue = asyncio.Queue()
-    for name, module in modules.items():
-        for username in usernames:
-            await queue.put((username, name, module))
+async def _scan_single(name: str, module, username: str, timeout: float, emit: Callable):
+    """Запрос одного ника к модулю, выполняющему запрос на каждый ник (GitHub без токена, Telegram)."""
+    limiter = get_rate_limiter(name)
+    current_module.set(name)
 
-    if queue.empty():
-        return
+    async def attempt():
+        await limiter.acquire()
+        started = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(module.scan(username), timeout=timeout)
+        except asyncio.TimeoutError:
+            Metrics.inc("timeouts_total", name) # Каждая попытка, даже если повтор затем удастся
+            raise
+        finally:
+            # Задержка меряется без ожидания ограничителя: только сам запрос к платформе
+            latency = time.perf_counter() - started
+            Metrics.inc("requests_total", name)
+            Metrics.observe("request_seconds", name, latency)
+        log.debug("Запрос выполнен.", extra={
+            "platform": name, "username": username, "latency": latency,
+            "status": "error" if data and data.get('error') else "found" if data else "not_found",
+        })
+        return data
+
+    async def fetch():
+        # Локальный кэш модуля (сущности Telegram) проверяется до ограничителя: попадание не ждет темпа
+        if not hasattr(module, 'scan_cached') or (data := module.scan_cached(username)) is None:
+            # Временные сбои повторяются, а при разомкнутом автомате модуля запрос ждет его замыкания
+            data = await with_retry(name, attempt)
+        if data and data.get('error'):
+            Metrics.inc("errors_total", name)
+        ResultCache.put_many(name, {username: data})
+        return data
 
-    # Запускаем одного медленного исполнителя (worker)
-    async def worker():
-        while not queue.empty():
-            username, name, module = await queue.get()
-            try:
-                data = await asyncio.wait_for(module.scan(username), timeout=60.0)
-                if data and not data.get('error'):
-                    await result_callback({'username': username, name: data})
-            except asyncio.TimeoutError:
-                print(f"[{name.upper()}] Таймаут для '{username}'")
-            except Exception as e:
-                print(f"[{name.upper()}] Исключение для '{username}': {e}")
-            finally:
-                progress_callback()
-                queue.task_done()
-                # ИЗМЕНЕНИЕ: Уменьшена базовая задержка для быстрой работы
-                base_delay = 1.0  # Устанавливаем базовую паузу в 1 секунду
-                jitter = random.uniform(0.5, 1.2) # Добавляем небольшую случайность
-                total_delay = base_delay + jitter
-                # Убираем лог паузы, чтобы не засорять вывод
-                await asyncio.sleep(total_delay)
-    
-    worker_task = asyncio.create_task(worker())
-    await queue.join()
-    worker_task.cancel()
     try:
-        await worker_task
+        await emit(name, username, await _inflight.run((name, normalize_username(username)), fetch))
+    except asyncio.TimeoutError:
+        log.info("Таймаут запроса.", extra={"platform": name, "username": username, "status": "timeout"})
     except asyncio.CancelledError:
-        pass
+        raise
+    except Exception as e:
+        Metrics.inc("errors_total", name)
+        log.warning("Исключение: %s", e, extra={"platform": name, "username": username})
 
 
-async def run_scan_session(usernames: List[str], result_callback: Callable[[Dict[str, Any]], Coroutine], progress_callback: Callable[[], None]):
+def get_module_strategy(module) -> str:
     """
-    Основная функция сканирования, управляющая различными стратегиями.
+    Возвращает стратегию модуля: get_strategy() (если выбор зависит от конфигурации),
+    иначе атрибут STRATEGY, иначе параллельная по умолчанию.
     """
-    all_modules = get_loaded_modules()
-    if not all_modules:
-        print("[SCANNER] Нет загруженных модулей для сканирования.")
-        return
+    if hasattr(module, 'get_strategy'):
+        return module.get_strategy()
+    return getattr(module, 'STRATEGY', STRATEGY_PARALLEL)
 
+
+def get_username_validator(module) -> Callable[[str], bool]:
+    """
+    Возвращает проверку допустимости ника на платформе модуля: функцию is_valid_username(),
+    иначе скомпилированный USERNAME_PATTERN, иначе допустим любой ник.
+    """
+    if hasattr(module, 'is_valid_username'):
+        return module.is_valid_username
+    if (pattern := getattr(module, 'USERNAME_PATTERN', None)) is not None:
+        return lambda username: pattern.fullmatch(username) is not None
+    return lambda username: True
+
+
+def partition_usernames(modules: dict, usernames: List[str]) -> dict[str, list[str]]:
+    """Раскладывает ники по модулям: каждому достаются только допустимые на его платформе."""
+    return {name: list(filter(get_username_validator(module), usernames)) for name, module in modules.items()}
+
+
+def any_module_accepts(modules: dict | None = None) -> Callable[[str], bool]:
+    """Проверка для генератора вариаций: ник допустим хотя бы на одной из платформ."""
+    validators = [get_username_validator(module) for module in (get_loaded_modules() if modules is None else modules).values()]
+    return lambda username: any(is_valid(username) for is_valid in validators)
+
+
+def _split_modules_by_strategy(all_modules: dict) -> tuple[dict, dict, dict]:
+    """Распределяет модули по стратегиям: (пакетные, параллельные, последовательные)."""
     bulk_modules = {}
     parallel_modules = {}
     sequential_modules = {}
 
     for name, module in all_modules.items():
-        strategy = MODULE_STRATEGIES.get(name, STRATEGY_PARALLEL)
+        strategy = get_module_strategy(module)
         if strategy == STRATEGY_BULK and hasattr(module, 'scan_bulk'):
             bulk_modules[name] = module
         elif strategy == STRATEGY_SEQUENTIAL and hasattr(module, 'scan'):
             sequential_modules[name] = module
         elif hasattr(module, 'scan'):
             parallel_modules[name] = module
+    return bulk_modules, parallel_modules, sequential_modules
+
+
+def _batched(usernames: Iterable[str], batch_size: int) -> Iterator[list[str]]:
+    """Порции ников в том виде, в каком их сканирует ScanSession: без пустых строк и повторов внутри порции."""
+    batch = []
+    for username in usernames:
+        if username := username.strip():
+            batch.append(username)
+        if len(batch) >= batch_size:
+            yield list(dict.fromkeys(batch))
+            batch = []
+    if batch:
+        yield list(dict.fromkeys(batch))
+
+
+def count_progress_steps(usernames: List[str], batch_size: int = SESSION_BATCH_SIZE) -> int:
+    """
+    Возвращает сумму, которую наберут аргументы progress_callback за сессию сканирования
+    с тем же batch_size: прогресс считается в парах (модуль, ник), включая ответы из кэша.
+    """
+    bulk_modules, parallel_modules, sequential_modules = _split_modules_by_strategy(get_loaded_modules())
+    modules = {**bulk_modules, **parallel_modules, **sequential_modules}
+    return sum(
+        len(valid)
+        for batch in _batched(usernames, max(1, batch_size))
+        for valid in partition_usernames(modules, batch).values()
+    )
+
+
+class _BulkBuffer:
+    """
+    Накопитель ников пакетного модуля. Порция отдается, когда набралось limit ников,
+    входной поток закончился или с начала ожидания прошло BULK_LINGER секунд: пока идет
+    один пакетный запрос, следующий успевает набрать полную порцию.
+    """
+
+    def __init__(self, limit: int, capacity: int):
+        self.limit = max(1, limit)
+        self.capacity = max(capacity, self.limit)
+        self._names: list[str] = []
+        self._closed = False
+        self._changed = asyncio.Condition()
+
+    def qsize(self) -> int:
+        return len(self._names)
 
-    print(f"\n[SCANNER] Начинаем сессию сканирования для {len(usernames)} ников.")
-    print(f"[SCANNER] Стратегии: Пакетные({len(bulk_modules)}), Параллельные({len(parallel_modules)}), Последовательные({len(sequential_modules)})")
+    async def put(self, names: list[str]):
+        async with self._changed:
+            await self._changed.wait_for(lambda: len(self._names) < self.capacity)
+            self._names.extend(names)
+            self._changed.notify_all()
+
+    async def close(self):
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    async def take(self) -> list[str] | None:
+        """Следующая порция; None — входной поток закончился и все ники разобраны."""
+        async with self._changed:
+            while True:
+                await self._changed.wait_for(lambda: self._names or self._closed)
+                if not self._names:
+                    return None
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: len(self._names) >= self.limit or self._closed), BULK_LINGER)
+                except asyncio.TimeoutError:
+                    pass
+                if self._names: # Порцию мог забрать другой исполнитель, пока этот ждал
+                    batch, self._names = self._names[:self.limit], self._names[self.limit:]
+                    self._changed.notify_all()
+                    return batch
+
+
+class ScanSession:
+    """
+    Потоковая сессия сканирования.
+
+    Ники читаются из обычного или асинхронного итератора порциями по batch_size, найденные
+    профили отдаются асинхронным генератором (async for item in session). Пакетные модули
+    получают ники порциями до BULK_BATCH_SIZE модуля, остальные — через пул исполнителей;
+    число исполнителей модуля равно его concurrency. Очереди между этапами ограничены,
+    поэтому медленный потребитель результатов притормаживает сканирование, а память
+    не растет с длиной входного потока.
+
+    Асинхронный источник может отдавать и списки ников: список сразу уходит
+    на сканирование отдельной порцией, не дожидаясь batch_size ников (так долгоживущий
+    источник не держит ники, пока новых нет). done_callback(ник) вызывается, когда ник
+    обработан всеми модулями, которым он подходит, и все его профили уже отданы потребителю.
+    """
+
+    def __init__(self, usernames: Iterable[str] | AsyncIterable[str | list[str]], progress_callback: Callable[[int], None] | None = None,
+                 batch_size: int = SESSION_BATCH_SIZE, queue_size: int = RESULT_QUEUE_SIZE,
+                 done_callback: Callable[[str], None] | None = None, module_queue_size: int | None = None):
+        self._usernames = usernames
+        self._progress = progress_callback or (lambda count: None)
+        self._done = done_callback or (lambda username: None)
+        self._pending: Counter[str] = Counter() # Сколько модулей еще не обработали ник
+        self._yielded = 0 # Сколько профилей получил потребитель
+        self._done_after: deque[tuple[int, str]] = deque() # (сколько профилей нужно отдать, ник)
+        self.batch_size = max(1, batch_size)
+        self.module_queue_size = module_queue_size # None — MODULE_QUEUE_SIZE, но не меньше пакетной порции
+        self._results: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self._unpaused = asyncio.Event()
+        self._unpaused.set()
+        self._task: asyncio.Task | None = None
+        self._error: BaseException | None = None
+        self.cancelled = False
+        self.finished = False
+        self.consumed = 0 # Сколько ников прочитано из входного потока
+        self.found = 0
+
+    @property
+    def paused(self) -> bool:
+        return not self._unpaused.is_set()
+
+    def pause(self):
+        """Новые запросы не начинаются до resume(); уже отправленные завершаются."""
+        self._unpaused.clear()
+
+    def resume(self):
+        self._unpaused.set()
+
+    def cancel(self):
+        """Останавливает сессию: идущие запросы отменяются, генератор результатов завершается."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self._unpaused.set()
+        if self._task is not None:
+            self._task.cancel()
+        # Непрочитанные результаты больше не нужны, а потребителя нужно разбудить
+        while not self._results.empty():
+            self._results.get_nowait()
+        self._results.put_nowait(_END)
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self.results()
+
+    async def results(self) -> AsyncIterator[Dict[str, Any]]:
+        """Асинхронный генератор найденных профилей вида {'username': ..., '<модуль>': data}."""
+        if self._task is None and not self.cancelled:
+            self._task = asyncio.create_task(self._run())
+        try:
+            while (item := await self._results.get()) is not _END:
+                yield item
+                self._yielded += 1
+                while self._done_after and self._done_after[0][0] <= self._yielded:
+                    self._done(self._done_after.popleft()[1])
+        finally:
+            # Потребитель вышел из цикла раньше времени — останавливаем сканирование
+            if not self.finished:
+                self.cancel()
+        if self._error is not None:
+            raise self._error
+
+    async def _emit(self, name: str, username: str, data):
+        if data and not data.get('error'):
+            self.found += 1
+            Metrics.inc("results_total", name)
+            await self._results.put({'username': username, name: data})
+
+    async def _iter_usernames(self) -> AsyncIterator[str]:
+        if hasattr(self._usernames, '__aiter__'):
+            async for username in self._usernames:
+                yield username
+        else:
+            for username in self._usernames:
+                yield username
+
+    async def _batches(self) -> AsyncIterator[list[str]]:
+        """Режет входной поток на порции без повторов внутри порции (так же, как _batched)."""
+        batch = []
+        async for username in self._iter_usernames():
+            if isinstance(username, list):
+                if batch := list(dict.fromkeys(filter(None, (u.strip() for u in [*batch, *username])))):
+                    yield batch
+                batch = []
+                continue
+            if username := username.strip():
+                batch.append(username)
+            if len(batch) >= self.batch_size:
+                yield list(dict.fromkeys(batch))
+                batch = []
+        if batch:
+            yield list(dict.fromkeys(batch))
+
+    async def _run(self):
+        all_modules = get_loaded_modules()
+        try:
+            if not all_modules:
+                log.warning("Нет загруженных модулей для сканирования.")
+                return
+            bulk_modules, parallel_modules, sequential_modules = _split_modules_by_strategy(all_modules)
+            single_modules = {**parallel_modules, **sequential_modules}
+            log.info("Начинаем сессию сканирования. Стратегии: пакетные (%d), параллельные (%d), последовательные (%d).",
+                     len(bulk_modules), len(parallel_modules), len(sequential_modules))
+
+            # Пакетные модули забирают ники из накопителя порциями, остальные — по одному из очереди
+            bulk_limits = {name: getattr(module, 'BULK_BATCH_SIZE', SESSION_BATCH_SIZE) for name, module in bulk_modules.items()}
+            queues = {name: _BulkBuffer(limit, self.module_queue_size or MODULE_QUEUE_SIZE) for name, limit in bulk_limits.items()}
+            # Очередь одиночного модуля вмещает полную пакетную порцию: иначе медленный
+            # модуль (Telegram) притормозит чтение входа и пакетный не наберет порцию
+            single_queue_size = self.module_queue_size or max([MODULE_QUEUE_SIZE, *bulk_limits.values()])
+            queues.update({name: asyncio.Queue(maxsize=single_queue_size) for name in single_modules})
+            workers = {name: min(get_rate_limiter(name).concurrency, MAX_WORKERS_PER_MODULE) for name in {**bulk_modules, **single_modules}}
+            consumers = []
+            for name, module in bulk_modules.items():
+                consumers += [self._bulk_worker(name, module, queues[name]) for _ in range(workers[name])]
+            for name, module in single_modules.items():
+                timeout = SCAN_TIMEOUTS.get(get_module_strategy(module), SCAN_TIMEOUTS[STRATEGY_PARALLEL])
+                consumers += [self._single_worker(name, module, queues[name], timeout) for _ in range(workers[name])]
+
+            async def feed():
+                try:
+                    async for batch in self._batches():
+                        await self._unpaused.wait()
+                        self.consumed += len(batch)
+                        await self._dispatch(batch, bulk_modules, single_modules, queues)
+                finally:
+                    for name in bulk_modules:
+                        await queues[name].close()
+                    for name in single_modules:
+                        for _ in range(workers[name]):
+                            await queues[name].put(_END)
+
+            def queue_depths():
+                yield ("result_queue_depth", "session", self._results.qsize())
+                for name, queue in queues.items():
+                    yield ("queue_depth", name, queue.qsize())
+
+            Metrics.add_collector(queue_depths)
+            tasks = [asyncio.create_task(coro) for coro in (feed(), *consumers)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                Metrics.remove_collector(queue_depths)
+                for task in tasks:
+                    task.cancel()
+            log.info("Сессия завершена: прочитано ников %d, найдено профилей %d.", self.consumed, self.found)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._error = e
+        finally:
+            self.finished = True
+            if not self.cancelled:
+                await self._results.put(_END)
+
+    def _finish(self, username: str):
+        # Профили ника уже в очереди результатов: сообщаем о нем, когда потребитель их заберет
+        if self.found <= self._yielded:
+            self._done(username)
+        else:
+            self._done_after.append((self.found, username))
+
+    def _complete(self, usernames: list[str]):
+        """Засчитывает ники, обработанные одним модулем."""
+        self._progress(len(usernames))
+        for username in usernames:
+            self._pending[username] -= 1
+            if self._pending[username] <= 0:
+                del self._pending[username]
+                self._finish(username)
+
+    async def _dispatch(self, batch: list[str], bulk_modules: dict, single_modules: dict, queues: dict):
+        """Отдает порцию модулям: недопустимые ники пропускаются, ответы из кэша выдаются сразу."""
+        valid_by_module = partition_usernames({**bulk_modules, **single_modules}, batch)
+        for valid in valid_by_module.values():
+            self._pending.update(valid)
+        for username in batch:
+            if username not in self._pending: # Ник не подходит ни одной платформе
+                self._finish(username)
+        for name, valid in valid_by_module.items():
+            if skipped := len(batch) - len(valid):
+                Metrics.inc("skipped_invalid_total", name, skipped)
+            cached = ResultCache.get_many(name, valid)
+            Metrics.inc("cache_hits_total", name, len(cached))
+            Metrics.inc("cache_misses_total", name, len(valid) - len(cached))
+            for username, data in cached.items():
+                if data:
+                    await self._emit(name, username, data)
+            if cached:
+                self._complete(list(cached))
+            missing = [u for u in valid if u not in cached]
+            if name in bulk_modules:
+                if missing:
+                    await queues[name].put(missing)
+            else:
+                for username in missing:
+                    await queues[name].put(username)
+
+    async def _bulk_worker(self, name: str, module, buffer: _BulkBuffer):
+        while (usernames := await buffer.take()) is not None:
+            await self._unpaused.wait()
+            # В накопитель попадают ники из разных порций входа; повтор в одном запросе не нужен
+            if len(unique := list(dict.fromkeys(usernames))) < len(usernames):
+                self._complete(list((Counter(usernames) - Counter(unique)).elements()))
+                usernames = unique
+            await _scan_bulk_batch(name, module, usernames, self._emit, self._complete)
+
+    async def _single_worker(self, name: str, module, queue: asyncio.Queue, timeout: float):
+        while (username := await queue.get()) is not _END:
+            await self._unpaused.wait()
+            try:
+                await _scan_single(name, module, username, timeout, self._emit)
+            finally:
+                self._complete([username])
+
+
+async def run_scan_session(usernames: Iterable[str] | AsyncIterable[str], result_callback: Callable[[Dict[str, Any]], Coroutine], progress_callback: Callable[[int], None]):
+    """
+    Сканирует ники и передает каждый найденный профиль в result_callback.
+    Ники, недопустимые на платформе модуля, ему не передаются. Ответы из кэша
+    отдаются сразу, в сеть уходят только ники без свежей записи.
+    """
+    async for item in ScanSession(usernames, progress_callback):
+        await result_callback(item)
 
-    main_tasks = []
-    if bulk_modules:
-        main_tasks.append(_process_bulk_modules(bulk_modules, usernames, result_callback, progress_callback))
-    if parallel_modules:
-        main_tasks.append(_process_parallel_modules(parallel_modules, usernames, result_callback, progress_callback))
-    if sequential_modules:
-        main_tasks.append(_process_sequential_modules(sequential_modules, usernames, result_callback, progress_callback))
 
-    if main_tasks:
-        await asyncio.gather(*main_tasks)
\ No newline at end of file
+async def scan_many(usernames: List[str]) -> List[Dict[str, Any]]:
+    """Сканирует ники и возвращает все найденные результаты списком (без GUI)."""
+    return [item async for item in ScanSession(usernames)]
@@ -0,0 +1,120 @@
+# src/core/session_store.py
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Iterator
+
+SESSIONS_DIR = Path(__file__).resolve().parents[1] / "data" / "sessions"
+SESSION_HISTORY_LIMIT = 20 # Сколько последних файлов сессий хранить на диске
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+
+def _flatten(data, prefix: str = "") -> dict:
+    """Разворачивает вложенные словари в плоский вид: {"city.title": ...}."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, list):
+            flat[name] = json.dumps(value, ensure_ascii=False, default=str)
+        else:
+            flat[name] = value
+    return flat
+
+def _csv_rows(item: dict) -> Iterator[dict]:
+    """Одна строка CSV на каждый модуль, нашедший профиль."""
+    username = item.get("username")
+    for module, data in item.items():
+        if module == "username" or not data:
+            continue
+        yield {"username": username, "module": module, **_flatten(data if isinstance(data, dict) else {"value": data})}
+
+
+class SessionStore:
+    """
+    Результаты одной сессии сканирования, дописываемые в NDJSON-файл по мере поступления.
+    В памяти хранится только счетчик, а экспорт читает файл потоково
+    и может выполняться в отдельном потоке, пока скан продолжается.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        self._file = None
+
+    @classmethod
+    def create(cls, directory: Path | None = None) -> "SessionStore":
+        """Открывает файл новой сессии и удаляет самые старые."""
+        directory = Path(directory or SESSIONS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        old_sessions = sorted(directory.glob("session_*.ndjson"))
+        for old in old_sessions[:max(0, len(old_sessions) - SESSION_HISTORY_LIMIT + 1)]:
+            old.unlink(missing_ok=True)
+        millis = int(time.time() * 1000) % 1000
+        store = cls(directory / f"session_{time.strftime('%Y%m%d_%H%M%S')}_{millis:03d}.ndjson")
+        store._file = store.path.open("a", encoding="utf-8")
+        return store
+
+    def append(self, item: dict):
+        self._file.write(json.dumps(item, ensure_ascii=False, default=str) + "\n")
+        self.count += 1
+
+    def flush(self):
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def snapshot(self) -> int:
+        """Сбрасывает буфер на диск и возвращает размер файла: экспорт читает только эту часть."""
+        self.flush()
+        return self.path.stat().st_size
+
+    def _iter_lines(self, limit_bytes: int | None = None) -> Iterator[bytes]:
+        with self.path.open("rb") as f:
+            read = 0
+            for line in f:
+                read += len(line)
+                if limit_bytes is not None and read > limit_bytes:
+                    break
+                if line.strip():
+                    yield line
+
+    def iter_results(self, limit_bytes: int | None = None) -> Iterator[dict]:
+        for line in self._iter_lines(limit_bytes):
+            yield json.loads(line)
+
+    def export(self, path: str | Path, fmt: str, limit_bytes: int | None = None) -> int:
+        """
+        Потоково выгружает результаты в JSON, NDJSON или CSV и возвращает их количество.
+        Блокирующая функция: из GUI ее нужно вызывать через asyncio.to_thread.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+        exported = 0
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            if fmt == "ndjson":
+                for line in self._iter_lines(limit_bytes):
+                    out.write(line.decode("utf-8"))
+                    exported += 1
+            elif fmt == "json":
+                out.write("[")
+                for item in self.iter_results(limit_bytes):
+                    out.write(("," if exported else "") + "\n  " + json.dumps(item, ensure_ascii=False))
+                    exported += 1
+                out.write("\n]\n" if exported else "]\n")
+            else:
+                # Первый проход собирает набор колонок, второй пишет строки
+                columns = {"username": None, "module": None}
+                for item in self.iter_results(limit_bytes):
+                    for row in _csv_rows(item):
+                        columns.update(dict.fromkeys(row))
+                writer = csv.DictWriter(out, fieldnames=list(columns), extrasaction="ignore")
+                writer.writeheader()
+                for item in self.iter_results(limit_bytes):
+                    writer.writerows(_csv_rows(item))
+                    exported += 1
+        return exported
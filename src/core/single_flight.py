@@ -0,0 +1,54 @@
+# src/core/single_flight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+class SingleFlight:
+    """
+    Объединяет одновременные запросы с одинаковым ключом: первый вызов
+    выполняет работу, остальные ждут его результат через общий Future.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def claim(self, key: Hashable) -> tuple[asyncio.Future, bool]:
+        """
+        Возвращает (future, is_owner). Владелец обязан завершить ключ через
+        resolve() или reject(), остальные просто ждут future.
+        """
+        if future := self._inflight.get(key):
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future, True
+
+    def resolve(self, key: Hashable, value: Any):
+        future = self._inflight.pop(key, None)
+        if future and not future.done():
+            future.set_result(value)
+
+    def reject(self, key: Hashable, exc: BaseException):
+        future = self._inflight.pop(key, None)
+        if future and not future.done():
+            if isinstance(exc, asyncio.CancelledError):
+                # Отмена владельца (например, по таймауту) не должна отменять ожидающих
+                exc = RuntimeError(f"Запрос для {key} был отменен")
+            future.set_exception(exc)
+            future.exception() # Помечаем исключение полученным, если ожидающих не было
+
+    async def wait(self, future: asyncio.Future) -> Any:
+        """Ожидает чужой запрос, не отменяя его при отмене ожидающего."""
+        return await asyncio.shield(future)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполняет factory() для ключа или присоединяется к уже идущему запросу."""
+        future, is_owner = self.claim(key)
+        if not is_owner:
+            return await self.wait(future)
+        try:
+            result = await factory()
+        except BaseException as e:
+            self.reject(key, e)
+            raise
+        self.resolve(key, result)
+        return result
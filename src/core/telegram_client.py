@@ -1,64 +1,159 @@
 # src/core/telegram_client.py
 import asyncio
+import contextlib
+from dataclasses import dataclass
 from telethon import TelegramClient
 
+from .log_manager import get_logger
+from .rate_limiter import RateLimiter
+
+log = get_logger("telegram")
+
+@dataclass
+class ClientSlot:
+    """Авторизованный аккаунт пула со своим темпом запросов и состоянием FloodWait."""
+    session_name: str
+    client: TelegramClient
+    limiter: RateLimiter
+    busy: bool = False
+
 class TelegramClientManager:
     """
-    Управляет единственным экземпляром TelegramClient для всего приложения.
+    Управляет пулом авторизованных клиентов Telegram для всего приложения.
+    Каждый аккаунт (файл сессии) темпируется отдельно, поэтому
+    с N аккаунтами можно выполнять до N запросов одновременно.
     """
-    _client: TelegramClient | None = None
+    _slots: list[ClientSlot] = []
     _config: dict = {}
+    _available: asyncio.Condition | None = None
+    _foreground_waiting: int = 0
     SESSION_NAME = "tg_session"
+    FAILOVER_DELAY = 5.0 # Дольше этого ждать свободный аккаунт не стоит, если скоро освободится другой
+    # Фабрика клиентов (session_name, api_id, api_hash); бенчмарк подставляет сюда заглушку
+    client_factory = TelegramClient
+
+    @classmethod
+    def _session_names(cls, config: dict) -> list[str]:
+        return list(dict.fromkeys(config.get("sessions") or [cls.SESSION_NAME]))
+
+    @classmethod
+    async def _connect(cls, session_name: str, api_id: int, api_hash: str) -> TelegramClient | None:
+        client = cls.client_factory(session_name, api_id, api_hash)
+        try:
+            await client.connect()
+            if not await client.is_user_authorized():
+                # Теперь мы не пытаемся авторизоваться здесь
+                log.critical("Авторизация в Telegram для сессии '%s' не пройдена. "
+                             "Запустите 'python setup_telegram.py %s', чтобы создать файл сессии.", session_name, session_name)
+                await client.disconnect()
+                return None
+
+            me = await client.get_me()
+            log.info("Клиент Telegram '%s' подключен и авторизован как: @%s", session_name, me.username)
+            return client
+
+        except Exception as e:
+            log.critical("Не удалось подключить клиент Telegram '%s': %s", session_name, e)
+            return None
 
     @classmethod
-    async def initialize(cls, config: dict):
-        """Инициализирует и подключает клиент Telegram, используя существующую сессию."""
-        if cls._client and cls._client.is_connected():
-            print("[*] Клиент Telegram уже инициализирован.")
+    async def initialize(cls, config: dict, pacing: dict | None = None):
+        """
+        Подключает все сессии из config["sessions"] (по умолчанию одну 'tg_session').
+        pacing — параметры RateLimiter для одного аккаунта.
+        """
+        if cls._slots:
+            log.info("Клиент Telegram уже инициализирован.")
             return
 
         api_id = config.get("api_id")
         api_hash = config.get("api_hash")
 
         if not api_id or not api_hash:
-            print("[!] API ID/Hash для Telegram не найдены в конфигурации. Модуль будет отключен.")
+            log.warning("API ID/Hash для Telegram не найдены в конфигурации. Модуль будет отключен.")
             return
 
         cls._config = config
-        print("[*] Инициализация клиента Telegram...")
-        cls._client = TelegramClient(cls.SESSION_NAME, int(api_id), api_hash)
-        try:
-            await cls._client.connect()
-            if not await cls._client.is_user_authorized():
-                # Теперь мы не пытаемся авторизоваться здесь
-                print("\n" + "="*50)
-                print("[CRITICAL] Авторизация в Telegram не пройдена.")
-                print(f"[ACTION]    Пожалуйста, запустите скрипт 'python setup_telegram.py' для создания файла сессии.")
-                print("="*50 + "\n")
-                await cls._client.disconnect()
-                cls._client = None
-                return
+        cls._available = asyncio.Condition()
+        pacing = pacing or {"rate": 1.0}
+        session_names = cls._session_names(config)
+        log.info("Инициализация клиентов Telegram (%d сессий)...", len(session_names))
 
-            me = await cls._client.get_me()
-            print(f"[*] Клиент Telegram успешно подключен и авторизован как: @{me.username}")
-
-        except Exception as e:
-            print(f"[CRITICAL] Не удалось подключить клиент Telegram: {e}")
-            cls._client = None
+        clients = await asyncio.gather(*(cls._connect(name, int(api_id), api_hash) for name in session_names))
+        for name, client in zip(session_names, clients):
+            if client is not None:
+                cls._slots.append(ClientSlot(name, client, RateLimiter(f"telegram:{name}", **pacing)))
+        log.info("Пул Telegram: доступно аккаунтов %d из %d.", len(cls._slots), len(session_names))
 
+    @classmethod
+    def pool_size(cls) -> int:
+        return len(cls._slots)
 
     @classmethod
     def get_client(cls) -> TelegramClient:
-        """Возвращает активный экземпляр клиента."""
-        if not cls._client or not cls._client.is_connected():
+        """Возвращает первый активный клиент пула."""
+        for slot in cls._slots:
+            if slot.client.is_connected():
+                return slot.client
+        raise RuntimeError("Клиент Telegram не был инициализирован или отключен.")
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def lease(cls, background: bool = False, session_name: str | None = None):
+        """
+        Выдает свободный аккаунт пула, который раньше других сможет сделать запрос,
+        и дожидается его очереди по темпу. Аккаунт занят до выхода из контекста.
+        background=True — второстепенная работа (фото профилей): она получает аккаунт,
+        только пока его не ждут основные запросы. session_name ограничивает выбор одним аккаунтом.
+        """
+        if not cls._slots or cls._available is None:
             raise RuntimeError("Клиент Telegram не был инициализирован или отключен.")
-        return cls._client
+        candidates = [s for s in cls._slots if session_name is None or s.session_name == session_name]
+        if not candidates:
+            raise RuntimeError(f"Сессия Telegram '{session_name}' не подключена.")
+
+        async with cls._available:
+            if not background:
+                cls._foreground_waiting += 1
+            try:
+                while True:
+                    free = [s for s in candidates if not s.busy]
+                    if not free or (background and cls._foreground_waiting):
+                        await cls._available.wait()
+                        continue
+                    slot = min(free, key=lambda s: s.limiter.delay())
+                    delay = slot.limiter.delay()
+                    if delay <= cls.FAILOVER_DELAY or len(free) == len(candidates):
+                        break
+                    # Свободный аккаунт пережидает FloodWait: возможно, занятый освободится раньше
+                    try:
+                        await asyncio.wait_for(cls._available.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                slot.busy = True
+            finally:
+                if not background:
+                    cls._foreground_waiting -= 1
+                    cls._available.notify_all()
+        try:
+            if not slot.client.is_connected():
+                raise RuntimeError(f"Клиент Telegram '{slot.session_name}' отключен.")
+            await slot.limiter.acquire()
+            yield slot
+        finally:
+            slot.busy = False
+            async with cls._available:
+                cls._available.notify_all()
 
     @classmethod
     async def close(cls):
-        """Отключает клиент Telegram."""
-        if cls._client and cls._client.is_connected():
-            print("[*] Отключение клиента Telegram...")
-            await cls._client.disconnect()
-            cls._client = None
-            print("[*] Клиент Telegram отключен.")
\ No newline at end of file
+        """Отключает все клиенты пула."""
+        if not cls._slots:
+            return
+        log.info("Отключение клиентов Telegram...")
+        for slot in cls._slots:
+            if slot.client.is_connected():
+                await slot.client.disconnect()
+        cls._slots = []
+        cls._available = None
+        log.info("Клиенты Telegram отключены.")
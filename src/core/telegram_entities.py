@@ -0,0 +1,71 @@
+# src/core/telegram_entities.py
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from .result_cache import normalize_username
+
+ENTITY_CACHE_PATH = Path(__file__).resolve().parents[1] / "data" / "tg_entities.sqlite3"
+DEFAULT_ENTITY_TTL = 7 * 24 * 3600
+
+class TelegramEntityCache:
+    """
+    Постоянный кэш разрешенных ников Telegram: ник -> (id, access_hash, данные пользователя).
+    access_hash действителен только для аккаунта, который его получил,
+    поэтому записи хранятся отдельно для каждой сессии пула.
+    """
+    _conn: sqlite3.Connection | None = None
+    _ttl: float = DEFAULT_ENTITY_TTL
+
+    @classmethod
+    def initialize(cls, ttl: float | None = None, path: Path | None = None):
+        if cls._conn is not None:
+            return
+        if ttl is not None:
+            cls._ttl = float(ttl)
+        path = Path(path or ENTITY_CACHE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        cls._conn = sqlite3.connect(path)
+        cls._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            " session TEXT NOT NULL, username TEXT NOT NULL, user_id INTEGER NOT NULL,"
+            " access_hash INTEGER NOT NULL, payload TEXT NOT NULL, stored_at REAL NOT NULL,"
+            " PRIMARY KEY (session, username))"
+        )
+        cls._conn.commit()
+
+    @classmethod
+    def close(cls):
+        if cls._conn is not None:
+            cls._conn.close()
+            cls._conn = None
+
+    @classmethod
+    def get(cls, username: str, session: str | None = None) -> dict | None:
+        """
+        Возвращает самую свежую запись для ника (из любой сессии или из указанной):
+        {"session", "user_id", "access_hash", "user"}. Устаревшие записи не возвращаются.
+        """
+        if cls._conn is None:
+            return None
+        query = "SELECT session, user_id, access_hash, payload FROM entities WHERE username = ? AND stored_at >= ?"
+        params = [normalize_username(username), time.time() - cls._ttl]
+        if session is not None:
+            query += " AND session = ?"
+            params.append(session)
+        row = cls._conn.execute(query + " ORDER BY stored_at DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        session_name, user_id, access_hash, payload = row
+        return {"session": session_name, "user_id": user_id, "access_hash": access_hash, "user": json.loads(payload)}
+
+    @classmethod
+    def put(cls, session: str, username: str, user_id: int, access_hash: int, user: dict):
+        if cls._conn is None:
+            return
+        cls._conn.execute(
+            "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?)",
+            (session, normalize_username(username), user_id, access_hash, json.dumps(user, ensure_ascii=False), time.time()),
+        )
+        cls._conn.commit()
@@ -1,46 +1,196 @@
 # src/core/username_generator.py
-from itertools import product
+"""
+Генератор вариаций никнейма.
 
-def generate_variations(base_username: str) -> list[str]:
+Каждое правило лениво выдает пары (ник, оценка правдоподобия) по убыванию оценки.
+Исходные ники читаются окнами по WINDOW_SIZE: сами ники окна выдаются всегда,
+а потоки правил всех ников окна сливаются по оценке, и бюджет окна отсекает
+хвост вариаций еще до проверки и сканирования.
+"""
+import heapq
+import re
+from dataclasses import dataclass
+from itertools import count, islice
+from typing import Callable, Iterable, Iterator
+
+from .data_model import normalize_for_search
+
+DEFAULT_LIMIT = 100        # Вариаций на один ник для generate_variations
+DEFAULT_WINDOW_BUDGET = 500 # Вариаций на одно окно из WINDOW_SIZE исходных ников
+WINDOW_SIZE = 50           # Сколько исходных ников читается и ранжируется вместе
+
+# Популярные числовые суффиксы, от более частых к более редким
+COMMON_SUFFIXES = [
+    '1', '123', '7', '777', '2', '3', '007', '111', '321',
+    '88', '99', '83',
+    '2000', '1999', '1998', '2005', '2006', '2007', '2008',
+]
+SEPARATORS = ['_', '.']
+LEET = {'a': '4', 'e': '3', 'i': '1', 'o': '0', 's': '5', 't': '7'}
+# Альтернативные способы латинизации одних и тех же русских звуков (замена в одну сторону)
+TRANSLIT_ALTERNATIVES = [
+    ('ja', 'ya'), ('ya', 'ja'), ('ju', 'yu'), ('yu', 'ju'), ('zh', 'j'), ('kh', 'h'),
+    ('ja', 'ia'), ('ya', 'ia'), ('ju', 'iu'), ('yu', 'iu'), ('iy', 'y'), ('ts', 'c'),
+    ('shch', 'sch'), ('sch', 'shch'), ('ks', 'x'), ('x', 'ks'),
+]
+
+# Общие для всех платформ ограничения; правила конкретных модулей проверяются отдельно
+_GENERIC_USERNAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+# Границы слов: смена регистра (ivanPetrov), буквы и цифры (ivan1990), разделители
+_WORD_BOUNDARY = re.compile(r"[._-]+|(?<=[a-z])(?=[A-Z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])")
+
+
+@dataclass(frozen=True)
+class GeneratorContext:
+    """Известные о человеке данные, из которых правила строят дополнительные варианты."""
+    first_names: tuple[str, ...] = ()
+    last_names: tuple[str, ...] = ()
+    birth_years: tuple[str, ...] = ()
+
+
+Rule = Callable[[str, GeneratorContext], Iterable[tuple[str, float]]]
+RULES: list[Rule] = []
+
+def rule(func: Rule) -> Rule:
     """
-    Генерирует список вероятных вариаций для заданного никнейма.
+    Регистрирует правило генерации: функцию (ник, контекст) -> пары (вариант, оценка 0..1).
+    Правило выдает пары лениво и по невозрастанию оценки — на этом держится слияние потоков.
     """
-    if not base_username:
-        return []
+    RULES.append(func)
+    return func
+
+
+def _words(username: str) -> list[str]:
+    return [word for word in _WORD_BOUNDARY.split(username) if word]
+
+def _latin(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", normalize_for_search(text))
+
+@rule
+def original(base: str, context: GeneratorContext):
+    yield base, 1.0
+
+@rule
+def word_separators(base: str, context: GeneratorContext):
+    """ivanPetrov -> ivan_petrov, ivan.petrov, ivanpetrov."""
+    words = [word.lower() for word in _words(base)]
+    if len(words) < 2:
+        # Одно слово: пробуем разделить посередине, как раньше ('username' -> 'user_name')
+        if len(base) > 4:
+            mid = len(base) // 2
+            for sep in SEPARATORS:
+                yield f"{base[:mid]}{sep}{base[mid:]}", 0.35
+        return
+    for sep in ["", *SEPARATORS, "-"]:
+        yield sep.join(words), 0.8 if sep != "-" else 0.5
 
-    # Используем set для автоматического исключения дубликатов
-    variations = {base_username}
+@rule
+def name_combinations(base: str, context: GeneratorContext):
+    """Иван Петров -> ivanpetrov, ivan_petrov, petrov.ivan, ipetrov."""
+    pairs = [(first, last) for first in map(_latin, context.first_names) for last in map(_latin, context.last_names) if first and last]
+    # Внешний цикл по шаблонам, чтобы при нескольких именах оценки не возрастали
+    for first, last in pairs:
+        for sep in ["", *SEPARATORS]:
+            yield f"{first}{sep}{last}", 0.75
+    for first, last in pairs:
+        for sep in ["", *SEPARATORS]:
+            yield f"{last}{sep}{first}", 0.7
+    for first, last in pairs:
+        yield f"{first[0]}{last}", 0.65
+    for first, last in pairs:
+        yield f"{last}{first[0]}", 0.55
 
-    # Популярные числовые суффиксы
-    common_suffixes = [
-        '123', '321', '111', '777', '007',
-        '1', '2', '3', '7',
-        '2005', '2006', '2007', '2008',
-        '1998', '1999', '2000',
-        '88', '99', '83'
+@rule
+def birth_years(base: str, context: GeneratorContext):
+    """ivan + 1990 -> ivan1990, ivan90, ivan_1990."""
+    years = [year for year in context.birth_years if year.isdigit() and len(year) == 4]
+    for year in years:
+        yield f"{base}{year}", 0.7
+    for year in years:
+        yield f"{base}{year[2:]}", 0.6
+    for year in years:
+        for sep in SEPARATORS:
+            yield f"{base}{sep}{year}", 0.55
+
+@rule
+def transliteration_variants(base: str, context: GeneratorContext):
+    """zhenya -> jenya, zhenia: одно имя латиницей пишут по-разному."""
+    latin = base.lower()
+    for source, target in TRANSLIT_ALTERNATIVES:
+        if source in latin:
+            yield latin.replace(source, target), 0.65
+
+@rule
+def numeric_suffixes(base: str, context: GeneratorContext):
+    """user -> user1, user123, затем user_1, user.123."""
+    for i, suffix in enumerate(COMMON_SUFFIXES):
+        yield f"{base}{suffix}", 0.5 - i * 0.01
+    for i, suffix in enumerate(COMMON_SUFFIXES):
+        for sep in SEPARATORS:
+            yield f"{base}{sep}{suffix}", 0.3 - i * 0.005
+
+@rule
+def leet(base: str, context: GeneratorContext):
+    """ivan -> 1van, iv4n: по одной замене за раз."""
+    for i, char in enumerate(base):
+        if (replacement := LEET.get(char.lower())) is not None:
+            yield f"{base[:i]}{replacement}{base[i + 1:]}", 0.2
+
+@rule
+def trailing_separators(base: str, context: GeneratorContext):
+    for sep in SEPARATORS:
+        yield f"{base}{sep}", 0.05
+
+
+def _latin_base(base: str) -> str:
+    # Ник набран кириллицей: правила применяются к его латинской записи
+    return base if base.isascii() else normalize_for_search(base)
+
+def _scored(base: str, context: GeneratorContext, order: Iterator[int]) -> Iterator[tuple[float, int, str]]:
+    """Все правила для одного ника, слитые по убыванию оценки; правила вызываются лениво."""
+    streams = [
+        ((-score, next(order), username) for username, score in rule_func(base, context))
+        for rule_func in RULES
     ]
-    # Популярные разделители
-    separators = ['_', '.']
-
-    # 1. Просто добавляем суффиксы: user -> user123
-    for suffix in common_suffixes:
-        variations.add(f"{base_username}{suffix}")
-
-    # 2. Добавляем разделители: user -> user_, user.
-    for sep in separators:
-        variations.add(f"{base_username}{sep}")
-
-    # 3. Комбинируем разделители и суффиксы: user -> user_123, user.2005
-    for sep, suffix in product(separators, common_suffixes):
-        variations.add(f"{base_username}{sep}{suffix}")
-        
-    # 4. Вставляем разделители в середину, если ник достаточно длинный
-    if len(base_username) > 4:
-        # Например, 'username' -> 'user_name'
-        mid = len(base_username) // 2
-        for sep in separators:
-            variations.add(f"{base_username[:mid]}{sep}{base_username[mid:]}")
-
-    # Ограничиваем количество, чтобы не создавать тысячи запросов
-    # Сортируем для более предсказуемого порядка
-    return sorted(list(variations))[:100]
\ No newline at end of file
+    return heapq.merge(*streams)
+
+def iter_variations(base_usernames: str | Iterable[str], context: GeneratorContext | None = None,
+                    is_valid: Callable[[str], bool] | None = None, window_budget: int | None = None) -> Iterator[str]:
+    """
+    Лениво выдает исходные ники и их вариации без повторов. Исходные ники читаются
+    окнами по WINDOW_SIZE: сначала выдаются сами ники окна, затем вариации всех ников
+    окна по убыванию правдоподобия. is_valid — дополнительная проверка вариаций
+    (например, что ник допустим хотя бы на одной платформе); window_budget — сколько
+    вариаций выдать на каждое окно (None — без ограничения). Общего бюджета на весь
+    поток нет: чтобы ранжировать вариации всех ников сразу, пришлось бы прочитать
+    вход целиком, поэтому число вариаций растет с длиной входа.
+    """
+    if isinstance(base_usernames, str):
+        base_usernames = [base_usernames]
+    context = context or GeneratorContext()
+    bases = (_latin_base(base.strip()) for base in base_usernames if base and base.strip())
+    seen = set()
+    order = count()
+    while window := list(islice(bases, WINDOW_SIZE)):
+        # Исходные ники не фильтруются и не расходуют бюджет: их проверяет сканер
+        for base in window:
+            if (key := base.lower()) not in seen:
+                seen.add(key)
+                yield base
+        def candidates():
+            for _, _, username in heapq.merge(*(_scored(base, context, order) for base in window)):
+                key = username.lower()
+                if key in seen or not _GENERIC_USERNAME.match(username) or (is_valid and not is_valid(username)):
+                    continue
+                seen.add(key)
+                yield username
+        yield from islice(candidates(), window_budget)
+
+def generate_variations(base_username: str, limit: int = DEFAULT_LIMIT) -> list[str]:
+    """
+    Генерирует список вероятных вариаций для заданного никнейма,
+    самые правдоподобные — первыми.
+    """
+    if not base_username:
+        return []
+    return list(islice(iter_variations(base_username, window_budget=limit), limit))
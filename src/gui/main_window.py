@@ -1,21 +1,28 @@
 # src/gui/main_window.py
-import asyncio, json, time
+import asyncio, time
 from pathlib import Path
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTabWidget, QProgressBar,
-    QFileDialog, QCheckBox, QFormLayout, QFrame, QScrollArea,
-    QScroller, QCompleter
+    QFileDialog, QCheckBox, QFormLayout, QFrame, QCompleter
 )
 from PySide6.QtCore import Slot, Qt, QTimer, QStringListModel
 from qasync import asyncSlot
 
-from .widgets.result_card import ResultCard
+from .widgets.result_view import ResultListModel, ResultFilterProxy, ResultListView
 from .widgets.log_console import LogConsole
-from core.scanner import run_scan_session
+from .widgets.stats_panel import StatsPanel
+from core.scanner import ScanSession, any_module_accepts, count_progress_steps
 from core.module_loader import get_loaded_modules, get_config
-from core.username_generator import generate_variations
-from core.data_model import normalize_for_search
+from core.username_generator import DEFAULT_WINDOW_BUDGET, GeneratorContext, iter_variations
+from core.filter_engine import FilterEngine, FilterQuery
+from core.session_store import SessionStore
+from core.correlation import correlate, ProfileRecord
+
+FILTER_DEBOUNCE_MS = 150
+CORRELATION_LOG_LIMIT = 20
+EVIDENCE_LABELS = {"name": "имя", "username": "ник", "email": "email", "birth_date": "дата рождения", "city": "город"}
+EXPORT_FILTERS = {"json": "JSON Files (*.json)", "ndjson": "NDJSON Files (*.ndjson)", "csv": "CSV Files (*.csv)"}
 
 class MainWindow(QWidget):
     def __init__(self):
@@ -38,65 +45,89 @@ class MainWindow(QWidget):
         input_layout.addWidget(self.input)
         left_layout.addLayout(input_layout)
 
-        controls_layout = QHBoxLayout(); self.generator_checkbox = QCheckBox("Генерировать вариации"); controls_layout.addWidget(self.generator_checkbox); controls_layout.addStretch(); self.scan_btn = QPushButton("Scan"); self.scan_btn.clicked.connect(self.on_scan_clicked); controls_layout.addWidget(self.scan_btn); self.save_btn = QPushButton("Export JSON"); self.save_btn.clicked.connect(self.on_export_clicked); controls_layout.addWidget(self.save_btn); self.clear_history_btn = QPushButton("Очистить историю"); self.clear_history_btn.clicked.connect(self.on_clear_history); controls_layout.addWidget(self.clear_history_btn);
+        controls_layout = QHBoxLayout(); self.generator_checkbox = QCheckBox("Генерировать вариации"); controls_layout.addWidget(self.generator_checkbox); controls_layout.addStretch(); self.scan_btn = QPushButton("Scan"); self.scan_btn.clicked.connect(self.on_scan_clicked); controls_layout.addWidget(self.scan_btn); self.pause_btn = QPushButton("Пауза"); self.pause_btn.setCheckable(True); self.pause_btn.setEnabled(False); self.pause_btn.toggled.connect(self.on_pause_toggled); controls_layout.addWidget(self.pause_btn); self.stop_btn = QPushButton("Стоп"); self.stop_btn.setEnabled(False); self.stop_btn.clicked.connect(self.on_stop_clicked); controls_layout.addWidget(self.stop_btn); self.save_btn = QPushButton("Export"); self.save_btn.clicked.connect(self.on_export_clicked); controls_layout.addWidget(self.save_btn); self.correlate_btn = QPushButton("Связать профили"); self.correlate_btn.clicked.connect(self.on_correlate_clicked); controls_layout.addWidget(self.correlate_btn); self.clear_history_btn = QPushButton("Очистить историю"); self.clear_history_btn.clicked.connect(self.on_clear_history); controls_layout.addWidget(self.clear_history_btn);
         left_layout.addLayout(controls_layout)
         
         progress_layout = QHBoxLayout(); self.progress = QProgressBar(); self.progress.setRange(0, 100); progress_layout.addWidget(self.progress, 1); self.timer_label = QLabel("00:00"); progress_layout.addWidget(self.timer_label); self.scan_timer = QTimer(self); self.scan_timer.timeout.connect(self.update_timer_display); left_layout.addLayout(progress_layout)
 
         self.tabs = QTabWidget()
-        self.tab_layouts = {}
+        self.result_models = {}; self.result_proxies = {}
         for name, module_cfg in self.modules_config.items():
             if module_cfg.get("enabled"):
-                scroll_area = QScrollArea(); scroll_area.setWidgetResizable(True); scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff); QScroller.grabGesture(scroll_area.viewport(), QScroller.ScrollerGestureType.LeftMouseButtonGesture)
-                container = QWidget()
-                layout = QVBoxLayout(container)
-                layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-                self.tab_layouts[name] = layout
-                scroll_area.setWidget(container)
+                model = ResultListModel(self); proxy = ResultFilterProxy(self); proxy.setSourceModel(model)
+                self.result_models[name] = model; self.result_proxies[name] = proxy
                 display_name = module_cfg.get("display_name", name)
-                self.tabs.addTab(scroll_area, display_name)
+                self.tabs.addTab(ResultListView(proxy), display_name)
         left_layout.addWidget(self.tabs, stretch=1)
         
         self.log = LogConsole(); self.log.setFixedHeight(160); left_layout.addWidget(self.log)
         main_layout.addWidget(left_panel, stretch=1)
         
+        # Фильтр применяется после паузы в наборе, а не на каждое нажатие клавиши
+        self.filter_engine = FilterEngine(); self.filter_timer = QTimer(self); self.filter_timer.setSingleShot(True); self.filter_timer.setInterval(FILTER_DEBOUNCE_MS); self.filter_timer.timeout.connect(self.on_filter_changed)
         right_panel = QWidget(); right_panel.setFixedWidth(280); right_layout = QVBoxLayout(right_panel); filter_title = QLabel("Фильтры"); filter_title.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 5px;"); right_layout.addWidget(filter_title)
-        filter_form = QFormLayout(); self.lastname_filter = QLineEdit(); self.lastname_filter.textChanged.connect(self.on_filter_changed); filter_form.addRow("Фамилия:", self.lastname_filter); self.firstname_filter = QLineEdit(); self.firstname_filter.textChanged.connect(self.on_filter_changed); filter_form.addRow("Имя:", self.firstname_filter); self.middlename_filter = QLineEdit(); self.middlename_filter.textChanged.connect(self.on_filter_changed); filter_form.addRow("Отчество:", self.middlename_filter)
+        filter_form = QFormLayout(); self.lastname_filter = QLineEdit(); self.lastname_filter.textChanged.connect(self.filter_timer.start); filter_form.addRow("Фамилия:", self.lastname_filter); self.firstname_filter = QLineEdit(); self.firstname_filter.textChanged.connect(self.filter_timer.start); filter_form.addRow("Имя:", self.firstname_filter); self.middlename_filter = QLineEdit(); self.middlename_filter.textChanged.connect(self.filter_timer.start); filter_form.addRow("Отчество:", self.middlename_filter)
         line1 = QFrame(); line1.setFrameShape(QFrame.Shape.HLine); line1.setFrameShadow(QFrame.Shadow.Sunken); filter_form.addRow(line1)
-        self.location_filter = QLineEdit(); self.location_filter.setPlaceholderText("Город, страна..."); self.location_filter.textChanged.connect(self.on_filter_changed); filter_form.addRow("Место:", self.location_filter); self.email_filter = QLineEdit(); self.email_filter.textChanged.connect(self.on_filter_changed); filter_form.addRow("Email:", self.email_filter)
+        self.location_filter = QLineEdit(); self.location_filter.setPlaceholderText("Город, страна..."); self.location_filter.textChanged.connect(self.filter_timer.start); filter_form.addRow("Место:", self.location_filter); self.email_filter = QLineEdit(); self.email_filter.textChanged.connect(self.filter_timer.start); filter_form.addRow("Email:", self.email_filter)
         line2 = QFrame(); line2.setFrameShape(QFrame.Shape.HLine); line2.setFrameShadow(QFrame.Shadow.Sunken); filter_form.addRow(line2)
-        bdate_layout = QHBoxLayout(); self.day_filter = QLineEdit(); self.day_filter.setPlaceholderText("ДД"); self.day_filter.textChanged.connect(self.on_filter_changed); bdate_layout.addWidget(self.day_filter); self.month_filter = QLineEdit(); self.month_filter.setPlaceholderText("ММ"); self.month_filter.textChanged.connect(self.on_filter_changed); bdate_layout.addWidget(self.month_filter); self.year_filter = QLineEdit(); self.year_filter.setPlaceholderText("ГГГГ"); self.year_filter.textChanged.connect(self.on_filter_changed); bdate_layout.addWidget(self.year_filter)
+        bdate_layout = QHBoxLayout(); self.day_filter = QLineEdit(); self.day_filter.setPlaceholderText("ДД"); self.day_filter.textChanged.connect(self.filter_timer.start); bdate_layout.addWidget(self.day_filter); self.month_filter = QLineEdit(); self.month_filter.setPlaceholderText("ММ"); self.month_filter.textChanged.connect(self.filter_timer.start); bdate_layout.addWidget(self.month_filter); self.year_filter = QLineEdit(); self.year_filter.setPlaceholderText("ГГГГ"); self.year_filter.textChanged.connect(self.filter_timer.start); bdate_layout.addWidget(self.year_filter)
         filter_form.addRow("Дата рождения:", bdate_layout)
-        right_layout.addLayout(filter_form); right_layout.addStretch(); main_layout.addWidget(right_panel)
-        self.latest_results = []; self.scan_start_time = 0
+        right_layout.addLayout(filter_form); right_layout.addStretch()
+        stats_title = QLabel("Статистика"); stats_title.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 5px;"); right_layout.addWidget(stats_title)
+        self.stats_panel = StatsPanel({name: cfg.get("display_name", name) for name, cfg in self.modules_config.items() if cfg.get("enabled")}); right_layout.addWidget(self.stats_panel); main_layout.addWidget(right_panel)
+        self.session_store: SessionStore | None = None; self.scan_session: ScanSession | None = None; self.scan_start_time = 0
     
+    def _read_filters(self) -> FilterQuery:
+        return FilterQuery.from_text(lastname=self.lastname_filter.text(), firstname=self.firstname_filter.text(), middlename=self.middlename_filter.text(), location=self.location_filter.text(), email=self.email_filter.text(), day=self.day_filter.text(), month=self.month_filter.text(), year=self.year_filter.text())
     @Slot()
     def on_filter_changed(self):
-        lastname=normalize_for_search(self.lastname_filter.text());firstname=normalize_for_search(self.firstname_filter.text());middlename=normalize_for_search(self.middlename_filter.text());location=normalize_for_search(self.location_filter.text());email=normalize_for_search(self.email_filter.text());day=self.day_filter.text().strip();month=self.month_filter.text().strip();year=self.year_filter.text().strip()
-        matching_source_usernames=set()
-        for layout in self.tab_layouts.values():
-            for i in range(layout.count()):
-                widget = layout.itemAt(i).widget()
-                if isinstance(widget, ResultCard) and widget.normalized_data:
-                    norm_data = widget.normalized_data; lastname_match = not lastname or lastname in normalize_for_search(norm_data.last_name);firstname_match = not firstname or firstname in normalize_for_search(norm_data.first_name);middlename_match = not middlename or middlename in normalize_for_search(norm_data.middle_name);location_match = not location or location in norm_data.search_location;email_match = not email or email in norm_data.search_email
-                    try: day_match=not day or(norm_data.birth_day and int(norm_data.birth_day)==int(day));month_match=not month or(norm_data.birth_month and int(norm_data.birth_month)==int(month));year_match=not year or(norm_data.birth_year and int(norm_data.birth_year)==int(year))
-                    except(ValueError,TypeError):day_match,month_match,year_match=False,False,False
-                    if(lastname_match and firstname_match and middlename_match and location_match and email_match and day_match and month_match and year_match): matching_source_usernames.add(widget.source_username)
-        for layout in self.tab_layouts.values():
-            for i in range(layout.count()):
-                widget = layout.itemAt(i).widget()
-                if isinstance(widget, ResultCard): widget.setVisible(widget.source_username in matching_source_usernames)
+        # None — фильтры пусты: показываем все результаты, включая поступающие во время скана
+        matching_source_usernames = self.filter_engine.search(self._read_filters())
+        for proxy in self.result_proxies.values(): proxy.set_allowed(matching_source_usernames)
     
-    def clear_filters(self): self.lastname_filter.clear();self.firstname_filter.clear();self.middlename_filter.clear();self.location_filter.clear();self.email_filter.clear();self.day_filter.clear();self.month_filter.clear();self.year_filter.clear()
-    @Slot()
-    def on_export_clicked(self):
-        if not self.latest_results:self.log.log("Нет результатов для экспорта");return
-        path,_=QFileDialog.getSaveFileName(self,"Сохранить результаты","results.json","JSON Files (*.json)");
+    def clear_filters(self): self.lastname_filter.clear();self.firstname_filter.clear();self.middlename_filter.clear();self.location_filter.clear();self.email_filter.clear();self.day_filter.clear();self.month_filter.clear();self.year_filter.clear();self.filter_timer.stop();self.on_filter_changed()
+    @asyncSlot()
+    async def on_export_clicked(self):
+        if not self.session_store or not self.session_store.count:self.log.log("Нет результатов для экспорта");return
+        path,selected_filter=QFileDialog.getSaveFileName(self,"Сохранить результаты","results.json",";;".join(EXPORT_FILTERS.values()));
         if not path:return
+        fmt = Path(path).suffix.lstrip(".").lower()
+        if fmt not in EXPORT_FILTERS: fmt = next((f for f, name in EXPORT_FILTERS.items() if name == selected_filter), "json")
+        # Файл сессии читается в отдельном потоке до текущего размера, скан при этом продолжается
+        self.save_btn.setEnabled(False); limit = self.session_store.snapshot()
         try:
-            with open(path,"w",encoding="utf-8")as f:json.dump(self.latest_results,f,ensure_ascii=False,indent=2)
-            self.log.log(f"Результаты сохранены в {path}")
+            exported = await asyncio.to_thread(self.session_store.export, path, fmt, limit)
+            self.log.log(f"Результаты сохранены в {path} ({exported} записей)")
         except Exception as e:self.log.log(f"Ошибка сохранения файла: {e}")
+        finally: self.save_btn.setEnabled(True)
+    def _describe_profile(self, record: ProfileRecord) -> str:
+        module_name = self.modules_config.get(record.module, {}).get("display_name", record.module); full_name = f"{record.data.first_name} {record.data.last_name}".strip()
+        return f"{module_name}: {record.data.username}" + (f" ({full_name})" if full_name else "")
+    @asyncSlot()
+    async def on_correlate_clicked(self):
+        records = [ProfileRecord(name, entry.source_username, entry.normalized_data) for name, model in self.result_models.items() for entry in model.entries() if entry.normalized_data]
+        if len(records) < 2: self.log.log("Недостаточно профилей для сопоставления"); return
+        self.correlate_btn.setEnabled(False); self.log.log(f"Сопоставление {len(records)} профилей...")
+        try: clusters = await asyncio.to_thread(correlate, records)
+        except Exception as e: self.log.log(f"Ошибка сопоставления: {e}"); return
+        finally: self.correlate_btn.setEnabled(True)
+        self.log.log(f"Найдено вероятных личностей: {len(clusters)}")
+        for cluster in clusters[:CORRELATION_LOG_LIMIT]:
+            members = ", ".join(self._describe_profile(member) for member in cluster.members)
+            evidence = ", ".join(EVIDENCE_LABELS.get(e, e) for e in sorted(cluster.evidence))
+            self.log.log(f"[{cluster.score:.2f}] {members} — совпали: {evidence}")
+    @Slot(bool)
+    def on_pause_toggled(self, paused):
+        if not self.scan_session: return
+        if paused: self.scan_session.pause(); self.log.log("Скан приостановлен.")
+        else: self.scan_session.resume(); self.log.log("Скан продолжен.")
+    @Slot()
+    def on_stop_clicked(self):
+        if self.scan_session: self.scan_session.cancel(); self.log.log("Скан остановлен пользователем.")
+    def closeEvent(self, event):
+        if self.scan_session: self.scan_session.cancel()
+        if self.session_store: self.session_store.close()
+        super().closeEvent(event)
     def load_history(self):
         if self.history_file.exists(): return [line.strip() for line in self.history_file.read_text('utf-8').splitlines() if line.strip()]
         return []
@@ -111,49 +142,49 @@ class MainWindow(QWidget):
     @Slot()
     def update_timer_display(self): elapsed = time.monotonic() - self.scan_start_time; self.timer_label.setText(f"{int(elapsed // 60):02d}:{int(elapsed % 60):02d}")
     async def _result_callback(self, item: dict):
-        self.latest_results.append(item); username = item.get("username")
-        for name, layout in self.tab_layouts.items():
+        self.session_store.append(item); username = item.get("username")
+        for name, model in self.result_models.items():
             if result_data := item.get(name):
                 module = self.loaded_modules.get(name)
                 if hasattr(module, "format_result_for_gui"):
-                    card_data = module.format_result_for_gui(result_data, username); card = ResultCard(**card_data, source_username=username)
+                    card_data = module.format_result_for_gui(result_data, username)
                     # Новые результаты всегда появляются сверху
-                    layout.insertWidget(0, card)
+                    model.add_result(card_data, username)
+                    if card_data.get("normalized_data") and self.filter_engine.add(username, card_data["normalized_data"]):
+                        for proxy in self.result_proxies.values(): proxy.allow(username)
     @asyncSlot()
     async def on_scan_clicked(self):
         text = self.input.text().strip();
         if not text: self.log.log("Введите хотя бы один никнейм"); return
         self.add_to_history(text); base_usernames=[x.strip()for x in text.replace("\n",",").split(",")if x.strip()]
         if self.generator_checkbox.isChecked():
-            self.log.log(f"Генерация вариаций для {len(base_usernames)} никнеймов..."); all_variations=set();
-            for name in base_usernames: all_variations.update(generate_variations(name))
-            usernames_to_scan=list(all_variations); self.log.log(f"Сгенерировано {len(usernames_to_scan)} уникальных никнеймов для проверки.")
+            self.log.log(f"Генерация вариаций для {len(base_usernames)} никнеймов...")
+            # Имя, фамилия и год из панели фильтров подсказывают генератору дополнительные варианты
+            context = GeneratorContext(first_names=tuple(filter(None, [self.firstname_filter.text().strip()])), last_names=tuple(filter(None, [self.lastname_filter.text().strip()])), birth_years=tuple(filter(None, [self.year_filter.text().strip()])))
+            window_budget = get_config().get("generator", {}).get("window_budget", DEFAULT_WINDOW_BUDGET)
+            usernames_to_scan=list(iter_variations(base_usernames, context, any_module_accepts(self.loaded_modules), window_budget)); self.log.log(f"Сгенерировано {len(usernames_to_scan)} уникальных никнеймов для проверки.")
         else: usernames_to_scan = base_usernames
         if not usernames_to_scan: self.log.log("Не удалось определить никнеймы для сканирования."); return
         
-        self.log.log(f"Запущен скан для {len(usernames_to_scan)} никнеймов..."); self.progress.setValue(0); self.scan_btn.setEnabled(False); self.latest_results=[]; self.clear_filters()
+        self.log.log(f"Запущен скан для {len(usernames_to_scan)} никнеймов..."); self.progress.setValue(0); self.scan_btn.setEnabled(False); self.clear_filters()
+        if self.session_store: self.session_store.close()
+        self.session_store = SessionStore.create()
         
-        for layout in self.tab_layouts.values():
-            # Удаляем старую распорку, если она была
-            if (item := layout.takeAt(layout.count() - 1)) and not item.widget():
-                del item
-
-            # Корректно очищаем все виджеты
-            while (item := layout.takeAt(0)) is not None:
-                if item.widget():
-                    item.widget().deleteLater()
-            
-            # Добавляем новую распорку в пустой layout
-            layout.addStretch(1)
+        for model in self.result_models.values(): model.clear()
+        self.filter_engine.clear()
 
-        modules = get_loaded_modules(); bulk_module_count = sum(1 for m in modules.values() if hasattr(m, 'scan_bulk')); single_module_count = len(modules) - bulk_module_count; total_tasks = bulk_module_count + (single_module_count * len(usernames_to_scan)); completed_tasks = 0
-        def progress_callback():
-            nonlocal completed_tasks; completed_tasks += 1
+        total_tasks = count_progress_steps(usernames_to_scan); completed_tasks = 0
+        def progress_callback(count: int):
+            nonlocal completed_tasks; completed_tasks += count
             if total_tasks > 0: self.progress.setValue(int(completed_tasks / total_tasks * 100))
         
         self.scan_start_time = time.monotonic(); self.scan_timer.start(1000)
-        try: await run_scan_session(usernames_to_scan, self._result_callback, progress_callback)
+        self.scan_session = ScanSession(usernames_to_scan, progress_callback); self.pause_btn.setEnabled(True); self.stop_btn.setEnabled(True)
+        try:
+            # Результаты забираются по одному: пока карточка добавляется, сканер ждет, а не копит очередь
+            async for item in self.scan_session: await self._result_callback(item)
         finally:
-            self.scan_timer.stop(); self.progress.setValue(100)
-            total_found = len(self.latest_results)
+            self.scan_timer.stop(); self.progress.setValue(100); self.scan_session = None
+            self.pause_btn.setChecked(False); self.pause_btn.setEnabled(False); self.stop_btn.setEnabled(False)
+            self.session_store.flush(); total_found = self.session_store.count
             self.log.log(f"Скан завершён. Найдено {total_found} уникальных профилей."); self.scan_btn.setEnabled(True)
\ No newline at end of file
@@ -1,13 +1,57 @@
-from PySide6.QtWidgets import QTextEdit
+# src/gui/widgets/log_console.py
+import logging
+from collections import deque
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QPlainTextEdit
+
+from core.log_manager import LogManager, StructuredFormatter, get_logger
+
+MAX_LINES = 5000          # Сколько строк хранит консоль; старые удаляются
+RENDER_INTERVAL_MS = 200  # Как часто накопленные строки выводятся одним блоком
+CONSOLE_FORMAT = "[%(asctime)s] %(message)s"
+
+class RingBufferHandler(logging.Handler):
+    """Копит отформатированные строки в кольцевом буфере; вызывается из потока журнала."""
+
+    def __init__(self, capacity: int = MAX_LINES):
+        super().__init__()
+        self.lines = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def drain(self) -> list[str]:
+        lines = []
+        while self.lines:
+            lines.append(self.lines.popleft())
+        return lines
+
+class LogConsole(QPlainTextEdit):
+    """Консоль журнала: записи всех логгеров osint.*, не больше MAX_LINES строк."""
 
-class LogConsole(QTextEdit):
     def __init__(self):
         super().__init__()
         self.setReadOnly(True)
         self.setObjectName("logConsole")
+        self.setMaximumBlockCount(MAX_LINES)
+        self.logger = get_logger("gui")
+        self.handler = RingBufferHandler()
+        self.handler.setFormatter(StructuredFormatter(CONSOLE_FORMAT, "%H:%M:%S"))
+        LogManager.add_handler(self.handler)
+        self.timer = QTimer(self)
+        self.timer.setInterval(RENDER_INTERVAL_MS)
+        self.timer.timeout.connect(self.render_pending)
+        self.timer.start()
+        handler = self.handler # Ссылка на self из слота destroyed уже недействительна
+        self.destroyed.connect(lambda: LogManager.remove_handler(handler))
 
     def log(self, text: str):
-        from datetime import datetime
-        t = datetime.now().strftime("%H:%M:%S")
-        self.append(f"[{t}] {text}")
-        self.ensureCursorVisible()
+        self.logger.info(text)
+
+    def render_pending(self):
+        if lines := self.handler.drain():
+            self.appendPlainText("\n".join(lines))
@@ -0,0 +1,337 @@
+# src/gui/widgets/result_view.py
+import asyncio
+from collections import OrderedDict
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QScroller, QAbstractItemView
+from PySide6.QtGui import QPixmap, QImage, QColor, QFont, QFontMetrics, QPainter, QPainterPath, QDesktopServices
+from PySide6.QtCore import (
+    Qt, QAbstractListModel, QSortFilterProxyModel, QModelIndex, QRect, QSize, QUrl, QEvent, QBuffer, QIODevice, QTimer
+)
+from core.avatar_cache import AvatarCache
+from core.data_model import NormalizedData
+from core.log_manager import get_logger
+
+ENTRY_ROLE = Qt.UserRole + 1
+
+AVATAR_SIZE = 96
+CARD_PADDING = 8
+CARD_MARGIN = 3
+TEXT_SPACING = 2
+FLUSH_INTERVAL_MS = 50 # Результаты, пришедшие за это время, вставляются в список одной пачкой
+
+log = get_logger("gui")
+
+# Цвета карточки повторяют theme.qss
+CARD_COLOR = QColor("#131921")
+AVATAR_PLACEHOLDER_COLOR = QColor("#2b3340")
+TITLE_COLOR = QColor("#e6f2ff")
+SUBTITLE_COLOR = QColor("#9fb6d3")
+DETAILS_COLOR = QColor("#bcd2e9")
+LINK_COLOR = QColor("#3b84c2")
+
+
+class ResultEntry:
+    """Данные одной карточки результата. Хранятся в модели, а не в виджетах."""
+    __slots__ = (
+        "seq", "title", "subtitle", "details", "avatar_src", "avatar_loader",
+        "avatar_path", "avatar_requested", "normalized_data", "source_username",
+    )
+
+    def __init__(self, seq: int, title: str, subtitle: str = "", avatar_url: str | None = None, details: dict | None = None,
+                 normalized_data: NormalizedData = None, source_username: str = None, avatar_loader=None):
+        self.seq = seq
+        self.title = title
+        self.subtitle = subtitle
+        # Пустые поля отбрасываем сразу, ссылки распознаем один раз
+        self.details = tuple(
+            (str(k), str(v), isinstance(v, str) and v.startswith(('http://', 'https://')))
+            for k, v in (details or {}).items() if v is not None and v != ""
+        )
+        self.avatar_src = avatar_url
+        self.avatar_loader = avatar_loader
+        self.avatar_path: str | None = None
+        self.avatar_requested = False
+        self.normalized_data = normalized_data
+        self.source_username = source_username
+
+
+class ResultListModel(QAbstractListModel):
+    """Список результатов одной вкладки. Новые результаты показываются сверху."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: list[ResultEntry] = []
+        self._pending: list[ResultEntry] = []
+        self._by_source: dict[str, list[ResultEntry]] = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def _row_of(self, entry: ResultEntry) -> int:
+        return len(self._entries) - 1 - entry.seq
+
+    def entry_at(self, row: int) -> ResultEntry:
+        # Записи хранятся в порядке поступления, поэтому строка 0 — последняя запись
+        return self._entries[len(self._entries) - 1 - row]
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entry_at(index.row())
+        if role == ENTRY_ROLE:
+            return entry
+        if role == Qt.DisplayRole:
+            return entry.title
+        if role == Qt.ToolTipRole:
+            return entry.subtitle or None
+        return None
+
+    def entries(self) -> list[ResultEntry]:
+        """Все записи, включая еще не показанные."""
+        return self._entries + self._pending if self._pending else self._entries
+
+    def add_result(self, card_data: dict, source_username: str):
+        seq = len(self._entries) + len(self._pending)
+        entry = ResultEntry(seq, **card_data, source_username=source_username)
+        self._pending.append(entry)
+        self._by_source.setdefault(source_username, []).append(entry)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Вставляет накопленные результаты сверху списка за одно уведомление представлению."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(self._pending) - 1)
+        self._entries.extend(self._pending)
+        self._pending = []
+        self.endInsertRows()
+
+    def clear(self):
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._entries = []
+        self._pending = []
+        self._by_source = {}
+        self.endResetModel()
+
+    def notify_source_changed(self, source_username: str):
+        """Сообщает представлениям, что изменились уже показанные записи ника (прокси перепроверит только их)."""
+        for entry in self._by_source.get(source_username, ()):
+            if entry.seq < len(self._entries):
+                index = self.index(self._row_of(entry))
+                self.dataChanged.emit(index, index)
+
+    def request_avatar(self, entry: ResultEntry):
+        """Запускает загрузку аватара. Вызывается делегатом, только когда строка видна."""
+        if entry.avatar_requested or not (entry.avatar_src or entry.avatar_loader):
+            return
+        entry.avatar_requested = True
+        asyncio.create_task(self._load_avatar(entry))
+
+    async def _load_avatar(self, entry: ResultEntry):
+        try:
+            src = entry.avatar_src
+            if not src and entry.avatar_loader:
+                # loader — корутина модуля, которая скачивает фото и возвращает путь к файлу
+                src = await entry.avatar_loader()
+            if not src or not (thumb_path := await AvatarCache.get_thumbnail(src)):
+                return
+            entry.avatar_path = str(thumb_path)
+            if entry.seq < len(self._entries) and self._entries[entry.seq] is entry:
+                index = self.index(self._row_of(entry))
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+        except Exception as e:
+            log.warning("Не удалось загрузить аватар %s: %s", entry.avatar_src or entry.title, e)
+
+
+class ResultFilterProxy(QSortFilterProxyModel):
+    """Показывает только результаты с разрешенными исходными никами (None — все)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._allowed: set[str] | None = None
+
+    def _change_filter(self, allowed: set[str] | None):
+        # beginFilterChange появился в Qt 6.9, invalidateFilter там объявлен устаревшим
+        if hasattr(self, "beginFilterChange"):
+            self.beginFilterChange()
+            self._allowed = allowed
+            self.endFilterChange()
+        else:
+            self._allowed = allowed
+            self.invalidateFilter()
+
+    def set_allowed(self, source_usernames: set[str] | None):
+        self._change_filter(None if source_usernames is None else set(source_usernames))
+
+    def allow(self, source_username: str):
+        """
+        Добавляет ник в разрешенные. Фильтр целиком не пересчитывается: еще не вставленные
+        записи ника проверятся при вставке, а уже вставленные перепроверяются по dataChanged.
+        """
+        if self._allowed is not None and source_username not in self._allowed:
+            self._allowed.add(source_username)
+            self.sourceModel().notify_source_changed(source_username)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._allowed is None:
+            return True
+        return self.sourceModel().entry_at(source_row).source_username in self._allowed
+
+
+class ResultDelegate(QStyledItemDelegate):
+    """Рисует карточку результата: аватар, заголовок, подзаголовок и строки деталей."""
+
+    @staticmethod
+    def _source(index: QModelIndex) -> tuple[ResultListModel, int]:
+        model = index.model()
+        if isinstance(model, QSortFilterProxyModel):
+            return model.sourceModel(), model.mapToSource(index).row()
+        return model, index.row()
+
+    def _fonts(self, base: QFont) -> tuple[QFont, QFont, QFont, QFont]:
+        title = QFont(base); title.setPixelSize(14); title.setBold(True)
+        subtitle = QFont(base); subtitle.setPixelSize(12)
+        details = QFont(base); details.setPixelSize(11)
+        key = QFont(details); key.setBold(True)
+        return title, subtitle, details, key
+
+    def _text_rect(self, rect: QRect) -> QRect:
+        card = rect.adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN)
+        left = card.left() + CARD_PADDING + AVATAR_SIZE + CARD_PADDING
+        return QRect(left, card.top() + CARD_PADDING, card.right() - CARD_PADDING - left, card.height() - 2 * CARD_PADDING)
+
+    def _detail_lines(self, rect: QRect, entry: ResultEntry, fonts):
+        """Раскладка строк деталей: (ключ, значение, ссылка?, x значения, прямоугольник строки)."""
+        title_font, subtitle_font, details_font, key_font = fonts
+        text_rect = self._text_rect(rect)
+        y = text_rect.top() + QFontMetrics(title_font).height() + TEXT_SPACING + QFontMetrics(subtitle_font).height() + TEXT_SPACING
+        line_height = QFontMetrics(details_font).height() + TEXT_SPACING
+        key_metrics = QFontMetrics(key_font)
+        for key, value, is_link in entry.details:
+            label = f"{key}: "
+            value_x = text_rect.left() + key_metrics.horizontalAdvance(label)
+            yield label, value, is_link, value_x, QRect(text_rect.left(), y, text_rect.width(), line_height)
+            y += line_height
+
+    def sizeHint(self, option, index) -> QSize:
+        model, row = self._source(index)
+        entry = model.entry_at(row)
+        title_font, subtitle_font, details_font, _ = self._fonts(option.font)
+        text_height = (QFontMetrics(title_font).height() + QFontMetrics(subtitle_font).height() + 2 * TEXT_SPACING
+                       + len(entry.details) * (QFontMetrics(details_font).height() + TEXT_SPACING))
+        height = max(AVATAR_SIZE, text_height) + 2 * (CARD_PADDING + CARD_MARGIN)
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter: QPainter, option, index):
+        model, row = self._source(index)
+        entry = model.entry_at(row)
+        fonts = self._fonts(option.font)
+        title_font, subtitle_font, details_font, key_font = fonts
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        card = QRect(option.rect).adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN)
+        path = QPainterPath(); path.addRoundedRect(card, 8, 8)
+        painter.fillPath(path, CARD_COLOR)
+
+        avatar_rect = QRect(card.left() + CARD_PADDING, card.top() + CARD_PADDING, AVATAR_SIZE, AVATAR_SIZE)
+        avatar_path = QPainterPath(); avatar_path.addRoundedRect(avatar_rect, 6, 6)
+        pixmap = get_pixmap(entry.avatar_path) if entry.avatar_path else None
+        if pixmap is not None and not pixmap.isNull():
+            painter.setClipPath(avatar_path)
+            painter.drawPixmap(avatar_rect, pixmap)
+            painter.setClipping(False)
+        else:
+            painter.fillPath(avatar_path, AVATAR_PLACEHOLDER_COLOR)
+            model.request_avatar(entry)
+
+        text_rect = self._text_rect(option.rect)
+        y = text_rect.top()
+        for text, font, color in ((entry.title, title_font, TITLE_COLOR), (entry.subtitle, subtitle_font, SUBTITLE_COLOR)):
+            metrics = QFontMetrics(font)
+            painter.setFont(font); painter.setPen(color)
+            painter.drawText(QRect(text_rect.left(), y, text_rect.width(), metrics.height()), Qt.AlignLeft | Qt.AlignVCenter,
+                             metrics.elidedText(text, Qt.ElideRight, text_rect.width()))
+            y += metrics.height() + TEXT_SPACING
+
+        details_metrics = QFontMetrics(details_font)
+        for label, value, is_link, value_x, line in self._detail_lines(option.rect, entry, fonts):
+            painter.setFont(key_font); painter.setPen(DETAILS_COLOR)
+            painter.drawText(line, Qt.AlignLeft | Qt.AlignTop, label)
+            link_font = QFont(details_font); link_font.setUnderline(is_link)
+            painter.setFont(link_font); painter.setPen(LINK_COLOR if is_link else DETAILS_COLOR)
+            value_rect = QRect(value_x, line.top(), line.right() - value_x, line.height())
+            painter.drawText(value_rect, Qt.AlignLeft | Qt.AlignTop, details_metrics.elidedText(value, Qt.ElideRight, value_rect.width()))
+        painter.restore()
+
+    def _link_at(self, option, index, pos) -> str | None:
+        model, row = self._source(index)
+        entry = model.entry_at(row)
+        for _, value, is_link, value_x, line in self._detail_lines(option.rect, entry, self._fonts(option.font)):
+            if is_link and line.contains(pos) and pos.x() >= value_x:
+                return value
+        return None
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        # Ссылки в деталях кликабельны, как раньше в QLabel карточки
+        if event.type() == QEvent.MouseMove:
+            link = self._link_at(option, index, event.position().toPoint())
+            option.widget.viewport().setCursor(Qt.PointingHandCursor if link else Qt.ArrowCursor)
+        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if link := self._link_at(option, index, event.position().toPoint()):
+                QDesktopServices.openUrl(QUrl(link))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class ResultListView(QListView):
+    """Виртуализированный список карточек: рисуются только видимые строки."""
+
+    def __init__(self, model: QAbstractListModel, parent=None):
+        super().__init__(parent)
+        self.setObjectName("resultList")
+        self.setModel(model)
+        self.setItemDelegate(ResultDelegate(self))
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.Adjust)
+        # Раскладка большого списка выполняется порциями, не блокируя интерфейс
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        QScroller.grabGesture(self.viewport(), QScroller.ScrollerGestureType.LeftMouseButtonGesture)
+
+
+_pixmaps: OrderedDict[str, QPixmap] = OrderedDict()
+PIXMAP_CACHE_SIZE = 512
+
+def get_pixmap(path) -> QPixmap:
+    """QPixmap миниатюры; одинаковые аватары разных карточек используют один объект."""
+    key = str(path)
+    if (pixmap := _pixmaps.get(key)) is not None:
+        _pixmaps.move_to_end(key)
+        return pixmap
+    pixmap = QPixmap(key)
+    _pixmaps[key] = pixmap
+    if len(_pixmaps) > PIXMAP_CACHE_SIZE:
+        _pixmaps.popitem(last=False)
+    return pixmap
+
+def make_thumbnail(content: bytes) -> bytes | None:
+    """Декодирует картинку и уменьшает ее до 96x96 PNG. Вызывается вне GUI-потока."""
+    img = QImage.fromData(content)
+    if img.isNull():
+        return None
+    thumb = img.scaled(AVATAR_SIZE, AVATAR_SIZE, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    thumb.save(buffer, "PNG")
+    return bytes(buffer.data())
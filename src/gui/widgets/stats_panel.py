@@ -0,0 +1,66 @@
+# src/gui/widgets/stats_panel.py
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QAbstractItemView, QHeaderView, QTableWidget, QTableWidgetItem
+
+from core.metrics import Metrics
+
+REFRESH_INTERVAL_MS = 1000
+
+def _number(value) -> str:
+    return "0" if value is None else f"{value:g}"
+
+def _millis(value) -> str:
+    # Квантиль известен с точностью до корзины гистограммы, поэтому это верхняя граница
+    return "—" if value is None else f"≤{value * 1000:g}"
+
+def _percent(value) -> str:
+    return "—" if value is None else f"{value:.0%}"
+
+# Строка таблицы -> (поле сводки Metrics.modules_summary, форматирование)
+ROWS = [
+    ("Запросы", "requests", _number),
+    ("p50, мс", "p50", _millis),
+    ("p95, мс", "p95", _millis),
+    ("Ошибки", "errors", _number),
+    ("Таймауты", "timeouts", _number),
+    ("Повторы", "retries", _number),
+    ("Лимиты", "rate_limited", _number),
+    ("FloodWait, с", "flood_wait", _number),
+    ("Кэш", "cache_hit_ratio", _percent),
+    ("Очередь", "queue", _number),
+    ("Отложено", "parked", _number),
+]
+
+class StatsPanel(QTableWidget):
+    """Живая сводка метрик сканера: столбец на модуль, строка на показатель."""
+
+    def __init__(self, display_names: dict[str, str] | None = None, parent=None):
+        super().__init__(len(ROWS), 0, parent)
+        self.setObjectName("statsPanel")
+        self.display_names = display_names or {}
+        self.setVerticalHeaderLabels([title for title, _, _ in ROWS])
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        summary = Metrics.modules_summary()
+        modules = list(self.display_names) or list(summary)
+        if self.columnCount() != len(modules):
+            self.setColumnCount(len(modules))
+            self.setHorizontalHeaderLabels([self.display_names.get(name, name) for name in modules])
+        for column, name in enumerate(modules):
+            values = summary.get(name, {})
+            for row, (_, key, fmt) in enumerate(ROWS):
+                text = fmt(values.get(key))
+                if (item := self.item(row, column)) is None:
+                    self.setItem(row, column, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
@@ -15,12 +15,17 @@ qasync_logger.setLevel(logging.DEBUG)
 
 from pathlib import Path
 from gui.main_window import MainWindow
+from gui.widgets.result_view import make_thumbnail
 from core.http_client import HttpClient
-from core.module_loader import load_modules, shutdown_modules
+from core.module_loader import load_modules, shutdown_modules, get_config
+from core.result_cache import ResultCache
+from core.avatar_cache import AvatarCache
 
 async def startup():
     logging.debug("--- [DEBUG] НАЧАЛО АСИНХРОННОГО СТАРТА (startup) ---")
     await HttpClient.initialize()
+    ResultCache.initialize(get_config().get("cache"))
+    AvatarCache.initialize(get_config().get("avatars"), thumbnailer=make_thumbnail)
     await load_modules()
     logging.debug("--- [DEBUG] АСИНХРОННЫЙ СТАРТ (startup) ЗАВЕРШЕН ---")
 
@@ -28,6 +33,8 @@ async def cleanup():
     logging.debug("--- [DEBUG] НАЧАЛО АСИНХРОННОЙ ОЧИСТКИ (cleanup) ---")
     await shutdown_modules()
     await HttpClient.close()
+    ResultCache.close()
+    AvatarCache.close()
     logging.debug("--- [DEBUG] АСИНХРОННАЯ ОЧИСТКА (cleanup) ЗАВЕРШЕНА ---")
 
 if __name__ == "__main__":
@@ -6,20 +6,32 @@ from qasync import QEventLoop
 from pathlib import Path
 
 from gui.main_window import MainWindow
+from gui.widgets.result_view import make_thumbnail
 from core.http_client import HttpClient
-from core.module_loader import load_modules, shutdown_modules
+from core.log_manager import LogManager, get_logger
+from core.module_loader import load_modules, shutdown_modules, get_config
+from core.result_cache import ResultCache
+from core.avatar_cache import AvatarCache
+
+log = get_logger("app")
 
 async def startup():
     """Асинхронные задачи перед запуском GUI."""
-    await HttpClient.initialize()
+    LogManager.initialize(get_config().get("logging"))
+    await HttpClient.initialize(get_config().get("http"))
+    ResultCache.initialize(get_config().get("cache"))
+    AvatarCache.initialize(get_config().get("avatars"), thumbnailer=make_thumbnail)
     await load_modules()
 
 async def cleanup():
     """Асинхронные задачи для корректного завершения."""
-    print("\n[*] Начало процесса завершения...")
+    log.info("Начало процесса завершения...")
     await shutdown_modules()
     await HttpClient.close()
-    print("[*] Все системы выгружены. Выход.")
+    ResultCache.close()
+    AvatarCache.close()
+    log.info("Все системы выгружены. Выход.")
+    LogManager.close()
 
 
 if __name__ == "__main__":
@@ -45,9 +57,9 @@ if __name__ == "__main__":
             loop.run_forever()
 
     except KeyboardInterrupt:
-        print("\n[*] Приложение закрыто пользователем.")
+        log.info("Приложение закрыто пользователем.")
     finally:
         if loop.is_running():
-            print("[*] Цикл событий GUI завершен, выполняется очистка...")
+            log.info("Цикл событий GUI завершен, выполняется очистка...")
             loop.run_until_complete(cleanup())
         loop.close()
\ No newline at end of file
@@ -1,53 +1,221 @@
 # src/modules/github.py
 import asyncio
+import re
+import time
 from core.http_client import HttpClient
 from datetime import datetime
 from core.data_model import NormalizedData
+from core.log_manager import get_logger
+from core.rate_limiter import get_rate_limiter
+from core.resilience import RETRYABLE_ERRORS, RetryableError, parse_retry_after, with_retry
+from core.scanner import STRATEGY_BULK, STRATEGY_PARALLEL
+
+# Авторизованный REST допускает 5000 запросов в час; фактический темп
+# подстраивается по заголовкам X-RateLimit-* каждого ответа
+RATE_LIMIT = {"rate": 10.0, "burst": 10, "concurrency": 10}
+CACHE_TTL = 24 * 3600
+# До 39 символов: латиница, цифры и одиночные дефисы не в начале и не в конце
+USERNAME_PATTERN = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9]|-(?=[A-Za-z0-9])){0,38}")
 
 _token: str | None = None
 _headers: dict = {}
 
+log = get_logger("github")
+
 async def initialize(module_config: dict):
     global _token, _headers
     token_from_config = module_config.get("token")
     if isinstance(token_from_config, str) and token_from_config.strip():
         _token = token_from_config.strip()
         _headers = {"Authorization": f"Bearer {_token}"}
-        print("[*] Модуль GitHub будет использовать токен авторизации.")
+        log.info("Модуль GitHub будет использовать токен авторизации.")
     else:
-        print("[!] Токен GitHub не найден или пуст. Запросы будут анонимными с низким лимитом.")
+        log.warning("Токен GitHub не найден или пуст. Запросы будут анонимными с низким лимитом.")
 
 async def shutdown():
     """Для этого модуля не требуется специальных действий при выключении."""
     pass
 
+def _track_rate_limit(resp) -> float | None:
+    """
+    Передает ограничителю модуля квоту и сигналы о превышении лимита из ответа GitHub.
+    Для ответа о превышении лимита возвращает, сколько секунд ждать (None — сервер не сказал).
+    """
+    limiter = get_rate_limiter("github")
+    headers = resp.headers
+    try:
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset_at = float(headers["X-RateLimit-Reset"])
+        limit = int(headers.get("X-RateLimit-Limit", 0)) or None
+    except (KeyError, ValueError):
+        remaining = reset_at = limit = None
+
+    if resp.status in (403, 429):
+        # Вторичные лимиты приходят с Retry-After, исчерпанная квота — с нулевым остатком
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None and remaining == 0 and reset_at:
+            retry_after = max(reset_at - time.time(), 1.0)
+        limiter.on_rate_limited(retry_after)
+        return retry_after
+
+    limiter.update_quota(remaining, reset_at, limit)
+    if resp.status < 400:
+        limiter.on_success()
+    return None
+
 async def scan(username: str):
-    print(f"[GITHUB] Запрос для '{username}'")
-    url = f"https://api.github.com/users/{username}"
+    url = HttpClient.resolve_url(f"https://api.github.com/users/{username}")
     session = HttpClient.get_session()
     
     try:
         async with session.get(url, headers=_headers) as resp:
+            retry_after = _track_rate_limit(resp)
             if resp.status == 404:
                 return None
             if resp.status == 401:
-                print(f"[GITHUB ERROR] Ошибка 401 для '{username}'. Неверный токен.")
+                log.error("Ошибка 401: неверный токен.", extra={"platform": "github", "username": username, "status": 401})
                 return {"error": "Ошибка авторизации GitHub"}
-            if resp.status == 403:
-                # API отвечает 403 при превышении лимита
-                print(f"[GITHUB ERROR] HTTP 403 для '{username}'. Вероятно, превышен лимит запросов.")
-                return {"error": "Превышен лимит запросов GitHub"}
-            
-            resp.raise_for_status() # Вызовет исключение для других ошибок 4xx/5xx
+            if resp.status in (403, 429):
+                # API отвечает 403 при превышении лимита; повтором и паузой займется сканер
+                log.info("HTTP %d: превышен лимит запросов.", resp.status, extra={"platform": "github", "username": username, "status": resp.status})
+                raise RetryableError("Превышен лимит запросов GitHub", retry_after)
+            if resp.status >= 500:
+                raise RetryableError(f"GitHub HTTP {resp.status}")
+
+            resp.raise_for_status() # Вызовет исключение для других ошибок 4xx
             return await resp.json()
 
-    except asyncio.TimeoutError:
-        print(f"[GITHUB ERROR] Таймаут для '{username}'")
-        return {"error": "timeout"}
+    except RETRYABLE_ERRORS:
+        raise # Временные сбои повторяет сканер
     except Exception as e:
-        print(f"[GITHUB ERROR] Исключение для '{username}': {e}")
+        log.warning("Исключение при запросе: %s", e, extra={"platform": "github", "username": username})
         return {"error": str(e)}
 
+# Каждый логин в запросе — это user() и два счетчика-соединения, т.е. 3 "подзапроса".
+# GitHub списывает 1 балл GraphQL-лимита за каждые 100 подзапросов, поэтому 33 логина
+# на запрос укладываются в минимальную стоимость.
+_GRAPHQL_NODES_PER_LOGIN = 3
+_GRAPHQL_CHUNK_SIZE = 100 // _GRAPHQL_NODES_PER_LOGIN
+_graphql_semaphore = asyncio.Semaphore(4)
+
+_USER_FRAGMENT = """
+fragment UserFields on User {
+  login name email location company avatarUrl url createdAt bio websiteUrl twitterUsername
+  followers { totalCount }
+  repositories(privacy: PUBLIC, ownerAffiliations: OWNER) { totalCount }
+}
+"""
+
+def get_strategy() -> str:
+    """С токеном ники резолвятся пачками через GraphQL, без токена — по одному через REST."""
+    return STRATEGY_BULK if _token else STRATEGY_PARALLEL
+
+def chunk_usernames(usernames: list[str]) -> list[list[str]]:
+    """Разбивает список ников на пачки для одного GraphQL-запроса."""
+    return [usernames[i:i + _GRAPHQL_CHUNK_SIZE] for i in range(0, len(usernames), _GRAPHQL_CHUNK_SIZE)]
+
+def _build_graphql_query(usernames: list[str]) -> tuple[str, dict]:
+    """Собирает запрос с алиасами u0..uN и переменными для логинов."""
+    variables = {f"l{i}": username for i, username in enumerate(usernames)}
+    params = ", ".join(f"$l{i}: String!" for i in range(len(usernames)))
+    fields = "\n".join(f"  u{i}: user(login: $l{i}) {{ ...UserFields }}" for i in range(len(usernames)))
+    return f"query({params}) {{\n{fields}\n}}\n{_USER_FRAGMENT}", variables
+
+def _graphql_user_to_rest(user: dict) -> dict:
+    """Приводит объект User из GraphQL к формату ответа REST /users/{username}."""
+    return {
+        "login": user.get("login"),
+        "name": user.get("name"),
+        "email": user.get("email") or None,
+        "location": user.get("location"),
+        "company": user.get("company"),
+        "avatar_url": user.get("avatarUrl"),
+        "html_url": user.get("url"),
+        "created_at": user.get("createdAt"),
+        "bio": user.get("bio"),
+        "blog": user.get("websiteUrl") or "",
+        "twitter_username": user.get("twitterUsername"),
+        "followers": (user.get("followers") or {}).get("totalCount"),
+        "public_repos": (user.get("repositories") or {}).get("totalCount"),
+    }
+
+async def _fetch_chunk(usernames: list[str]) -> tuple[list[str], dict]:
+    """Резолвит пачку логинов одним GraphQL-запросом."""
+    query, variables = _build_graphql_query(usernames)
+    session = HttpClient.get_session()
+
+    async def attempt() -> dict | None:
+        async with _graphql_semaphore:
+            await get_rate_limiter("github").acquire()
+            async with session.post(HttpClient.resolve_url("https://api.github.com/graphql"), json={"query": query, "variables": variables}, headers=_headers) as resp:
+                retry_after = _track_rate_limit(resp)
+                if resp.status == 401:
+                    log.error("Ошибка 401 для GraphQL-запроса: неверный токен.", extra={"platform": "github", "status": 401})
+                    return None # Неверный токен повтором не исправить
+                if resp.status in (403, 429):
+                    log.info("HTTP %d для GraphQL-запроса (%d ников): превышен лимит запросов.", resp.status, len(usernames), extra={"platform": "github", "status": resp.status})
+                    raise RetryableError("Превышен лимит запросов GitHub", retry_after)
+                if resp.status >= 500:
+                    raise RetryableError(f"GitHub HTTP {resp.status}")
+
+                resp.raise_for_status()
+                return await resp.json()
+
+    try:
+        data = await with_retry("github", attempt)
+    except asyncio.TimeoutError:
+        log.info("Таймаут GraphQL-запроса для %d ников.", len(usernames), extra={"platform": "github", "status": "timeout"})
+        return usernames, {u: {"error": "timeout"} for u in usernames}
+    except Exception as e:
+        log.warning("Исключение при GraphQL-запросе: %s", e, extra={"platform": "github"})
+        return usernames, {u: {"error": str(e)} for u in usernames}
+    if data is None:
+        return usernames, {u: {"error": "Ошибка авторизации GitHub"} for u in usernames}
+
+    # NOT_FOUND для отдельного алиаса — обычный "ник не занят", остальные ошибки помечаем
+    failed = {}
+    for error in data.get("errors") or []:
+        path = error.get("path") or []
+        if path and error.get("type") != "NOT_FOUND":
+            failed[path[0]] = error.get("message", "GraphQL error")
+    if not data.get("data"):
+        message = "; ".join(e.get("message", "") for e in data.get("errors") or []) or "Пустой ответ GraphQL"
+        log.warning("GraphQL-запрос завершился ошибкой: %s", message, extra={"platform": "github"})
+        return usernames, {u: {"error": message} for u in usernames}
+
+    results = {}
+    nodes = data.get("data") or {}
+    for i, username in enumerate(usernames):
+        alias = f"u{i}"
+        if alias in failed:
+            results[username] = {"error": failed[alias]}
+        elif user := nodes.get(alias):
+            results[username] = _graphql_user_to_rest(user)
+    log.debug("GraphQL-пачка из %d ников вернула %d профилей.", len(usernames), len(results), extra={"platform": "github"})
+    return usernames, results
+
+async def scan_bulk_stream(usernames: list[str]):
+    """Отдает результат каждой GraphQL-пачки как (ники_пачки, {ник: профиль}) по мере готовности."""
+    if not _token or not usernames:
+        return
+
+    chunks = chunk_usernames(usernames)
+    log.debug("Пакетный GraphQL-запрос для %d ников (%d пачек).", len(usernames), len(chunks), extra={"platform": "github"})
+    tasks = [asyncio.create_task(_fetch_chunk(chunk)) for chunk in chunks]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def scan_bulk(usernames: list[str]):
+    """Собирает все пачки в один словарь {ник: профиль}."""
+    results = {}
+    async for _, chunk_result in scan_bulk_stream(usernames):
+        results.update(chunk_result)
+    return results
+
 def _format_iso_date(date_str: str | None) -> str:
     if not date_str: return ""
     try:
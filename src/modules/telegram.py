@@ -1,75 +1,160 @@
 # src/modules/telegram.py
 import os
-import asyncio
-from telethon import types
+import re
+from functools import partial
+from telethon import functions, types
 from telethon.errors.rpcerrorlist import UsernameInvalidError, UsernameNotOccupiedError, FloodWaitError
 from datetime import datetime
 
 from core.data_model import NormalizedData
+from core.log_manager import get_logger
+from core.metrics import Metrics
 from core.telegram_client import TelegramClientManager
+from core.telegram_entities import TelegramEntityCache
+from core.rate_limiter import get_rate_limiter, configure_rate_limiter
+from core.resilience import RetryableError, get_circuit_breaker
+from core.scanner import STRATEGY_SEQUENTIAL
+
+STRATEGY = STRATEGY_SEQUENTIAL
+# Темп одного аккаунта: запрос раз в 1.5-2.2с (базовый интервал ~1.5с плюс случайная добавка до 0.7с).
+# Общий ограничитель модуля после подключения пула масштабируется на число аккаунтов.
+RATE_LIMIT = {"rate": 0.65, "burst": 1, "concurrency": 1, "jitter": 0.7, "max_rate": 0.65}
+CACHE_TTL = 12 * 3600
+# 4-32 символа: латиница, цифры и '_', начинается с буквы, не кончается на '_' и без '__' подряд
+USERNAME_PATTERN = re.compile(r"@?(?!.*__)[A-Za-z][A-Za-z0-9_]{2,30}[A-Za-z0-9]")
+
+log = get_logger("telegram")
 
 
 async def initialize(module_config: dict):
-    """Инициализирует глобальный клиент Telegram."""
-    await TelegramClientManager.initialize(module_config)
+    """Подключает пул клиентов Telegram и масштабирует лимит модуля на число аккаунтов."""
+    TelegramEntityCache.initialize(module_config.get("entity_cache_ttl"))
+    per_account = get_rate_limiter("telegram")
+    pacing = {"rate": per_account.base_rate, "burst": per_account.burst, "jitter": per_account.jitter, "max_rate": per_account.max_rate}
+    await TelegramClientManager.initialize(module_config, pacing)
+
+    # Темп каждого аккаунта соблюдает сам пул, общий ограничитель только задает число исполнителей
+    accounts = max(1, TelegramClientManager.pool_size())
+    configure_rate_limiter("telegram", {"rate": pacing["rate"] * accounts, "max_rate": pacing["max_rate"] * accounts,
+                                        "burst": accounts, "concurrency": accounts})
 
 async def shutdown():
-    """Корректно отключает глобальный клиент Telegram."""
+    """Корректно отключает пул клиентов Telegram."""
     await TelegramClientManager.close()
+    TelegramEntityCache.close()
+
+def scan_cached(username: str) -> dict | None:
+    """
+    Результат из локального кэша сущностей без обращения к Telegram (None — ника в кэше нет).
+    Сканер вызывает его до ограничителя, поэтому попадание в кэш не занимает слот темпа аккаунта.
+    """
+    if cached := TelegramEntityCache.get(username.lstrip("@")):
+        return _build_info(cached["user"])
+    return None
 
 async def scan(username: str):
-    """Выполняет запрос, используя общий, уже подключенный клиент."""
+    """
+    Разрешает ник: сначала по локальному кэшу сущностей, иначе напрямую
+    через contacts.ResolveUsername на свободном аккаунте пула.
+    Фото профиля здесь не скачивается — см. fetch_photo().
+    FloodWait и обрыв связи поднимают RetryableError: повтор (на другом аккаунте,
+    если он есть) и паузу назначает сканер.
+    """
+    username = username.lstrip("@")
+    if cached := scan_cached(username):
+        return cached
+
     try:
-        client = TelegramClientManager.get_client()
+        async with TelegramClientManager.lease() as slot:
+            try:
+                resolved = await slot.client(functions.contacts.ResolveUsernameRequest(username=username))
+                slot.limiter.on_success()
+            except FloodWaitError as e:
+                Metrics.inc("flood_wait_seconds_total", "telegram", e.seconds)
+                slot.limiter.on_rate_limited(e.seconds + 2)
+                single_account = TelegramClientManager.pool_size() == 1
+                # Ожидание дольше паузы автомата имеет смысл пережидать только на другом аккаунте
+                if single_account and e.seconds > get_circuit_breaker("telegram").max_reset_timeout:
+                    log.warning("Слишком долгое ожидание FloodWait (%dс). Запрос отменен.", e.seconds, extra={"platform": "telegram", "username": username, "status": "flood_wait"})
+                    return {"error": f"FloodWait too long ({e.seconds}s)"}
+                log.info("Сессия '%s' получила FloodWait на %dс.", slot.session_name, e.seconds, extra={"platform": "telegram", "username": username, "status": "flood_wait"})
+                raise RetryableError(f"FloodWait {e.seconds}s", e.seconds if single_account else None)
+            except (UsernameInvalidError, UsernameNotOccupiedError):
+                slot.limiter.on_success()
+                return None
+            except ConnectionError as e:
+                raise RetryableError(str(e))
+            except Exception as e:
+                return {"error": str(e)}
+
+            # Ник может принадлежать каналу или группе — такие результаты не нужны
+            if not isinstance(resolved.peer, types.PeerUser):
+                return None
+            entity = next((u for u in resolved.users if u.id == resolved.peer.user_id), None)
+            if not isinstance(entity, types.User):
+                return None
+            user = _user_payload(entity)
+            TelegramEntityCache.put(slot.session_name, username, entity.id, entity.access_hash or 0, user)
+            return _build_info(user, _format_tg_status(getattr(entity, 'status', None)))
     except RuntimeError as e:
         return {"error": str(e)}
 
-    print(f"[TELEGRAM] Запрос для '{username}'")
-    
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            entity = await client.get_entity(username)
-            break
-        except FloodWaitError as e:
-            if e.seconds > 60:
-                print(f"[TELEGRAM FLOOD] Слишком долгое ожидание ({e.seconds}с) для '{username}'. Запрос отменен.")
-                return {"error": f"FloodWait too long ({e.seconds}s)"}
-            
-            print(f"[TELEGRAM FLOOD] Получен FloodWait для '{username}' на {e.seconds}с. Ожидание...")
-            await asyncio.sleep(e.seconds + 2)
-            continue
-        except (UsernameInvalidError, UsernameNotOccupiedError, ValueError):
-            return None
-        except Exception as e:
-            return {"error": str(e)}
-    else:
-        return {"error": f"Failed after {max_retries} retries"}
-
-    if not isinstance(entity, types.User):
-        return None
-
-    info = {
+def _user_payload(entity: types.User) -> dict:
+    """
+    Поля пользователя, которые сохраняются в кэше сущностей. Статус «был в сети»
+    сюда не входит: за время жизни записи он устаревает.
+    """
+    return {
         "id": entity.id,
         "username": entity.username,
         "first_name": entity.first_name,
         "last_name": entity.last_name,
         "is_bot": entity.bot,
-        "status_text": _format_tg_status(getattr(entity, 'status', None)),
-        "link": f"https://t.me/{entity.username}" if entity.username else None
+        "has_photo": bool(getattr(entity, "photo", None)),
     }
 
-    if getattr(entity, "photo", None):
-        try:
-            os.makedirs("cache", exist_ok=True)
-            path = f"cache/tg_{username}.jpg"
-            await client.download_profile_photo(entity, path)
-            info["photo"] = path
-        except Exception as e:
-            print(f"Ошибка загрузки фото Telegram: {e}")
-            
+def _build_info(user: dict, status_text: str | None = None) -> dict:
+    """Результат скана; status_text известен только при запросе к Telegram, а не из кэша."""
+    info = {
+        "id": user["id"],
+        "username": user["username"],
+        "first_name": user["first_name"],
+        "last_name": user["last_name"],
+        "is_bot": user["is_bot"],
+        "status_text": status_text,
+        "link": f"https://t.me/{user['username']}" if user["username"] else None
+    }
+    if user.get("has_photo"):
+        info["photo_pending"] = True
     return info
 
+def _photo_path(username: str) -> str:
+    return f"cache/tg_{username}.jpg"
+
+async def fetch_photo(data: dict) -> str | None:
+    """
+    Отложенная загрузка фото профиля. Выполняется в фоне на том аккаунте,
+    который разрешил ник, и только когда аккаунт не нужен основным запросам.
+    """
+    username = data.get("username")
+    if not username or not data.get("photo_pending"):
+        return None
+    path = _photo_path(username)
+    if os.path.exists(path):
+        return path
+
+    cached = TelegramEntityCache.get(username)
+    if cached is None:
+        return None
+    try:
+        async with TelegramClientManager.lease(background=True, session_name=cached["session"]) as slot:
+            os.makedirs("cache", exist_ok=True)
+            peer = types.InputPeerUser(cached["user_id"], cached["access_hash"])
+            return await slot.client.download_profile_photo(peer, path)
+    except Exception as e:
+        log.warning("Ошибка загрузки фото Telegram: %s", e)
+        return None
+
 
 def _format_tg_status(status) -> str | None:
     if isinstance(status, types.UserStatusOnline):
@@ -98,6 +183,8 @@ def format_result_for_gui(data: dict, username: str):
         "title": f"{norm_data.username} - Telegram",
         "subtitle": f"{norm_data.first_name} {norm_data.last_name}".strip(),
         "avatar_url": data.get("photo"),
+        # Фото скачивается в фоне уже после появления карточки
+        "avatar_loader": partial(fetch_photo, data) if data.get("photo_pending") else None,
         "details": details,
         "normalized_data": norm_data
     }
\ No newline at end of file
@@ -1,8 +1,27 @@
 # src/modules/vk.py
 import asyncio
+import json
+import re
+from urllib.parse import quote
 from core.http_client import HttpClient
 from datetime import datetime
 from core.data_model import NormalizedData
+from core.log_manager import get_logger
+from core.rate_limiter import get_rate_limiter
+from core.resilience import RetryableError, with_retry
+from core.scanner import STRATEGY_BULK
+
+STRATEGY = STRATEGY_BULK
+# VK разрешает около 3 запросов в секунду для пользовательского токена
+RATE_LIMIT = {"rate": 3.0, "burst": 1, "concurrency": 3}
+# Онлайн-статус и "последний визит" быстро устаревают
+CACHE_TTL = 6 * 3600
+# Короткий адрес страницы: латиница, цифры, '_' и '.', до 32 символов (числовые ID тоже подходят)
+USERNAME_PATTERN = re.compile(r"[A-Za-z0-9_.]{1,32}")
+_RATE_LIMIT_ERROR_CODES = {6, 9} # "Too many requests per second", "Flood control"
+_TRANSIENT_ERROR_CODES = _RATE_LIMIT_ERROR_CODES | {10} # ... и "Internal server error": стоит повторить
+
+log = get_logger("vk")
 
 _token: str | None = None
 _api_version = "5.199"
@@ -11,50 +30,212 @@ async def initialize(module_config: dict):
     global _token
     _token = module_config.get("token")
     if not _token:
-        print("[!] Токен VK не найден в config.json. Модуль отключен.")
+        log.warning("Токен VK не найден в config.json. Модуль отключен.")
 
 async def shutdown():
     """Для этого модуля не требуется специальных действий при выключении."""
     pass
 
-async def scan_bulk(usernames: list[str]):
-    print(f"[VK] Пакетный запрос для {len(usernames)} ников.")
-    if not _token or not usernames:
-        return {}
-    
-    user_ids_str = ",".join(usernames)
-    fields = "photo_max,city,domain,sex,bdate,status,contacts,last_seen,online,country,counters,occupation,site"
-    url = "https://api.vk.com/method/users.get"
-    params = {"user_ids": user_ids_str, "fields": fields, "access_token": _token, "v": _api_version}
+# Ограничения на размер одного вызова users.get
+_BULK_MAX_IDS = 300      # VK принимает до 1000 ID, но крупные пачки часто отклоняются
+_BULK_MAX_BYTES = 2000   # Длина параметра user_ids в URL-кодированном виде
+_EXECUTE_MAX_CALLS = 25  # Максимум вызовов API внутри одного execute
+# Сколько ников сканер собирает в одну порцию: столько помещается в один execute
+BULK_BATCH_SIZE = _BULK_MAX_IDS * _EXECUTE_MAX_CALLS
+_BULK_FIELDS = "photo_max,city,domain,sex,bdate,status,contacts,last_seen,online,country,counters,occupation,site"
+
+def chunk_usernames(usernames: list[str]) -> list[list[str]]:
+    """Разбивает список ников на пачки, ограниченные числом ID и длиной запроса."""
+    chunks, current, current_bytes = [], [], 0
+    for username in usernames:
+        size = len(quote(username, safe="")) + 3 # ',' в URL превращается в '%2C'
+        if current and (len(current) >= _BULK_MAX_IDS or current_bytes + size > _BULK_MAX_BYTES):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(username)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _user_keys(user_data: dict) -> list[str]:
+    keys = [str(user_data.get("id")), f"id{user_data.get('id')}"]
+    if domain := user_data.get("domain"):
+        keys.append(domain.lower())
+    return keys
+
+def _match_to_input(usernames: list[str], response_list: list[dict]) -> dict:
+    """
+    Раскладывает профили из ответа users.get по исходным никам пачки: по короткому
+    имени (domain) или числовому ID ("123", "id123"). Профиль, запрошенный по старому
+    адресу, ни с одним ником не совпадает. VK отвечает в порядке запроса, пропуская
+    несуществующие страницы, поэтому одиночный такой профиль между двумя совпавшими
+    достается единственному несовпавшему нику на том же месте. Остальные несовпавшие
+    профили возвращаются под своим domain.
+    """
+    index = {}
+    for i, user_data in enumerate(response_list):
+        for key in _user_keys(user_data):
+            index.setdefault(key, i)
+    matched = {u: i for u in usernames if (i := index.get(u.lower())) is not None}
+    used = set(matched.values())
+    gap, last = [], -1
+    for username in [*usernames, None]:
+        if username is not None and username not in matched:
+            gap.append(username)
+            continue
+        position = matched[username] if username is not None else len(response_list)
+        if position <= last:
+            continue
+        gap_users = [i for i in range(last + 1, position) if i not in used]
+        if len(gap) == 1 and len(gap_users) == 1:
+            matched[gap[0]] = gap_users[0]
+            used.add(gap_users[0])
+        gap, last = [], position
+    result = {u: response_list[i] for u, i in matched.items()}
+    for i, user_data in enumerate(response_list):
+        if i not in used and user_data.get("domain"):
+            result.setdefault(user_data["domain"], user_data)
+    return result
+
+def _build_execute_code(chunks: list[list[str]]) -> str:
+    """Собирает VKScript, выполняющий users.get для каждой пачки и возвращающий массив ответов."""
+    calls = [
+        f'API.users.get({{"user_ids": {json.dumps(",".join(chunk))}, "fields": "{_BULK_FIELDS}"}})'
+        for chunk in chunks
+    ]
+    return f"return [{', '.join(calls)}];"
+
+def _error_message(data: dict) -> str:
+    return data["error"].get("error_msg", "Unknown API error")
+
+def _check_response(status: int, data: dict | None) -> dict:
+    """
+    Разбирает ответ API: временные сбои (HTTP 5xx, коды 6, 9 и 10) поднимают RetryableError,
+    остальные ошибки возвращаются в ответе как есть. Учитывает лимит модуля.
+    """
+    limiter = get_rate_limiter("vk")
+    if status != 200:
+        log.warning("Запрос вернул HTTP %s", status, extra={"platform": "vk", "status": status})
+        if status >= 500 or status == 429:
+            raise RetryableError(f"VK HTTP {status}")
+        return {"error": {"error_msg": f"VK HTTP {status}"}}
+    if "error" in data:
+        code = data["error"].get("error_code")
+        log.warning("API ВКонтакте вернуло ошибку: %s", data["error"], extra={"platform": "vk", "status": code})
+        if code in _RATE_LIMIT_ERROR_CODES:
+            limiter.on_rate_limited()
+        if code in _TRANSIENT_ERROR_CODES:
+            raise RetryableError(_error_message(data))
+        return data
+    if not data.get("execute_errors"):
+        limiter.on_success()
+    return data
+
+async def _fetch_chunk(usernames: list[str]) -> tuple[list[str], dict]:
+    """Выполняет один вызов users.get для пачки ников."""
+    url = HttpClient.resolve_url("https://api.vk.com/method/users.get")
+    params = {"user_ids": ",".join(usernames), "fields": _BULK_FIELDS, "access_token": _token, "v": _api_version}
     
     session = HttpClient.get_session()
     semaphore = HttpClient.get_vk_semaphore()
+    limiter = get_rate_limiter("vk")
     
-    try:
+    async def attempt() -> dict:
         async with semaphore:
-            await asyncio.sleep(0.35) # VK API rate limit
+            await limiter.acquire()
             async with session.get(url, params=params) as resp:
-                if resp.status != 200:
-                    print(f"[VK ERROR] Пакетный запрос вернул HTTP {resp.status}")
-                    return {u: {"error": f"VK HTTP {resp.status}"} for u in usernames}
-                
-                data = await resp.json(content_type=None)
-
-                if "error" in data:
-                    print(f"[VK ERROR] API ВКонтакте вернуло ошибку: {data['error']}")
-                    return {u: {"error": data["error"].get("error_msg", "Unknown API error")} for u in usernames}
-
-                results_by_username = {}
-                if response_list := data.get("response"):
-                    print(f"[VK] Пакетный запрос вернул {len(response_list)} профилей.")
-                    for user_data in response_list:
-                        if domain := user_data.get("domain"):
-                            results_by_username[domain] = user_data
-                return results_by_username
+                return _check_response(resp.status, await resp.json(content_type=None) if resp.status == 200 else None)
 
+    try:
+        data = await with_retry("vk", attempt)
     except Exception as e:
-        print(f"[VK ERROR] Исключение при пакетном запросе: {e}")
-        return {u: {"error": str(e)} for u in usernames}
+        log.error("Исключение при пакетном запросе: %s", e, extra={"platform": "vk"})
+        return usernames, {u: {"error": str(e)} for u in usernames}
+
+    if "error" in data:
+        return usernames, {u: {"error": _error_message(data)} for u in usernames}
+    response_list = data.get("response") or []
+    log.debug("Пачка из %d ников вернула %d профилей.", len(usernames), len(response_list), extra={"platform": "vk"})
+    return usernames, _match_to_input(usernames, response_list)
+
+async def _fetch_batch(chunks: list[list[str]]) -> list[tuple[list[str], dict]]:
+    """
+    Выполняет до 25 вызовов users.get одним запросом через метод execute
+    и разбирает общий ответ обратно по пачкам.
+    """
+    if len(chunks) == 1:
+        return [await _fetch_chunk(chunks[0])]
+
+    url = HttpClient.resolve_url("https://api.vk.com/method/execute")
+    payload = {"code": _build_execute_code(chunks), "access_token": _token, "v": _api_version}
+    total = sum(len(chunk) for chunk in chunks)
+
+    session = HttpClient.get_session()
+    semaphore = HttpClient.get_vk_semaphore()
+    limiter = get_rate_limiter("vk")
+
+    async def attempt() -> dict:
+        async with semaphore:
+            await limiter.acquire()
+            async with session.post(url, data=payload) as resp:
+                data = _check_response(resp.status, await resp.json(content_type=None) if resp.status == 200 else None)
+        # Упавший внутри execute вызов возвращается как false, подробности — в execute_errors
+        if execute_errors := data.get("execute_errors"):
+            log.warning("Ошибки внутри execute: %s", execute_errors, extra={"platform": "vk"})
+            if any(e.get("error_code") in _RATE_LIMIT_ERROR_CODES for e in execute_errors):
+                limiter.on_rate_limited()
+        return data
+
+    try:
+        data = await with_retry("vk", attempt)
+    except Exception as e:
+        log.error("Исключение при запросе execute: %s", e, extra={"platform": "vk"})
+        return [(chunk, {u: {"error": str(e)} for u in chunk}) for chunk in chunks]
+
+    if "error" in data:
+        error_msg = _error_message(data)
+        return [(chunk, {u: {"error": error_msg} for u in chunk}) for chunk in chunks]
+
+    results = []
+    responses = data.get("response") or []
+    for i, chunk in enumerate(chunks):
+        response_list = responses[i] if i < len(responses) else False
+        if response_list is False or response_list is None:
+            results.append((chunk, {u: {"error": "VK execute call failed"} for u in chunk}))
+        else:
+            results.append((chunk, _match_to_input(chunk, response_list)))
+    found = sum(len(chunk_result) for _, chunk_result in results)
+    log.debug("execute из %d вызовов (%d ников) вернул %d профилей.", len(chunks), total, found, extra={"platform": "vk"})
+    return results
+
+async def scan_bulk_stream(usernames: list[str]):
+    """
+    Группирует пачки по 25 в запросы execute, запускает их параллельно
+    (под семафором VK) и отдает результат каждой пачки как
+    (ники_пачки, {ник: профиль}) по мере готовности.
+    """
+    if not _token or not usernames:
+        return
+
+    chunks = chunk_usernames(usernames)
+    batches = [chunks[i:i + _EXECUTE_MAX_CALLS] for i in range(0, len(chunks), _EXECUTE_MAX_CALLS)]
+    log.debug("Пакетный запрос для %d ников (%d пачек, %d HTTP-запросов).", len(usernames), len(chunks), len(batches), extra={"platform": "vk"})
+    tasks = [asyncio.create_task(_fetch_batch(batch)) for batch in batches]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for chunk_result in await next_done:
+                yield chunk_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def scan_bulk(usernames: list[str]):
+    """Собирает все пачки в один словарь {ник: профиль}."""
+    results = {}
+    async for _, chunk_result in scan_bulk_stream(usernames):
+        results.update(chunk_result)
+    return results
 
 async def scan(username: str):
     """Одиночный скан через bulk для совместимости."""
@@ -0,0 +1,333 @@
+# src/server.py
+"""
+Режим долгоживущего сервиса: сканер как HTTP API.
+
+    POST   /scans               {"usernames": [...], "generate": false, "window_budget": 500} -> {"id": ...}
+    GET    /scans/{id}          состояние задания
+    GET    /scans/{id}/events   поток результатов (Server-Sent Events)
+    DELETE /scans/{id}          отмена задания
+    GET    /modules             загруженные модули и их стратегии
+    GET    /metrics             метрики в формате Prometheus (?format=json — снимок в JSON)
+
+Процесс один раз поднимает сессию HttpClient, клиент Telegram, кэш и общую
+сессию сканирования, а ники заданий разных операторов подаются в нее по очереди
+небольшими порциями, чтобы ни одно задание не занимало общие лимиты модулей целиком.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator
+
+from aiohttp import web
+
+from core.http_client import HttpClient
+from core.log_manager import LogManager, get_logger
+from core.metrics import Metrics
+from core.module_loader import load_modules, shutdown_modules, get_config, get_loaded_modules
+from core.result_cache import ResultCache, normalize_username
+from core.scanner import ScanSession, any_module_accepts, get_module_strategy
+from core.username_generator import DEFAULT_WINDOW_BUDGET, iter_variations
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+SLICE_SIZE = 50            # Сколько ников задания подается в сессию за один заход планировщика
+# Сколько ников сессия читает впрок для каждого модуля: новое задание ждет в очереди
+# медленного модуля (Telegram) не дольше этого числа ников других заданий
+READ_AHEAD = 200
+JOB_HISTORY_LIMIT = 10_000 # Сколько последних событий задания хранится для поздних подписчиков
+JOB_TTL = 3600             # Сколько секунд хранить завершенное задание
+RESTART_DELAY = 5.0        # Пауза перед перезапуском упавшей сессии сканирования, секунды
+
+log = get_logger("server")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+
+
+class ScanJob:
+    """Задание на сканирование: очередь ников, счетчики и подписчики на события."""
+
+    def __init__(self, usernames: list[str]):
+        self.id = uuid.uuid4().hex
+        self.pending = deque(usernames)
+        self.total = len(usernames)
+        self.scanned = 0
+        self.found = 0
+        self.state = JOB_QUEUED
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self._history = deque(maxlen=JOB_HISTORY_LIMIT)
+        self._subscribers: set[asyncio.Queue] = set()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def status(self) -> dict:
+        return {
+            "id": self.id, "state": self.state, "total": self.total,
+            "scanned": self.scanned, "found": self.found, "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def publish(self, event: str, data: dict):
+        self._history.append((event, data))
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def subscribe(self) -> asyncio.Queue:
+        """Подписка получает уже накопленные события, затем новые по мере поступления."""
+        queue = asyncio.Queue()
+        for item in self._history:
+            queue.put_nowait(item)
+        if not self.finished:
+            self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def on_result(self, item: dict):
+        if self.finished:
+            return
+        self.found += 1
+        self.publish("result", item)
+
+    def on_scanned(self, progress_every: int):
+        """Засчитывает ник, обработанный всеми модулями."""
+        if self.finished:
+            return
+        self.scanned += 1
+        if self.scanned >= self.total:
+            self.finish(JOB_DONE)
+        elif self.scanned % progress_every == 0:
+            self.publish("progress", {"scanned": self.scanned, "total": self.total, "found": self.found})
+
+    def finish(self, state: str):
+        if self.finished:
+            return
+        self.state = state
+        self.finished_at = time.time()
+        self.publish("done", self.status())
+        self._subscribers.clear()
+
+
+class JobScheduler:
+    """
+    Справедливая очередь заданий поверх одной долгоживущей сессии сканирования.
+    Ники заданий подаются в сессию по кругу порциями по SLICE_SIZE, так что большое
+    задание не блокирует маленькие. Все модули работают одновременно: пока Telegram
+    выдерживает паузы между запросами, VK и GitHub сканируют следующие порции.
+    Ник, который уже сканируется для другого задания, повторно не запрашивается.
+    """
+
+    def __init__(self, slice_size: int = SLICE_SIZE):
+        self.slice_size = slice_size
+        self.jobs: dict[str, ScanJob] = {}
+        self._ready: deque[ScanJob] = deque()
+        self._wakeup = asyncio.Event()
+        # Ник (в нормализованном виде) -> задания, которые его ждут, и уже найденные профили
+        self._inflight: dict[str, tuple[list[ScanJob], list[dict]]] = {}
+        self._session: ScanSession | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._session is not None:
+            self._session.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def submit(self, usernames: list[str]) -> ScanJob:
+        self._prune()
+        job = ScanJob(usernames)
+        self.jobs[job.id] = job
+        if job.pending:
+            self._ready.append(job)
+            self._wakeup.set()
+        else:
+            job.finish(JOB_DONE)
+        return job
+
+    def cancel(self, job: ScanJob):
+        """Задание завершается сразу; ники, уже переданные сессии, досканируются для других заданий."""
+        job.pending.clear()
+        if job in self._ready:
+            self._ready.remove(job)
+        job.finish(JOB_CANCELLED)
+
+    def _prune(self):
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at and now - job.finished_at > JOB_TTL:
+                del self.jobs[job_id]
+
+    async def _next_job(self) -> ScanJob:
+        while not self._ready:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._ready.popleft()
+
+    async def _feed(self) -> AsyncIterator[list[str]]:
+        """Источник сессии: следующая порция ников очередного задания."""
+        while True:
+            job = await self._next_job()
+            batch = []
+            while job.pending and len(batch) < self.slice_size:
+                username = job.pending.popleft()
+                key = normalize_username(username)
+                if (target := self._inflight.get(key)) is None:
+                    self._inflight[key] = ([job], [])
+                    batch.append(username)
+                    continue
+                jobs, results = target
+                if job in jobs: # Тот же ник в другом регистре
+                    job.on_scanned(self.slice_size)
+                    continue
+                jobs.append(job)
+                for item in results:
+                    job.on_result(item)
+            if job.pending:
+                self._ready.append(job) # В конец очереди: следующая порция — другому заданию
+            if job.state == JOB_QUEUED:
+                job.state = JOB_RUNNING
+            if batch:
+                yield batch
+
+    def _on_done(self, username: str):
+        jobs, _ = self._inflight.pop(normalize_username(username), ([], []))
+        for job in jobs:
+            job.on_scanned(self.slice_size)
+
+    async def _run(self):
+        while True:
+            self._session = ScanSession(self._feed(), done_callback=self._on_done, module_queue_size=READ_AHEAD)
+            try:
+                async for item in self._session:
+                    if target := self._inflight.get(normalize_username(item["username"])):
+                        target[1].append(item)
+                        for job in target[0]:
+                            job.on_result(item)
+            except Exception as e:
+                log.exception("Ошибка сессии сканирования, сессия перезапускается: %s", e)
+            # Ники прерванной сессии засчитываются, чтобы их задания не зависли
+            for key in list(self._inflight):
+                self._on_done(key)
+            await asyncio.sleep(RESTART_DELAY)
+
+
+SCHEDULER_KEY = web.AppKey("scheduler", JobScheduler)
+routes = web.RouteTableDef()
+
+def _get_job(request: web.Request) -> ScanJob:
+    job = request.app[SCHEDULER_KEY].jobs.get(request.match_info["job_id"])
+    if job is None:
+        raise web.HTTPNotFound(text=json.dumps({"error": "Задание не найдено"}), content_type="application/json")
+    return job
+
+@routes.get("/modules")
+async def list_modules(request: web.Request) -> web.Response:
+    modules = {name: {"strategy": get_module_strategy(module)} for name, module in get_loaded_modules().items()}
+    return web.json_response({"modules": modules})
+
+@routes.get("/metrics")
+async def get_metrics(request: web.Request) -> web.Response:
+    if request.query.get("format") == "json":
+        return web.json_response(Metrics.snapshot())
+    return web.Response(body=Metrics.render_prometheus().encode("utf-8"), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+@routes.post("/scans")
+async def create_scan(request: web.Request) -> web.Response:
+    try:
+        payload = await request.json()
+        usernames = payload.get("usernames", [])
+        if not isinstance(usernames, list) or not all(isinstance(u, str) for u in usernames):
+            raise TypeError("usernames должен быть списком строк")
+        usernames = [u.strip() for u in usernames if u.strip()]
+        window_budget = int(payload.get("window_budget") or get_config().get("generator", {}).get("window_budget", DEFAULT_WINDOW_BUDGET))
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        raise web.HTTPBadRequest(text=json.dumps({"error": "Ожидается JSON вида {\"usernames\": [\"ник\", ...]}"}), content_type="application/json")
+    if payload.get("generate"):
+        usernames = list(iter_variations(usernames, is_valid=any_module_accepts(), window_budget=window_budget))
+    usernames = list(dict.fromkeys(usernames))
+    if not usernames:
+        raise web.HTTPBadRequest(text=json.dumps({"error": "Не передано ни одного ника"}), content_type="application/json")
+
+    job = request.app[SCHEDULER_KEY].submit(usernames)
+    log.info("Задание %s поставлено в очередь: %d ников.", job.id, job.total)
+    return web.json_response(job.status(), status=202)
+
+@routes.get("/scans/{job_id}")
+async def get_scan(request: web.Request) -> web.Response:
+    return web.json_response(_get_job(request).status())
+
+@routes.delete("/scans/{job_id}")
+async def cancel_scan(request: web.Request) -> web.Response:
+    job = _get_job(request)
+    request.app[SCHEDULER_KEY].cancel(job)
+    return web.json_response(job.status())
+
+@routes.get("/scans/{job_id}/events")
+async def scan_events(request: web.Request) -> web.StreamResponse:
+    job = _get_job(request)
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    queue = job.subscribe()
+    try:
+        while True:
+            event, data = await queue.get()
+            payload = json.dumps(data, ensure_ascii=False, default=str)
+            await response.write(f"event: {event}\ndata: {payload}\n\n".encode("utf-8"))
+            if event == "done":
+                break
+    except ConnectionResetError:
+        pass
+    finally:
+        job.unsubscribe(queue)
+    return response
+
+
+async def on_startup(app: web.Application):
+    LogManager.initialize(get_config().get("logging"))
+    await HttpClient.initialize(get_config().get("http"))
+    ResultCache.initialize(get_config().get("cache"))
+    await load_modules()
+    app[SCHEDULER_KEY].start()
+
+async def on_cleanup(app: web.Application):
+    log.info("Начало процесса завершения...")
+    await app[SCHEDULER_KEY].stop()
+    await shutdown_modules()
+    await HttpClient.close()
+    ResultCache.close()
+    log.info("Все системы выгружены. Выход.")
+    LogManager.close()
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app[SCHEDULER_KEY] = JobScheduler()
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+if __name__ == "__main__":
+    server_config = get_config().get("server", {})
+    parser = argparse.ArgumentParser(description="OSINT-Scout: HTTP API для сканирования.")
+    parser.add_argument("--host", default=server_config.get("host", DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=server_config.get("port", DEFAULT_PORT))
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -4,11 +4,12 @@ import json
 import sys
 import os
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 from core.scanner import scan_many
 from core.http_client import HttpClient
-from core.module_loader import load_modules, shutdown_modules
+from core.module_loader import load_modules, shutdown_modules, get_config
+from core.result_cache import ResultCache
 
 async def main():
     if len(sys.argv) < 2:
@@ -17,6 +18,7 @@ async def main():
         
     # ИЗМЕНЕНИЕ: Явный и корректный порядок инициализации
     await HttpClient.initialize()
+    ResultCache.initialize(get_config().get("cache"))
     await load_modules()
 
     usernames = sys.argv[1:]
@@ -32,6 +34,7 @@ async def main():
         # ИЗМЕНЕНИЕ: Корректный порядок завершения
         await shutdown_modules()
         await HttpClient.close()
+        ResultCache.close()
 
 if __name__ == "__main__":
     if sys.platform == "win32":